@@ -6,6 +6,8 @@ from sqlmodel import SQLModel
 from sqlalchemy import pool, engine_from_config
 
 from src import models  # pylint: disable=unused-import
+from src.backfill import PROGRESS_TABLE
+from src.models import FTS_TABLES
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -22,6 +24,14 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Hide FTS5 virtual tables, their shadow tables and backfill progress from autogenerate."""
+    if type_ == "table" and (name.startswith(FTS_TABLES) or name == PROGRESS_TABLE):
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -44,6 +54,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -66,7 +77,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -8,7 +8,7 @@ Create Date: 2025-12-23 18:52:49.243459
 
 from typing import Sequence, Union
 
-from alembic import op
+from src.backfill import migrate_in_chunks
 
 
 # revision identifiers, used by Alembic.
@@ -20,10 +20,21 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # SQLite stores enum values as strings
-    op.execute("UPDATE prediction SET status = 'reviewed' WHERE status = 'approved'")
+    # SQLite stores enum values as strings. In chunks, since every prediction
+    # may need the update; the throughput report is logged as it finishes
+    migrate_in_chunks(
+        "007_status_reviewed",
+        "prediction",
+        "UPDATE prediction SET status = 'reviewed' "
+        "WHERE id > :lo AND id <= :hi AND status = 'approved'",
+    )
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    op.execute("UPDATE prediction SET status = 'approved' WHERE status = 'reviewed'")
+    migrate_in_chunks(
+        "007_status_approved",
+        "prediction",
+        "UPDATE prediction SET status = 'approved' "
+        "WHERE id > :lo AND id <= :hi AND status = 'reviewed'",
+    )
@@ -0,0 +1,110 @@
+"""008 create FTS5 search tables
+
+Revision ID: 760f5177f027
+Revises: ff392cecadb3
+Create Date: 2026-10-18 10:12:41.518203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "760f5177f027"
+down_revision: Union[str, Sequence[str], None] = "ff392cecadb3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # External-content FTS5 indexes, kept in sync with triggers
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE prediction_fts USING fts5(
+            question, description,
+            content='prediction', content_rowid='id', tokenize='porter unicode61'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER prediction_fts_ai AFTER INSERT ON prediction BEGIN
+            INSERT INTO prediction_fts(rowid, question, description)
+            VALUES (new.id, new.question, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER prediction_fts_ad AFTER DELETE ON prediction BEGIN
+            INSERT INTO prediction_fts(prediction_fts, rowid, question, description)
+            VALUES ('delete', old.id, old.question, old.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER prediction_fts_au AFTER UPDATE OF question, description ON prediction BEGIN
+            INSERT INTO prediction_fts(prediction_fts, rowid, question, description)
+            VALUES ('delete', old.id, old.question, old.description);
+            INSERT INTO prediction_fts(rowid, question, description)
+            VALUES (new.id, new.question, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE source_fts USING fts5(
+            title, url, summary,
+            content='source', content_rowid='id', tokenize='porter unicode61'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER source_fts_ai AFTER INSERT ON source BEGIN
+            INSERT INTO source_fts(rowid, title, url, summary)
+            VALUES (new.id, new.title, new.url, new.summary);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER source_fts_ad AFTER DELETE ON source BEGIN
+            INSERT INTO source_fts(source_fts, rowid, title, url, summary)
+            VALUES ('delete', old.id, old.title, old.url, old.summary);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER source_fts_au AFTER UPDATE OF title, url, summary ON source BEGIN
+            INSERT INTO source_fts(source_fts, rowid, title, url, summary)
+            VALUES ('delete', old.id, old.title, old.url, old.summary);
+            INSERT INTO source_fts(rowid, title, url, summary)
+            VALUES (new.id, new.title, new.url, new.summary);
+        END
+        """
+    )
+
+    # Index rows that existed before this migration
+    op.execute("INSERT INTO prediction_fts(prediction_fts) VALUES ('rebuild')")
+    op.execute("INSERT INTO source_fts(source_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for trigger in (
+        "source_fts_au",
+        "source_fts_ad",
+        "source_fts_ai",
+        "prediction_fts_au",
+        "prediction_fts_ad",
+        "prediction_fts_ai",
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS source_fts")
+    op.execute("DROP TABLE IF EXISTS prediction_fts")
@@ -0,0 +1,185 @@
+"""013 create autoincrement copies of the archived tables
+
+Revision ID: 098bad4e745e
+Revises: 93ce4bee077e
+Create Date: 2026-10-18 21:40:12.806115
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel as sqm
+
+
+# revision identifiers, used by Alembic.
+revision: str = "098bad4e745e"
+down_revision: Union[str, Sequence[str], None] = "93ce4bee077e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose rows move to the archive, where their ids must stay unique.
+# SQLite cannot add AUTOINCREMENT to a table, so each one gets a copy,
+# `_new_<table>`: this revision creates the copies and triggers that mirror
+# every write into them, 014 copies the existing rows in chunks and 015
+# swaps the copies in, so the writer lock is only held briefly at a time.
+ARCHIVED_TABLES = ("prediction", "predictionupdate", "source", "humanreview")
+
+COLUMNS = {
+    "prediction": (
+        "question",
+        "description",
+        "id",
+        "status",
+        "outcome",
+        "created_at",
+        "updated_at",
+        "known_date",
+        "require_review",
+        "resolved_at",
+        "current_likelihood",
+        "last_updated_at",
+    ),
+    "predictionupdate": (
+        "id",
+        "prediction_id",
+        "likelihood",
+        "reasoning",
+        "created_at",
+        "updated_at",
+    ),
+    "source": (
+        "id",
+        "update_id",
+        "title",
+        "url",
+        "summary",
+        "credibility",
+        "relevance",
+        "reasoning",
+        "created_at",
+        "updated_at",
+    ),
+    "humanreview": (
+        "id",
+        "update_id",
+        "name",
+        "decision",
+        "feedback",
+        "created_at",
+        "updated_at",
+    ),
+}
+
+
+def _create_copies() -> None:
+    """The archived tables as of 012, with AUTOINCREMENT, named `_new_<table>`.
+
+    Foreign keys name the original tables, which the copies replace in 015.
+    """
+    op.create_table(
+        "_new_prediction",
+        sa.Column("question", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("description", sqm.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "DRAFT",
+                "RESEARCHING",
+                "PENDING_REVIEW",
+                "REVIEWED",
+                "RESOLVED",
+                name="predictionstatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("outcome", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("known_date", sa.Date(), nullable=False),
+        sa.Column("require_review", sa.Boolean(), nullable=False),
+        sa.Column("resolved_at", sa.DateTime(), nullable=True),
+        sa.Column("current_likelihood", sa.Float(), nullable=True),
+        sa.Column("last_updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_table(
+        "_new_predictionupdate",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("prediction_id", sa.Integer(), nullable=False),
+        sa.Column("likelihood", sa.Float(), nullable=False),
+        sa.Column("reasoning", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["prediction_id"], ["prediction.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_table(
+        "_new_source",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("update_id", sa.Integer(), nullable=False),
+        sa.Column("title", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("url", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("summary", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("credibility", sa.Float(), nullable=False),
+        sa.Column("relevance", sa.Float(), nullable=False),
+        sa.Column("reasoning", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["update_id"], ["predictionupdate.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+    op.create_table(
+        "_new_humanreview",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("update_id", sa.Integer(), nullable=False),
+        sa.Column("name", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "decision",
+            sa.Enum("ACCEPT", "CHALLENGE", "REJECT", name="reviewdecision"),
+            nullable=False,
+        ),
+        sa.Column("feedback", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["update_id"], ["predictionupdate.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sqlite_autoincrement=True,
+    )
+
+
+def _create_mirror_triggers(table: str) -> None:
+    """Apply every later insert, update and delete of `table` to its copy too."""
+    columns = ", ".join(COLUMNS[table])
+    values = ", ".join(f"new.{column}" for column in COLUMNS[table])
+    upsert = f"INSERT OR REPLACE INTO _new_{table} ({columns}) VALUES ({values});"
+    delete = f"DELETE FROM _new_{table} WHERE id = old.id;"
+    op.execute(f"CREATE TRIGGER _new_{table}_ai AFTER INSERT ON {table} BEGIN {upsert} END")
+    op.execute(
+        f"CREATE TRIGGER _new_{table}_au AFTER UPDATE ON {table} BEGIN {delete} {upsert} END"
+    )
+    op.execute(f"CREATE TRIGGER _new_{table}_ad AFTER DELETE ON {table} BEGIN {delete} END")
+
+
+def _drop_mirror_triggers(table: str) -> None:
+    for suffix in ("ai", "au", "ad"):
+        op.execute(f"DROP TRIGGER IF EXISTS _new_{table}_{suffix}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_copies()
+    for table in ARCHIVED_TABLES:
+        _create_mirror_triggers(table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(ARCHIVED_TABLES):
+        _drop_mirror_triggers(table)
+        op.drop_table(f"_new_{table}")
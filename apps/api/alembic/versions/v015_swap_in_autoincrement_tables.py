@@ -0,0 +1,157 @@
+"""015 swap the autoincrement copies in for the archived tables
+
+Revision ID: de0ab41acc5a
+Revises: ebe275c01771
+Create Date: 2026-10-18 23:52:37.640918
+
+"""
+
+from typing import List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel as sqm
+
+
+# revision identifiers, used by Alembic.
+revision: str = "de0ab41acc5a"
+down_revision: Union[str, Sequence[str], None] = "ebe275c01771"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARCHIVED_TABLES = ("prediction", "predictionupdate", "source", "humanreview")
+
+
+def _dependents(table: str) -> List[Tuple[str, str, str]]:
+    """(type, name, sql) of the indexes and triggers on `table`."""
+    rows = op.get_bind().execute(
+        sa.text(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE type IN ('index', 'trigger') AND tbl_name = :name AND sql IS NOT NULL"
+        ),
+        {"name": table},
+    )
+    return [tuple(row) for row in rows]
+
+
+def _mirror_triggers(table: str) -> List[str]:
+    return [f"_new_{table}_{suffix}" for suffix in ("ai", "au", "ad")]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Triggers on the other tables name the table being replaced; the legacy
+    # rename leaves them alone instead of failing on the dropped table
+    op.execute("PRAGMA legacy_alter_table = ON")
+    for table in ARCHIVED_TABLES:
+        for trigger in _mirror_triggers(table):
+            op.execute(f"DROP TRIGGER {trigger}")
+        # The mirror triggers kept the copy current, so no rows are copied here
+        dependents = _dependents(table)
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"ALTER TABLE _new_{table} RENAME TO {table}")
+        for _, _, statement in dependents:
+            op.execute(statement)
+    op.execute("PRAGMA legacy_alter_table = OFF")
+
+
+def _create_tables_without_autoincrement() -> None:
+    """The archived tables as of 012, named `_old_<table>`."""
+    # Repeats the definitions in 013 on purpose: one migration must not change
+    # because another one does
+    # pylint: disable=duplicate-code
+    op.create_table(
+        "_old_prediction",
+        sa.Column("question", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("description", sqm.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "DRAFT",
+                "RESEARCHING",
+                "PENDING_REVIEW",
+                "REVIEWED",
+                "RESOLVED",
+                name="predictionstatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("outcome", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("known_date", sa.Date(), nullable=False),
+        sa.Column("require_review", sa.Boolean(), nullable=False),
+        sa.Column("resolved_at", sa.DateTime(), nullable=True),
+        sa.Column("current_likelihood", sa.Float(), nullable=True),
+        sa.Column("last_updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "_old_predictionupdate",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("prediction_id", sa.Integer(), nullable=False),
+        sa.Column("likelihood", sa.Float(), nullable=False),
+        sa.Column("reasoning", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["prediction_id"], ["prediction.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "_old_source",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("update_id", sa.Integer(), nullable=False),
+        sa.Column("title", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("url", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("summary", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("credibility", sa.Float(), nullable=False),
+        sa.Column("relevance", sa.Float(), nullable=False),
+        sa.Column("reasoning", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["update_id"], ["predictionupdate.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "_old_humanreview",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("update_id", sa.Integer(), nullable=False),
+        sa.Column("name", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "decision",
+            sa.Enum("ACCEPT", "CHALLENGE", "REJECT", name="reviewdecision"),
+            nullable=False,
+        ),
+        sa.Column("feedback", sqm.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["update_id"], ["predictionupdate.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Back to 014: the tables without AUTOINCREMENT, with the current ones
+    # kept as their copies and mirrored again. Copies all rows at once
+    op.execute("PRAGMA legacy_alter_table = ON")
+    _create_tables_without_autoincrement()
+    for table in ARCHIVED_TABLES:
+        dependents = _dependents(table)
+        for kind, name, _ in dependents:
+            op.execute(f"DROP {kind.upper()} {name}")
+        op.execute(f"INSERT INTO _old_{table} SELECT * FROM {table}")
+        op.execute(f"ALTER TABLE {table} RENAME TO _new_{table}")
+        op.execute(f"ALTER TABLE _old_{table} RENAME TO {table}")
+        for _, _, statement in dependents:
+            op.execute(statement)
+        columns = [row[1] for row in op.get_bind().exec_driver_sql(f"PRAGMA table_info({table})")]
+        values = ", ".join(f"new.{column}" for column in columns)
+        upsert = f"INSERT OR REPLACE INTO _new_{table} ({', '.join(columns)}) VALUES ({values});"
+        delete = f"DELETE FROM _new_{table} WHERE id = old.id;"
+        ai, au, ad = _mirror_triggers(table)
+        op.execute(f"CREATE TRIGGER {ai} AFTER INSERT ON {table} BEGIN {upsert} END")
+        op.execute(f"CREATE TRIGGER {au} AFTER UPDATE ON {table} BEGIN {delete} {upsert} END")
+        op.execute(f"CREATE TRIGGER {ad} AFTER DELETE ON {table} BEGIN {delete} END")
+    op.execute("PRAGMA legacy_alter_table = OFF")
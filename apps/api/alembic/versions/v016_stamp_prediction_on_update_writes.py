@@ -0,0 +1,88 @@
+"""016 stamp prediction updated_at from the current likelihood triggers
+
+Revision ID: 04df03c17ae2
+Revises: de0ab41acc5a
+Create Date: 2026-10-18 23:05:31.447920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "04df03c17ae2"
+down_revision: Union[str, Sequence[str], None] = "de0ab41acc5a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same microsecond format as the datetimes SQLAlchemy stores
+NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+LATEST_UPDATE = """
+    UPDATE prediction SET
+        current_likelihood = (
+            SELECT likelihood FROM predictionupdate
+            WHERE prediction_id = {ref}.prediction_id
+            ORDER BY created_at DESC, id DESC LIMIT 1
+        ),
+        last_updated_at = (
+            SELECT MAX(created_at) FROM predictionupdate WHERE prediction_id = {ref}.prediction_id
+        ){stamp}
+    WHERE id = {ref}.prediction_id;
+"""
+
+
+def _create_triggers(stamp: bool) -> None:
+    """The triggers of migration 010, setting `updated_at` as well if `stamp`."""
+    inserted = f", updated_at = {NOW}" if stamp else ""
+    latest = {
+        ref: LATEST_UPDATE.format(ref=ref, stamp=f",\n        updated_at = {NOW}" if stamp else "")
+        for ref in ("old", "new")
+    }
+    op.execute(
+        f"""
+        CREATE TRIGGER predictionupdate_current_ai AFTER INSERT ON predictionupdate BEGIN
+            UPDATE prediction
+            SET current_likelihood = new.likelihood, last_updated_at = new.created_at{inserted}
+            WHERE id = new.prediction_id
+                AND (last_updated_at IS NULL OR new.created_at >= last_updated_at);
+        END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER predictionupdate_current_ad AFTER DELETE ON predictionupdate BEGIN
+            {latest["old"]}
+        END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER predictionupdate_current_au
+        AFTER UPDATE OF likelihood, created_at, prediction_id ON predictionupdate BEGIN
+            {latest["old"]}
+            {latest["new"]}
+        END
+        """
+    )
+
+
+def _drop_triggers() -> None:
+    op.execute("DROP TRIGGER IF EXISTS predictionupdate_current_au")
+    op.execute("DROP TRIGGER IF EXISTS predictionupdate_current_ad")
+    op.execute("DROP TRIGGER IF EXISTS predictionupdate_current_ai")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same triggers as CURRENT_LIKELIHOOD_DDL in src/models/prediction.py
+    _drop_triggers()
+    _create_triggers(stamp=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_triggers()
+    _create_triggers(stamp=False)
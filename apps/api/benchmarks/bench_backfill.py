@@ -0,0 +1,108 @@
+"""
+Write latency while a data migration backfills the prediction table.
+
+Seeds a throwaway SQLite database in WAL mode, then runs the same `UPDATE`
+over every prediction twice: once as a single statement and once with
+`run_chunked`. Meanwhile a writer thread updates a random prediction every
+`--interval-ms`, as the API would, and the latency of those writes is
+reported for each mode.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_backfill --rows 500000 --chunk-size 2000
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import create_engine
+
+from src.backfill import run_chunked
+
+from .seed import seed_predictions
+
+STATEMENT = (
+    "UPDATE prediction SET description = question || ' (backfilled)' "
+    "WHERE id > :lo AND id <= :hi"
+)
+
+
+def writer(
+    path: Path, rows: int, interval: float, stop: threading.Event, samples: List[float]
+) -> None:
+    """Update random predictions until `stop` is set, appending each write's latency in ms."""
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    rng = random.Random(7)
+    while not stop.is_set():
+        started = time.perf_counter()
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute(
+            "UPDATE prediction SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (rng.randint(1, rows),),
+        )
+        connection.execute("COMMIT")
+        samples.append((time.perf_counter() - started) * 1000)
+        time.sleep(interval)
+    connection.close()
+
+
+def run(rows: int, chunk_size: int, pause: float, interval: float) -> None:
+    print(
+        f"{'mode':>8} | {'total s':>8} | {'writes':>6} | {'p50 ms':>8} | {'p99 ms':>8} | "
+        f"{'max ms':>8}"
+    )
+    print("-" * 62)
+    for mode, size in (("single", rows), ("chunked", chunk_size)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench.db"
+            seed_predictions(f"sqlite:///{path}", rows)
+            engine = create_engine(f"sqlite:///{path}")
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+                stop = threading.Event()
+                samples: List[float] = []
+                thread = threading.Thread(
+                    target=writer, args=(path, rows, interval, stop, samples)
+                )
+                thread.start()
+                time.sleep(0.2)  # baseline writes before the backfill starts
+                report = run_chunked(
+                    conn,
+                    mode,
+                    "prediction",
+                    STATEMENT,
+                    chunk_size=size,
+                    pause_seconds=pause if size < rows else 0,
+                )
+                stop.set()
+                thread.join()
+            engine.dispose()
+
+        samples.sort()
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(
+            f"{mode:>8} | {report.seconds:8.2f} | {len(samples):6d} | "
+            f"{statistics.median(samples):8.2f} | {p99:8.2f} | {samples[-1]:8.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--pause-ms", type=float, default=50.0, help="pause between chunks")
+    parser.add_argument("--interval-ms", type=float, default=10.0, help="time between writes")
+    args = parser.parse_args()
+    run(args.rows, args.chunk_size, args.pause_ms / 1000, args.interval_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
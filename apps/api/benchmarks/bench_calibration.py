@@ -0,0 +1,152 @@
+"""
+Calibration report: vectorized scoring vs a per-row Python loop.
+
+Times `build_report` on synthetic forecast arrays of each size in `--sizes`
+against an equivalent per-row loop, then the end-to-end
+GET /evals/calibration path (query + array load + scoring) on seeded SQLite
+databases with each of `--db-updates` updates. The database path is run with
+the streamed `load_forecasts` and with every row fetched at once, and reports
+time and peak Python memory of each.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_calibration --sizes 100000,10000000 --db-updates 100000,1000000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.services.eval_service import Forecasts, _forecasts_query, build_report, load_forecasts
+
+from .seed import seed_predictions, seed_updates
+
+BINS = 10
+HORIZONS = [30, 90, 365]
+
+
+def per_row_report(forecasts: Forecasts) -> float:
+    """Reference implementation of the overall Brier decomposition with plain Python loops."""
+    counts = [0] * BINS
+    sum_likelihood = [0.0] * BINS
+    sum_outcome = [0.0] * BINS
+    squared_error = 0.0
+    for p, o in zip(forecasts.likelihood.tolist(), forecasts.outcome.tolist()):
+        i = min(int(p * BINS), BINS - 1)
+        counts[i] += 1
+        sum_likelihood[i] += p
+        sum_outcome[i] += o
+        squared_error += (p - o) ** 2
+    return squared_error / len(forecasts.likelihood)
+
+
+def synthetic_forecasts(size: int) -> Forecasts:
+    rng = np.random.default_rng(42)
+    likelihood = rng.random(size)
+    return Forecasts(
+        likelihood=likelihood,
+        outcome=(rng.random(size) < likelihood).astype(np.float64),
+        horizon_days=rng.uniform(-30, 800, size),
+        require_review=rng.random(size) < 0.5,
+    )
+
+
+def bench_compute(size: int) -> None:
+    forecasts = synthetic_forecasts(size)
+    started = time.perf_counter()
+    build_report(forecasts, BINS, HORIZONS)
+    vectorized = time.perf_counter() - started
+
+    started = time.perf_counter()
+    per_row_report(forecasts)
+    per_row = time.perf_counter() - started
+    speedup = per_row / vectorized
+    print(f"{size:>12} | {vectorized * 1000:>14.1f} | {per_row * 1000:>14.1f} | {speedup:>7.1f}x")
+
+
+async def load_all_rows(session: AsyncSession) -> Forecasts:
+    """Reference loader that fetches every row before building the arrays."""
+    connection = await session.connection()
+    rows = (await connection.execute(_forecasts_query(False))).all()
+    flat = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=4 * len(rows))
+    data = flat.reshape(-1, 4)
+    return Forecasts(data[:, 0], data[:, 1], data[:, 2], data[:, 3].astype(bool))
+
+
+async def run_database(session_factory, loader, trace: bool):
+    """Load and score once; returns (load seconds, scoring seconds, peak MB or None)."""
+    if trace:
+        tracemalloc.start()
+    async with session_factory() as session:
+        started = time.perf_counter()
+        forecasts = await loader(session)
+        loaded = time.perf_counter() - started
+    started = time.perf_counter()
+    build_report(forecasts, BINS, HORIZONS)
+    scored = time.perf_counter() - started
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return forecasts.likelihood.size, loaded, scored, peak
+
+
+async def bench_database(database_url: str) -> None:
+    engine = create_async_engine(database_url, future=True)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    for name, loader in (("streamed", load_forecasts), ("fetch all", load_all_rows)):
+        # Timed without tracemalloc, which slows allocation-heavy code down
+        size, loaded, scored, _ = await run_database(session_factory, loader, trace=False)
+        *_, peak = await run_database(session_factory, loader, trace=True)
+        print(
+            f"{size:>12} | {name:>10} | {loaded * 1000:>12.1f} | {scored * 1000:>10.1f} | "
+            f"{peak:>12.1f}"
+        )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes", default="100000,10000000", help="comma-separated forecast counts"
+    )
+    parser.add_argument(
+        "--db-updates",
+        default="100000,1000000",
+        help="comma-separated update counts to seed and load (empty to skip)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'forecasts':>12} | {'vectorized ms':>14} | {'per-row ms':>14} | {'speedup':>8}")
+    print("-" * 58)
+    for size in (int(value) for value in args.sizes.split(",")):
+        bench_compute(size)
+
+    db_sizes = [int(value) for value in args.db_updates.split(",") if value]
+    if db_sizes:
+        print()
+        print(
+            f"{'forecasts':>12} | {'loader':>10} | {'load ms':>12} | {'score ms':>10} | "
+            f"{'peak MB':>12}"
+        )
+        print("-" * 68)
+    for updates in db_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+            predictions = max(updates // 10, 1)
+            seed_predictions(database_url, predictions)
+            seed_updates(database_url, updates, predictions)
+            asyncio.run(bench_database(database_url))
+
+
+if __name__ == "__main__":
+    main()
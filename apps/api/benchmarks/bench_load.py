@@ -0,0 +1,256 @@
+"""
+Concurrent load test for the predictions API.
+
+Seeds a SQLite database with predictions, updates, sources and reviews, then
+drives the ASGI app in-process through httpx with `--concurrency` clients
+per workload:
+
+    list   GET  /predictions/?cursor=...&limit=50   (random page)
+    get    GET  /predictions/{id}?expand=updates,sources,review
+    post   POST /predictions/
+
+Throughput, latency percentiles and SQL statements per request are written
+to a JSON file; pass a previous file with --compare to print the deltas.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_load --predictions 100000 --output load.json
+    python -m benchmarks.bench_load --database /tmp/load.db --compare load.json
+
+Seeding 1M rows takes a while; --database keeps the seeded file and reuses
+it on later runs. The post workload adds rows, so reused databases grow.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+
+from src.config import Settings
+from src.main import create_app
+from src.metrics import track_queries
+from src.models import Prediction
+from src.pagination import encode_cursor
+
+from .seed import seed_predictions, seed_reviews, seed_sources, seed_updates, sync_url
+
+# (method, url, json body) for the n-th request of a workload
+RequestFactory = Callable[[random.Random, int], Tuple[str, str, Optional[dict]]]
+
+
+def list_request(rng: random.Random, predictions: int) -> Tuple[str, str, Optional[dict]]:
+    cursor = encode_cursor({"id": rng.randrange(predictions)})
+    return "GET", f"/predictions/?cursor={cursor}&limit=50", None
+
+
+def get_request(rng: random.Random, predictions: int) -> Tuple[str, str, Optional[dict]]:
+    return (
+        "GET",
+        f"/predictions/{rng.randrange(predictions) + 1}?expand=updates,sources,review",
+        None,
+    )
+
+
+def post_request(rng: random.Random, predictions: int) -> Tuple[str, str, Optional[dict]]:
+    body = {
+        "question": f"Load test question {rng.random()}?",
+        "description": "Created by the load test",
+        "known_date": "2027-01-01",
+    }
+    return "POST", "/predictions/", body
+
+
+WORKLOADS: Dict[str, RequestFactory] = {
+    "list": list_request,
+    "get": get_request,
+    "post": post_request,
+}
+
+
+def percentile(samples: List[float], quantile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * quantile), len(ordered) - 1)]
+
+
+async def run_workload(
+    client: AsyncClient, factory: RequestFactory, predictions: int, requests: int, concurrency: int
+) -> dict:
+    latencies: List[float] = []
+    statements: List[int] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors
+        rng = random.Random(worker_id)
+        for _ in remaining:
+            method, url, body = factory(rng, predictions)
+            with track_queries() as tracker:
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                latencies.append((time.perf_counter() - started) * 1000)
+            statements.append(tracker.total)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "queries_per_request": round(statistics.mean(statements), 2),
+        "max_queries": max(statements),
+    }
+
+
+async def run(
+    database_url: str, predictions: int, workloads: List[str], requests: int, concurrency: int
+) -> dict:
+    # Same engine profile as production: WAL, separate read-only pool
+    app = create_app(Settings(database_url=database_url, slow_query_ms=0))
+
+    results = {}
+    transport = ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in workloads:
+                # Warm up pools and SQLite's page cache before measuring
+                await run_workload(
+                    client, WORKLOADS[name], predictions, min(requests, 100), concurrency
+                )
+                results[name] = await run_workload(
+                    client, WORKLOADS[name], predictions, requests, concurrency
+                )
+                print_result(name, results[name])
+    return results
+
+
+def print_result(name: str, result: dict, baseline: Optional[dict] = None) -> None:
+    line = (
+        f"{name:>6} | {result['rps']:>8.1f} rps | p50 {result['p50_ms']:>7.2f} | "
+        f"p95 {result['p95_ms']:>7.2f} | p99 {result['p99_ms']:>7.2f} ms | "
+        f"{result['queries_per_request']:>5.2f} q/req | {result['errors']} errors"
+    )
+    if baseline:
+        deltas = (
+            f"{key} {(result[key] - baseline[key]) / baseline[key] * 100:+.1f}%"
+            for key in ("rps", "p50_ms", "p99_ms")
+            if baseline.get(key)
+        )
+        line += "  (" + ", ".join(deltas) + ")"
+    print(line)
+
+
+def seed(database_url: str, args: argparse.Namespace) -> int:
+    """Seed the requested volumes unless the database has predictions; returns their count."""
+    engine = create_engine(sync_url(database_url))
+    try:
+        with engine.connect() as conn:
+            existing = conn.execute(select(func.count()).select_from(Prediction)).scalar()
+    except OperationalError:
+        # No schema yet
+        existing = 0
+    finally:
+        engine.dispose()
+    if existing:
+        print(f"Reusing {existing} seeded predictions")
+        return existing
+
+    started = time.perf_counter()
+    seed_predictions(database_url, args.predictions)
+    seed_updates(database_url, args.updates, args.predictions)
+    seed_sources(database_url, args.sources, args.updates)
+    seed_reviews(database_url, args.reviews, args.updates)
+    print(
+        f"Seeded {args.predictions} predictions, {args.updates} updates, {args.sources} sources "
+        f"and {args.reviews} reviews in {time.perf_counter() - started:.1f}s"
+    )
+    return args.predictions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--predictions", type=int, default=10_000)
+    parser.add_argument("--updates", type=int, default=None, help="default: 3 per prediction")
+    parser.add_argument("--sources", type=int, default=None, help="default: 2 per update")
+    parser.add_argument("--reviews", type=int, default=None, help="default: one per 2 updates")
+    parser.add_argument(
+        "--workloads", default="list,get,post", help="comma-separated subset of list,get,post"
+    )
+    parser.add_argument("--requests", type=int, default=2000, help="requests per workload")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--database", type=Path, help="SQLite file to seed once and reuse")
+    parser.add_argument("--output", type=Path, default=Path("bench_load.json"))
+    parser.add_argument("--compare", type=Path, help="previous results file to diff against")
+    args = parser.parse_args()
+
+    args.updates = args.updates if args.updates is not None else args.predictions * 3
+    args.sources = args.sources if args.sources is not None else args.updates * 2
+    args.reviews = args.reviews if args.reviews is not None else args.updates // 2
+    workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = set(workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = args.database or Path(tmp) / "load.db"
+        database_url = f"sqlite+aiosqlite:///{database}"
+        predictions = seed(database_url, args)
+        results = asyncio.run(
+            run(database_url, predictions, workloads, args.requests, args.concurrency)
+        )
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {
+            "predictions": predictions,
+            "updates": args.updates,
+            "sources": args.sources,
+            "reviews": args.reviews,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\nCompared with {args.compare} (commit {baseline.get('commit')}):")
+        for name, result in results.items():
+            print_result(name, result, baseline["results"].get(name))
+
+
+if __name__ == "__main__":
+    main()
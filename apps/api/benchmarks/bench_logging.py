@@ -0,0 +1,83 @@
+"""
+Caller-side latency of a log call: direct handlers vs the queue-based setup.
+
+Emits a burst of INFO records with file rotation enabled and reports latency
+percentiles as seen by the logging caller (i.e. the request handler).
+Console output goes to stderr; redirect it to keep the run quiet.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_logging --records 50000 2>/dev/null
+"""
+
+import argparse
+import logging
+import logging.handlers
+import tempfile
+import time
+from pathlib import Path
+
+from src.logging_config import TEXT_DATEFMT, TEXT_FORMAT, setup_logging, stop_logging
+
+
+def setup_direct(log_dir: Path, max_bytes: int) -> None:
+    """The previous setup: file and console handlers on the root logger."""
+    formatter = logging.Formatter(fmt=TEXT_FORMAT, datefmt=TEXT_DATEFMT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "varinaut.log", maxBytes=max_bytes, backupCount=5, encoding="utf-8"
+    )
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+        logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+
+def percentile(samples: list, quantile: float) -> float:
+    return samples[min(int(len(samples) * quantile), len(samples) - 1)]
+
+
+def measure(records: int) -> list:
+    logger = logging.getLogger("varinaut.bench")
+    samples = []
+    for i in range(records):
+        started = time.perf_counter()
+        logger.info("request %d handled in %.1f ms", i, 12.5)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return sorted(samples)
+
+
+def run(mode: str, records: int, max_bytes: int) -> list:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    log_dir = Path(tempfile.mkdtemp())
+    if mode == "queued":
+        setup_logging(log_dir=log_dir, max_bytes=max_bytes)
+    else:
+        setup_direct(log_dir, max_bytes)
+    samples = measure(records)
+    stop_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--max-bytes", type=int, default=1_000_000, help="rotation size")
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} | {'p50 us':>8} | {'p99 us':>8} | {'p99.9 us':>9} | {'max us':>8}")
+    print("-" * 53)
+    for mode in ("direct", "queued"):
+        samples = run(mode, args.records, args.max_bytes)
+        p50, p99, p999 = (percentile(samples, q) for q in (0.5, 0.99, 0.999))
+        print(f"{mode:>8} | {p50:8.1f} | {p99:8.1f} | {p999:9.1f} | {samples[-1]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Offset vs keyset pagination latency for GET /predictions/.
+
+Seeds a throwaway SQLite database and requests a page at increasing depths
+with both `skip` and `cursor`, reporting the median latency of each.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_pagination --rows 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.pagination import encode_cursor
+
+from .seed import bench_app, seed_predictions
+
+
+async def time_request(client: AsyncClient, url: str, repeat: int) -> float:
+    """Return the median latency of `url` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return statistics.median(samples)
+
+
+async def run(database_url: str, rows: int, limit: int, repeat: int) -> None:
+    engine = create_async_engine(database_url, future=True)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    app = bench_app(session_factory)
+    depths = sorted({0, rows // 100, rows // 10, rows // 2, max(rows - limit, 0)})
+
+    print(f"{'depth':>10} | {'offset ms':>10} | {'cursor ms':>10}")
+    print("-" * 36)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for depth in depths:
+            offset_ms = await time_request(
+                client, f"/predictions/?skip={depth}&limit={limit}", repeat
+            )
+            # Ids are assigned sequentially from 1, so the row at `depth` has id == depth
+            cursor = encode_cursor({"id": depth})
+            cursor_ms = await time_request(
+                client, f"/predictions/?cursor={cursor}&limit={limit}", repeat
+            )
+            print(f"{depth:>10} | {offset_ms:>10.2f} | {cursor_ms:>10.2f}")
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000, help="number of predictions to seed"
+    )
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--repeat", type=int, default=20, help="requests per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        started = time.perf_counter()
+        seed_predictions(database_url, args.rows)
+        print(f"Seeded {args.rows} predictions in {time.perf_counter() - started:.1f}s")
+        asyncio.run(run(database_url, args.rows, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Latency of GET /predictions/ pages by page size and sparse fieldset.
+
+Seeds a throwaway SQLite database and requests random cursor pages with the
+response cache disabled, reporting the median latency per configuration.
+Then times the encoding step alone: FastAPI's response_model path (validate
+ORM objects, jsonable_encoder, json.dumps) against the list endpoint's
+column-tuple path.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_serialization --rows 100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import Settings
+from src.models import Prediction
+from src.pagination import encode_cursor
+from src.routers.predictions import PREDICTION_FIELDS, _prediction_rows
+from src.sqldb import create_engine_from_settings
+
+from .seed import bench_app, seed_predictions
+
+CONFIGURATIONS = [
+    (100, None),
+    (100, "id,question,status"),
+    (1000, None),
+    (1000, "id,question,status"),
+]
+
+
+async def run(database_url: str, rows: int, repeat: int) -> None:
+    engine = create_engine_from_settings(Settings(database_url=database_url))
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    app = bench_app(session_factory)
+
+    print(f"{'limit':>6} | {'fields':<20} | {'median ms':>10} | {'bytes':>8}")
+    print("-" * 54)
+    rng = random.Random(42)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for limit, fields in CONFIGURATIONS:
+            samples = []
+            size = 0
+            for _ in range(repeat):
+                params = {
+                    "limit": limit,
+                    "cursor": encode_cursor({"id": rng.randrange(rows - limit)}),
+                }
+                if fields:
+                    params["fields"] = fields
+                started = time.perf_counter()
+                response = await client.get("/predictions/", params=params)
+                samples.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+                size = len(response.content)
+            median = statistics.median(samples)
+            print(f"{limit:>6} | {fields or 'all':<20} | {median:>10.2f} | {size:>8}")
+
+    app.dependency_overrides.clear()
+    await encoding(session_factory, repeat)
+    await engine.dispose()
+
+
+async def best_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def encoding(session_factory, repeat: int) -> None:
+    """Encoding cost alone, on rows already fetched."""
+    field = create_model_field(name="Response", type_=List[Prediction], mode="serialization")
+    columns = [Prediction.__table__.c[name] for name in PREDICTION_FIELDS]
+
+    print(f"\n{'limit':>6} | {'response_model ms':>18} | {'column tuples ms':>17}")
+    print("-" * 48)
+    for limit in sorted({limit for limit, _ in CONFIGURATIONS}):
+        async with session_factory() as session:
+            objects = (await session.execute(select(Prediction).limit(limit))).scalars().all()
+            connection = await session.connection()
+            rows = (await connection.execute(select(*columns).limit(limit))).all()
+
+        async def response_model_path(objects=objects):
+            content = await serialize_response(field=field, response_content=objects)
+            json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+        async def column_tuple_path(rows=rows):
+            _prediction_rows.dump_json([dict(zip(PREDICTION_FIELDS, row)) for row in rows])
+
+        print(
+            f"{limit:>6} | {await best_ms(response_model_path, repeat):>18.2f} | "
+            f"{await best_ms(column_tuple_path, repeat):>17.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=100_000, help="number of predictions to seed")
+    parser.add_argument("--repeat", type=int, default=200, help="requests per configuration")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        seed_predictions(database_url, args.rows)
+        asyncio.run(run(database_url, args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Latency and payload size of prediction history charts.
+
+Seeds a throwaway SQLite database with predictions that each have a long
+update history, then compares, with the response cache disabled:
+
+    expand    GET /predictions/{id}?expand=updates     (one object per update)
+    series    GET /predictions/{id}/series?points=N    (columnar, LTTB downsampled)
+    page      one /series request per id of a dashboard page
+    many      GET /predictions/series?ids=...          (the same page in one query)
+
+Usage (from apps/api):
+    python -m benchmarks.bench_series --predictions 100 --updates-per-prediction 5000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.config import Settings
+from src.sqldb import create_engine_from_settings
+
+from .seed import bench_app, seed_predictions, seed_updates
+
+
+async def run(database_url: str, predictions: int, points: int, page: int, repeat: int) -> None:
+    engine = create_engine_from_settings(Settings(database_url=database_url))
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    app = bench_app(session_factory)
+
+    rng = random.Random(42)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def single(url: str):
+            response = await client.get(url)
+            response.raise_for_status()
+            return len(response.content)
+
+        async def page_of_series(ids):
+            sizes = [await single(f"/predictions/{i}/series?points={points}") for i in ids]
+            return sum(sizes)
+
+        def random_id() -> int:
+            return rng.randrange(predictions) + 1
+
+        def random_page() -> str:
+            return ",".join(str(i) for i in rng.sample(range(1, predictions + 1), page))
+
+        cases = {
+            "expand": lambda: single(f"/predictions/{random_id()}?expand=updates"),
+            "series": lambda: single(f"/predictions/{random_id()}/series?points={points}"),
+            "page": lambda: page_of_series(random_page().split(",")),
+            "many": lambda: single(f"/predictions/series?points={points}&ids={random_page()}"),
+        }
+
+        print(f"{'case':>8} | {'median ms':>10} | {'bytes':>10}")
+        print("-" * 36)
+        for name, case in cases.items():
+            samples = []
+            size = 0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                size = await case()
+                samples.append((time.perf_counter() - started) * 1000)
+            print(f"{name:>8} | {statistics.median(samples):>10.2f} | {size:>10}")
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--predictions", type=int, default=100)
+    parser.add_argument("--updates-per-prediction", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=300, help="downsampling target")
+    parser.add_argument("--page", type=int, default=50, help="predictions per dashboard page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        seed_predictions(database_url, args.predictions)
+        seed_updates(
+            database_url, args.predictions * args.updates_per_prediction, args.predictions
+        )
+        page = min(args.page, args.predictions)
+        asyncio.run(run(database_url, args.predictions, args.points, page, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
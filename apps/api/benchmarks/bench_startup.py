@@ -0,0 +1,99 @@
+"""
+Cold start: import time of the app, `create_app()` and the lifespan startup.
+
+Each run is a fresh interpreter started with `-X importtime` in an empty
+directory, so nothing is cached in-process and stray files would show up.
+Reports the median of `--repeat` runs and the packages that dominate import
+time, and exits with status 1 when importing `src.main` takes longer than
+`--budget-ms`, so a startup regression fails the run.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_startup --repeat 10 --budget-ms 1500
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+API_DIR = Path(__file__).resolve().parents[1]
+
+# Prints the wall time of each phase in ms; importtime lines go to stderr
+PROBE = """
+import asyncio, time
+started = time.perf_counter()
+from src.config import Settings
+from src.main import create_app
+imported = time.perf_counter()
+app = create_app(Settings(database_url="sqlite+aiosqlite:///./startup.db"))
+created = time.perf_counter()
+
+async def lifespan():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(lifespan())
+print((imported - started) * 1000, (created - imported) * 1000, (ready - created) * 1000)
+"""
+
+
+def probe() -> Tuple[List[float], Dict[str, float]]:
+    """One cold start: phase timings in ms and self import time in ms per top-level package."""
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE],
+            cwd=workdir,
+            env={**os.environ, "PYTHONPATH": str(API_DIR)},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    by_package: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        by_package[name.strip().split(".")[0]] += int(self_us) / 1000
+    return [float(value) for value in result.stdout.split()], by_package
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="packages to list")
+    parser.add_argument(
+        "--budget-ms", type=float, default=1500.0, help="max median import time of src.main"
+    )
+    args = parser.parse_args()
+
+    phases = []
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(args.repeat):
+        timings, by_package = probe()
+        phases.append(timings)
+        for name, ms in by_package.items():
+            packages[name].append(ms)
+
+    import_ms, create_ms, lifespan_ms = (statistics.median(phase) for phase in zip(*phases))
+    print(f"import src.main   {import_ms:8.1f} ms  (budget {args.budget_ms:.0f} ms)")
+    print(f"create_app()      {create_ms:8.1f} ms")
+    print(f"lifespan startup  {lifespan_ms:8.1f} ms")
+    print(f"\nSelf import time by package (median of {args.repeat} runs):")
+    medians = {name: statistics.median(samples) for name, samples in packages.items()}
+    for name, ms in sorted(medians.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {name:<24} {ms:8.1f} ms")
+
+    if import_ms > args.budget_ms:
+        print(f"\nImport time {import_ms:.0f} ms exceeds the budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
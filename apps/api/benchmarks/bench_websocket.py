@@ -0,0 +1,176 @@
+"""
+Fan-out latency of prediction events to thousands of WebSocket subscribers.
+
+Opens `--subscribers` in-process ASGI WebSocket connections to
+/predictions/1/events (the real route, middleware and hub), then publishes
+`--events` events at `--interval-ms` spacing, one `need_approval` every
+20 and `progress` otherwise. A share of the clients are slow (each send takes
+`--slow-ms`) and a few are stalled (their sends never complete), as a
+backgrounded browser tab would be.
+
+For each overflow policy it reports:
+
+    publish     time the publisher spends in one publish() call
+    fan-out     publish-to-send latency seen by the healthy clients
+    backlog     largest queue of a slow or stalled client (bounded by the queue size)
+    lagged      `lagged` notices sent, and events dropped or coalesced
+
+Everything runs on one event loop, so fan-out latency includes the
+simulated clients' own work.
+
+Usage (from apps/api):
+    python -m benchmarks.bench_websocket --subscribers 5000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from src.config import get_settings
+from src.events import OverflowPolicy
+from src.main import create_app
+from src.models import EventType
+
+
+class Client:
+    """One ASGI WebSocket connection driven without a server."""
+
+    def __init__(self, app, path: str, send_delay: float = 0.0, stalled: bool = False):
+        self.app = app
+        self.path = path
+        self.send_delay = send_delay
+        self.stalled = stalled
+        self.accepted = asyncio.Event()
+        self.closed = asyncio.get_running_loop().create_future()
+        self.received: List[tuple] = []  # (seq, received at)
+        self.lagged = 0
+        self._connected = False
+
+    async def receive(self) -> dict:
+        if not self._connected:
+            self._connected = True
+            return {"type": "websocket.connect"}
+        await self.closed
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+            return
+        if message["type"] != "websocket.send":
+            return
+        if self.stalled:
+            await asyncio.Event().wait()
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        event = json.loads(message["text"])
+        if event["type"] == EventType.LAGGED:
+            self.lagged += 1
+        else:
+            self.received.append((event["seq"], time.perf_counter()))
+
+    def run(self) -> "asyncio.Task":
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [],
+            "server": ("bench", 80),
+            "client": ("127.0.0.1", 0),
+            "subprotocols": [],
+        }
+        return asyncio.create_task(self.app(scope, self.receive, self.send))
+
+
+def percentile(samples: List[float], quantile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * quantile), len(ordered) - 1)]
+
+
+async def run(args: argparse.Namespace, policy: OverflowPolicy) -> None:
+    app = create_app()
+    event_hub = app.state.event_hub
+    event_hub.policy = policy
+    slow = int(args.subscribers * args.slow_share)
+    clients = [
+        Client(
+            app,
+            "/predictions/1/events",
+            send_delay=args.slow_ms / 1000 if i < slow else 0.0,
+            stalled=i < args.stalled,
+        )
+        for i in range(args.subscribers)
+    ]
+    tasks = [client.run() for client in clients]
+    await asyncio.gather(*(client.accepted.wait() for client in clients))
+    stats_before = event_hub.stats()
+
+    sent_at: Dict[int, float] = {}
+    publish_times = []
+    subscriptions = list(event_hub._subscribers.get(1, ()))  # pylint: disable=protected-access
+    backlog = 0
+    for i in range(args.events):
+        event_type = EventType.NEED_APPROVAL if i % 20 == 19 else EventType.PROGRESS
+        started = time.perf_counter()
+        event = event_hub.publish(1, event_type, {"step": i})
+        publish_times.append(time.perf_counter() - started)
+        sent_at[event.seq] = started
+        backlog = max(backlog, max(len(subscription) for subscription in subscriptions))
+        await asyncio.sleep(args.interval_ms / 1000)
+    # Let healthy clients drain
+    await asyncio.sleep(0.5)
+
+    healthy = clients[slow:]
+    latencies = [
+        (received - sent_at[seq]) * 1000 for client in healthy for seq, received in client.received
+    ]
+    complete = sum(len(client.received) == args.events for client in healthy)
+    stats = event_hub.stats()
+    print(
+        f"{policy.value:>12} | publish p50 {statistics.median(publish_times) * 1000:6.2f} "
+        f"max {max(publish_times) * 1000:6.2f} ms | fan-out p50 {percentile(latencies, 0.5):6.2f} "
+        f"p99 {percentile(latencies, 0.99):7.2f} max {max(latencies):7.2f} ms | "
+        f"{complete}/{len(healthy)} complete | backlog {backlog:>3} | "
+        f"lagged {sum(client.lagged for client in clients):>5} | "
+        f"dropped {stats.dropped - stats_before.dropped:>6} | "
+        f"coalesced {stats.coalesced - stats_before.coalesced:>6}"
+    )
+
+    for client in clients:
+        client.closed.set_result(None)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(
+        f"{args.subscribers} subscribers ({int(args.subscribers * args.slow_share)} slow, "
+        f"{args.stalled} stalled), {args.events} events every {args.interval_ms} ms, "
+        f"queue size {get_settings().event_queue_size}"
+    )
+    for policy in OverflowPolicy:
+        await run(args, policy)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--interval-ms", type=float, default=100.0)
+    parser.add_argument("--slow-share", type=float, default=0.1, help="share of slow clients")
+    parser.add_argument("--slow-ms", type=float, default=100.0, help="duration of a slow send")
+    parser.add_argument("--stalled", type=int, default=10, help="clients that never finish a send")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Insert throughput of updates with sources: a transaction each vs. group commit.
+
+Concurrent producers, like research workers during an update cycle, each
+write `--updates` PredictionUpdates with `--sources` Sources apiece. In
+`direct` mode every update is its own session and transaction, as a worker
+would do today; in the other modes the producers share a `WriteBuffer` with
+that durability. Reports throughput, the latency producers see, the number
+of transactions and how many writes failed (e.g. "database is locked").
+
+Usage (from apps/api):
+    python -m benchmarks.bench_write_buffer --producers 50 --updates 20 --sources 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.config import Settings
+from src.metrics import metrics
+from src.models import PredictionUpdate, Source
+from src.sqldb import create_engine_from_settings
+from src.write_buffer import Durability, WriteBuffer
+
+from .seed import seed_predictions
+
+
+def make_update(producer: int, sources: int):
+    update = PredictionUpdate(prediction_id=producer + 1, likelihood=0.5, reasoning="Benchmark")
+    return update, [
+        Source(
+            title=f"Source {i}",
+            url=f"https://example.com/{i}",
+            summary="Synthetic source used for benchmarking",
+            credibility=0.5,
+            relevance=0.5,
+            reasoning="Relevant",
+        )
+        for i in range(sources)
+    ]
+
+
+async def direct(engine: AsyncEngine, producer: int, sources: int) -> None:
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    update, rows = make_update(producer, sources)
+    async with session_factory() as session:
+        session.add(update)
+        await session.flush()
+        for row in rows:
+            row.update_id = update.id
+        session.add_all(rows)
+        await session.commit()
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        seed_predictions(database_url, args.producers)
+        engine = create_engine_from_settings(Settings(database_url=database_url))
+        buffer = None
+        if mode != "direct":
+            buffer = WriteBuffer(
+                engine,
+                max_rows=args.batch_rows,
+                max_delay_ms=args.delay_ms,
+                durability=Durability(mode),
+            )
+            buffer.start()
+        metrics.reset()
+
+        latencies: List[float] = []
+        failures = 0
+
+        async def producer(index: int) -> None:
+            nonlocal failures
+            for _ in range(args.updates):
+                started = time.perf_counter()
+                try:
+                    if buffer is None:
+                        await direct(engine, index, args.sources)
+                    else:
+                        await buffer.write(*make_update(index, args.sources))
+                except OperationalError:
+                    failures += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(producer(i) for i in range(args.producers)))
+        if buffer is not None:
+            await buffer.stop()
+        elapsed = time.perf_counter() - started
+        await engine.dispose()
+
+    commits = metrics.write_batch_rows.render()
+    transactions = (
+        next(
+            int(line.split()[-1])
+            for line in commits
+            if line.startswith("db_write_batch_rows_count")
+        )
+        if buffer is not None
+        else len(latencies)
+    )
+    latencies.sort()
+    print(
+        f"{mode:>10} | {len(latencies) / elapsed:10.0f} | {statistics.median(latencies):8.1f} | "
+        f"{latencies[int(len(latencies) * 0.99)]:8.1f} | {transactions:6d} | {failures:6d}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    total = args.producers * args.updates
+    print(f"{total} updates with {args.sources} sources each from {args.producers} producers\n")
+    columns = ("updates/s", "p50 ms", "p99 ms", "txns", "failed")
+    print(f"{'mode':>10} | " + " | ".join(f"{c:>{w}}" for c, w in zip(columns, (10, 8, 8, 6, 6))))
+    print("-" * 64)
+    for mode in args.modes.split(","):
+        await run_mode(mode, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--producers", type=int, default=50)
+    parser.add_argument("--updates", type=int, default=20, help="updates per producer")
+    parser.add_argument("--sources", type=int, default=5, help="sources per update")
+    parser.add_argument("--batch-rows", type=int, default=500)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    parser.add_argument("--modes", default="direct,buffered,committed,synced")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
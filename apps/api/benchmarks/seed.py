@@ -0,0 +1,155 @@
+"""
+Synthetic data seeding for benchmarks.
+
+Creates the schema from the SQLModel metadata and bulk-inserts generated rows
+through a synchronous engine so that seeding a million rows takes seconds
+rather than minutes. `bench_app` builds the app the API benchmarks request.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from src import models  # pylint: disable=unused-import
+from src.main import create_app
+from src.models import (
+    HumanReview,
+    Prediction,
+    PredictionStatus,
+    PredictionUpdate,
+    ReviewDecision,
+    Source,
+)
+from src.sqldb import get_read_session, get_session
+
+BATCH_SIZE = 10_000
+
+
+def sync_url(database_url: str) -> str:
+    """Turn an async SQLite URL into its synchronous equivalent."""
+    return database_url.replace("sqlite+aiosqlite", "sqlite", 1)
+
+
+def seed_predictions(database_url: str, rows: int, seed: int = 42) -> None:
+    """Create the schema and insert `rows` predictions with mixed statuses."""
+    rng = random.Random(seed)
+    statuses = list(PredictionStatus)
+    start = datetime(2024, 1, 1)
+
+    engine = create_engine(sync_url(database_url))
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for offset in range(0, rows, BATCH_SIZE):
+            batch = []
+            for i in range(offset, min(offset + BATCH_SIZE, rows)):
+                status = rng.choice(statuses)
+                resolved = status == PredictionStatus.RESOLVED
+                batch.append(
+                    {
+                        "question": f"Benchmark question #{i}?",
+                        "description": "Synthetic prediction used for benchmarking",
+                        "known_date": date(2026, 1, 1) + timedelta(days=i % 1000),
+                        "require_review": rng.random() < 0.5,
+                        "status": status,
+                        "outcome": rng.random() < 0.4 if resolved else None,
+                        "resolved_at": (
+                            datetime(2026, 6, 1) + timedelta(seconds=i) if resolved else None
+                        ),
+                        "created_at": start + timedelta(seconds=i),
+                    }
+                )
+            conn.execute(insert(Prediction), batch)
+    engine.dispose()
+
+
+def seed_updates(database_url: str, rows: int, predictions: int, seed: int = 42) -> None:
+    """Insert `rows` updates spread round-robin over predictions 1..`predictions`."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+
+    engine = create_engine(sync_url(database_url))
+    with engine.begin() as conn:
+        for offset in range(0, rows, BATCH_SIZE):
+            batch = [
+                {
+                    "prediction_id": i % predictions + 1,
+                    "likelihood": rng.random(),
+                    "reasoning": "Synthetic update used for benchmarking",
+                    "created_at": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, rows))
+            ]
+            conn.execute(insert(PredictionUpdate), batch)
+    engine.dispose()
+
+
+def seed_sources(database_url: str, rows: int, updates: int, seed: int = 42) -> None:
+    """Insert `rows` sources spread round-robin over updates 1..`updates`."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+
+    engine = create_engine(sync_url(database_url))
+    with engine.begin() as conn:
+        for offset in range(0, rows, BATCH_SIZE):
+            batch = [
+                {
+                    "update_id": i % updates + 1,
+                    "title": f"Benchmark source #{i}",
+                    "url": f"https://example.com/articles/{i}",
+                    "summary": "Synthetic source summary used for benchmarking",
+                    "credibility": rng.random(),
+                    "relevance": rng.random(),
+                    "reasoning": "Synthetic source used for benchmarking",
+                    "created_at": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, rows))
+            ]
+            conn.execute(insert(Source), batch)
+    engine.dispose()
+
+
+def seed_reviews(database_url: str, rows: int, updates: int, seed: int = 42) -> None:
+    """Insert one review each for `rows` updates, spaced evenly over updates 1..`updates`."""
+    rng = random.Random(seed)
+    decisions = list(ReviewDecision)
+    start = datetime(2024, 1, 1)
+    rows = min(rows, updates)
+    step = updates / rows if rows else 1
+
+    engine = create_engine(sync_url(database_url))
+    with engine.begin() as conn:
+        for offset in range(0, rows, BATCH_SIZE):
+            batch = [
+                {
+                    "update_id": int(i * step) + 1,
+                    "name": rng.choice(["Zilong", "Ada", "Grace"]),
+                    "decision": rng.choice(decisions),
+                    "feedback": "Synthetic review used for benchmarking",
+                    "created_at": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, rows))
+            ]
+            conn.execute(insert(HumanReview), batch)
+    engine.dispose()
+
+
+def bench_app(session_factory: sessionmaker) -> FastAPI:
+    """The app with every session from `session_factory` and no response cache.
+
+    Requests are repeated, so with the cache they would measure cache hits
+    instead of the queries and encoding under test.
+    """
+
+    async def override_get_session():
+        async with session_factory() as session:
+            yield session
+
+    app = create_app()
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.state.response_cache.max_entries = 0
+    return app
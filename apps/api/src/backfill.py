@@ -0,0 +1,214 @@
+"""
+Resumable, chunked data migrations for large tables.
+
+A single `UPDATE` or `INSERT ... SELECT` over a big SQLite table holds the
+writer lock for the whole statement, so every API write waits (or fails
+with "database is locked") until it finishes. `run_chunked` instead runs
+a statement once per range of the table's integer key, each range in its
+own short transaction, and sleeps between chunks so waiting writers get
+the lock.
+
+The statement selects its rows with the `:lo` (exclusive) and `:hi`
+(inclusive) bind parameters::
+
+    UPDATE prediction SET status = 'reviewed'
+    WHERE id > :lo AND id <= :hi AND status = 'approved'
+
+Progress is stored in `backfill_progress` in the same transaction as each
+chunk, so an interrupted run resumes after the last committed chunk, and
+the row is deleted once the run completes. Statements must be idempotent
+(as above): a migration that fails after the backfill runs it again.
+
+In a migration, call `migrate_in_chunks`; it takes its overrides from
+alembic's `-x` arguments::
+
+    alembic -x backfill_dry_run=true -x backfill_chunk_size=5000 upgrade head
+
+Keep backfills in their own revision after the schema change, since the
+chunks are committed before alembic stamps the revision.
+"""
+
+import logging
+import statistics
+import time
+from typing import List, NamedTuple, Optional
+
+from alembic import context, op
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("varinaut.backfill")
+
+PROGRESS_TABLE = "backfill_progress"
+
+_SAVE_PROGRESS = text(
+    f"INSERT INTO {PROGRESS_TABLE} (name, last_key, rows) VALUES (:name, :last_key, :rows) "
+    f"ON CONFLICT (name) DO UPDATE SET last_key = excluded.last_key, "
+    f"rows = {PROGRESS_TABLE}.rows + excluded.rows, updated_at = CURRENT_TIMESTAMP"
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_PAUSE_SECONDS = 0.05
+
+
+class BackfillReport(NamedTuple):
+    name: str
+    rows: int  # rows affected, as reported by the database
+    chunks: int
+    seconds: float
+    max_chunk_ms: float  # longest time the writer lock was held
+    median_chunk_ms: float
+    resumed_after: Optional[int]  # key of the last chunk committed by an earlier run
+    dry_run: bool
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        resumed = (
+            f", resumed after key {self.resumed_after}" if self.resumed_after is not None else ""
+        )
+        dry_run = " (dry run, rolled back)" if self.dry_run else ""
+        return (
+            f"{self.name}: {self.rows} rows in {self.chunks} chunks, {self.seconds:.2f}s "
+            f"({self.rows_per_second:.0f} rows/s), lock held p50 {self.median_chunk_ms:.1f} ms "
+            f"max {self.max_chunk_ms:.1f} ms{resumed}{dry_run}"
+        )
+
+
+class BackfillDryRun(Exception):
+    """Stops a migration after a dry run, so alembic does not stamp the revision."""
+
+    def __init__(self, report: BackfillReport):
+        super().__init__(f"Dry run, nothing was changed: {report}")
+        self.report = report
+
+
+def _chunk_end(connection: Connection, table: str, key: str, after: int, size: int):
+    # Seeks the key index instead of assuming the keys are dense
+    return connection.execute(
+        text(
+            f"SELECT MAX({key}) FROM "
+            f"(SELECT {key} FROM {table} WHERE {key} > :after ORDER BY {key} LIMIT :size)"
+        ),
+        {"after": after, "size": size},
+    ).scalar()
+
+
+def run_chunked(
+    connection: Connection,
+    name: str,
+    table: str,
+    statement: str,
+    *,
+    key: str = "id",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause_seconds: float = DEFAULT_PAUSE_SECONDS,
+    dry_run: bool = False,
+) -> BackfillReport:
+    """Run `statement` over `table` in key ranges of at most `chunk_size` rows.
+
+    `connection` must use the AUTOCOMMIT isolation level: every chunk is its
+    own `BEGIN IMMEDIATE` transaction, which takes the writer lock up front
+    and commits the chunk together with its progress under `name`. With
+    `dry_run` every chunk is rolled back instead and no progress is recorded,
+    which measures the run without changing data.
+    """
+    if connection.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+        raise ValueError("run_chunked needs a connection with isolation_level='AUTOCOMMIT'")
+
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} ("
+            "name VARCHAR PRIMARY KEY, last_key INTEGER NOT NULL, rows INTEGER NOT NULL, "
+            "updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+    )
+    resumed_after = None
+    if not dry_run:
+        resumed_after = connection.execute(
+            text(f"SELECT last_key FROM {PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+        ).scalar()
+    last_key = resumed_after if resumed_after is not None else -(2**63)
+
+    rows = 0
+    chunk_ms: List[float] = []
+    started = time.perf_counter()
+    while True:
+        chunk_started = time.perf_counter()
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            end = _chunk_end(connection, table, key, last_key, chunk_size)
+            if end is None:
+                connection.exec_driver_sql("ROLLBACK")
+                break
+            chunk_rows = connection.execute(text(statement), {"lo": last_key, "hi": end}).rowcount
+            if not dry_run:
+                progress = {"name": name, "last_key": end, "rows": chunk_rows}
+                connection.execute(_SAVE_PROGRESS, progress)
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("ROLLBACK" if dry_run else "COMMIT")
+        chunk_ms.append((time.perf_counter() - chunk_started) * 1000)
+        rows += chunk_rows
+        last_key = end
+        logger.debug("%s: chunk up to %s=%s, %d rows so far", name, key, end, rows)
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    if not dry_run:
+        connection.execute(
+            text(f"DELETE FROM {PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+        )
+    return BackfillReport(
+        name=name,
+        rows=rows,
+        chunks=len(chunk_ms),
+        seconds=time.perf_counter() - started,
+        max_chunk_ms=max(chunk_ms, default=0.0),
+        median_chunk_ms=statistics.median(chunk_ms) if chunk_ms else 0.0,
+        resumed_after=resumed_after,
+        dry_run=dry_run,
+    )
+
+
+def migrate_in_chunks(
+    name: str,
+    table: str,
+    statement: str,
+    *,
+    key: str = "id",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    pause_seconds: float = DEFAULT_PAUSE_SECONDS,
+) -> Optional[BackfillReport]:
+    """`run_chunked` on the migration's connection, logging the report.
+
+    `-x backfill_chunk_size=N`, `-x backfill_pause=SECONDS` and
+    `-x backfill_dry_run=true` override the arguments; a dry run raises
+    `BackfillDryRun` after the report. When generating SQL offline, the
+    statement is emitted once for the whole key range instead.
+    """
+    if context.is_offline_mode():
+        op.execute(text(statement).bindparams(lo=-(2**63), hi=2**63 - 1))
+        return None
+
+    options = context.get_x_argument(as_dictionary=True)
+    dry_run = options.get("backfill_dry_run", "").lower() in ("1", "true", "yes")
+    # Commits the migration so far; each chunk then commits on its own
+    with context.get_context().autocommit_block():
+        report = run_chunked(
+            op.get_bind(),
+            name,
+            table,
+            statement,
+            key=key,
+            chunk_size=int(options.get("backfill_chunk_size", chunk_size)),
+            pause_seconds=float(options.get("backfill_pause", pause_seconds)),
+            dry_run=dry_run,
+        )
+    logger.info("%s", report)
+    if dry_run:
+        raise BackfillDryRun(report)
+    return report
@@ -0,0 +1,184 @@
+"""
+In-process response cache with ETags for prediction reads.
+
+Serialized responses are cached under their path and normalized query
+string with an LRU bound and a TTL. Every entry carries tags naming the rows
+it was built from; write endpoints invalidate those tags after committing.
+ETags are derived from the (id, timestamp) versions of the rows in a
+response, so `If-None-Match` on a cached entry is answered with 304 without
+opening a database connection.
+
+`create_app` builds one cache per app, as `app.state.response_cache`;
+endpoints get it with `Depends(get_response_cache)`. The cache is therefore
+per process: with several workers each keeps its own copy and only sees its
+own invalidations, so the TTL bounds staleness across workers.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from .models import CacheStats
+
+# Tag of every cached list page; any prediction write can change list results
+PREDICTION_LIST_TAG = "predictions"
+
+# Clients must revalidate with If-None-Match before reusing a response
+CACHE_CONTROL = "private, no-cache"
+
+RowVersion = Tuple[str, int, Optional[datetime]]
+
+
+def prediction_tag(prediction_id: int) -> str:
+    return f"prediction:{prediction_id}"
+
+
+def cache_key(request: Request) -> str:
+    """Path plus query parameters in a canonical order."""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def make_etag(key: str, versions: Iterable[RowVersion]) -> str:
+    """Strong ETag over the request key and the version of every row in the response."""
+    digest = hashlib.blake2b(key.encode(), digest_size=16)
+    for kind, row_id, updated_at in versions:
+        digest.update(f"|{kind}:{row_id}@{updated_at.isoformat() if updated_at else ''}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag over a response body, for responses built from too many rows to list."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def row_version(kind: str, row) -> RowVersion:
+    """Version of a table row: the latest of its timestamps.
+
+    For predictions this includes `last_updated_at`, which triggers change
+    without touching `updated_at`.
+    """
+    stamps = [
+        stamp
+        for stamp in (row.created_at, row.updated_at, getattr(row, "last_updated_at", None))
+        if stamp is not None
+    ]
+    return kind, row.id, max(stamps) if stamps else None
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    tags: FrozenSet[str]
+    expires_at: float
+
+
+class ResponseCache:
+    """LRU + TTL cache of serialized responses with tag-based invalidation."""
+
+    def __init__(self, max_entries: int = 0, ttl_seconds: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        # Bumped by every invalidation; a response built from reads that
+        # started before a write is not stored after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        etag: str,
+        *,
+        tags: Iterable[str],
+        generation: int,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> CachedResponse:
+        """Store a response unless the cache was invalidated after `generation` was read."""
+        entry = CachedResponse(
+            body, etag, headers or {}, frozenset(tags), time.monotonic() + self.ttl_seconds
+        )
+        if not self.enabled or generation != self.generation:
+            return entry
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of `tags`."""
+        self.generation += 1
+        doomed = set(tags)
+        stale = [key for key, entry in self._entries.items() if entry.tags & doomed]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.generation += 1
+        self.hits = self.misses = self.not_modified = self.evictions = self.invalidations = 0
+
+    def stats(self) -> CacheStats:
+        lookups = self.hits + self.misses
+        return CacheStats(
+            entries=len(self._entries),
+            max_entries=self.max_entries,
+            ttl_seconds=self.ttl_seconds,
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+            not_modified=self.not_modified,
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+        )
+
+    def respond(self, request: Request, entry: CachedResponse) -> Response:
+        """200 with the cached body, or 304 if the client already has this ETag."""
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (
+            if_none_match.strip() == "*" or entry.etag in _parse_etags(if_none_match)
+        ):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _parse_etags(header: str) -> Iterable[str]:
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+async def get_response_cache(request: Request) -> ResponseCache:
+    return request.app.state.response_cache
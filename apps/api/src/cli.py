@@ -0,0 +1,176 @@
+"""
+Command-line tools for Varinaut API maintenance.
+
+Usage (from apps/api):
+    python -m src.cli load-predictions predictions.jsonl [--chunk-size N]
+    python -m src.cli rebuild-brier
+    python -m src.cli archive [--older-than-days N] [--batch-size N] [--no-compact]
+    python -m src.cli prune-tombstones [--older-than-days N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Any, List, Optional
+
+from .config import get_settings
+from .sqldb import Database
+from .services.archive_service import archive_resolved, compact
+from .services.brier_service import rebuild_brier_aggregates
+from .services.changes_service import prune_tombstones
+from .services.prediction_service import create_predictions
+
+
+def _parse_line(line: str) -> Any:
+    """Parse one JSONL line, passing undecodable lines through as-is so they fail validation."""
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return line
+
+
+async def load_predictions(path: Path, chunk_size: int) -> int:
+    """Load predictions from a JSONL file, one `PredictionPost` object per line.
+
+    Returns the number of rows that failed.
+    """
+    db = Database(get_settings())
+    created = failed = 0
+    with open(path, encoding="utf-8") as f:
+        entries = (
+            (lineno, _parse_line(line)) for lineno, line in enumerate(f, start=1) if line.strip()
+        )
+        while chunk := list(islice(entries, chunk_size)):
+            # One transaction per chunk keeps memory and lock time bounded for large files
+            async with db.session() as session:
+                result = await create_predictions(
+                    session, [row for _, row in chunk], chunk_size=chunk_size
+                )
+            created += len(result.created)
+            failed += len(result.errors)
+            for error in result.errors:
+                messages = "; ".join(e["msg"] for e in error.errors)
+                print(f"{path}:{chunk[error.index][0]}: {messages}", file=sys.stderr)
+
+    await db.dispose()
+    print(f"Created {created} predictions, {failed} failed")
+    return failed
+
+
+async def rebuild_brier() -> None:
+    """Recompute the Brier aggregates from all resolved predictions."""
+    db = Database(get_settings())
+    async with db.session() as session:
+        scored = await rebuild_brier_aggregates(session)
+    await db.dispose()
+    print(f"Rebuilt Brier aggregates from {scored} resolved predictions")
+
+
+async def archive(older_than_days: int, batch_size: int, compact_after: bool) -> int:
+    """Move predictions resolved more than `older_than_days` ago into the archive database.
+
+    Returns 1 when no archive database is configured.
+    """
+    settings = get_settings()
+    if not settings.archive_database_path:
+        print("ARCHIVE_DATABASE_PATH is not set", file=sys.stderr)
+        return 1
+
+    db = Database(settings)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    async with db.session() as session:
+        report = await archive_resolved(session, cutoff, batch_size=batch_size)
+    print(
+        f"Archived {report.predictions} predictions resolved before {cutoff:%Y-%m-%d} "
+        f"({report.updates} updates, {report.sources} sources, {report.reviews} reviews)"
+    )
+    if compact_after and report.predictions:
+        path = db.engine.url.database
+        before = os.path.getsize(path) / 2**20
+        await compact(db.engine)
+        after = os.path.getsize(path) / 2**20
+        print(f"Compacted {path}: {before:.1f} MiB -> {after:.1f} MiB")
+    await db.dispose()
+    return 0
+
+
+async def prune(older_than_days: int) -> None:
+    """Delete tombstones of rows deleted more than `older_than_days` ago."""
+    db = Database(get_settings())
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    async with db.session() as session:
+        pruned = await prune_tombstones(session, cutoff)
+    await db.dispose()
+    print(f"Pruned {pruned} tombstones of rows deleted before {cutoff:%Y-%m-%d}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Varinaut API tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = subparsers.add_parser(
+        "load-predictions", help="bulk load predictions from a JSONL file"
+    )
+    load_parser.add_argument("path", type=Path, help="JSONL file with one prediction per line")
+    load_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=get_settings().batch_chunk_size,
+        help="rows per INSERT statement (default: %(default)s)",
+    )
+
+    subparsers.add_parser("rebuild-brier", help="recompute Brier score aggregates from scratch")
+
+    archive_parser = subparsers.add_parser(
+        "archive", help="move old resolved predictions into the archive database"
+    )
+    archive_parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=get_settings().archive_after_days,
+        help="archive predictions resolved more than this many days ago (default: %(default)s)",
+    )
+    archive_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="predictions moved per transaction (default: %(default)s)",
+    )
+    archive_parser.add_argument(
+        "--no-compact",
+        dest="compact",
+        action="store_false",
+        help="skip the VACUUM that shrinks the hot database afterwards",
+    )
+
+    prune_parser = subparsers.add_parser(
+        "prune-tombstones", help="forget old deletes that `GET /changes` reports"
+    )
+    prune_parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=get_settings().changes_retention_days,
+        help="prune tombstones older than this many days; older sync tokens expire "
+        "(default: %(default)s)",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "load-predictions":
+        failed = asyncio.run(load_predictions(args.path, args.chunk_size))
+        return 1 if failed else 0
+    if args.command == "rebuild-brier":
+        asyncio.run(rebuild_brier())
+    if args.command == "archive":
+        return asyncio.run(archive(args.older_than_days, args.batch_size, args.compact))
+    if args.command == "prune-tombstones":
+        asyncio.run(prune(args.older_than_days))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
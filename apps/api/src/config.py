@@ -1,23 +1,110 @@
 from functools import lru_cache
+from typing import Dict, Optional
 
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+class SourceLimits(BaseModel):
+    """Client-side limits for one research source provider."""
+
+    rate: float = Field(gt=0)  # requests per second, on average
+    burst: int = Field(default=1, ge=1)  # requests allowed at once after a quiet spell
+    concurrency: int = Field(default=4, ge=1)  # requests in flight
+
+
 class Settings(BaseSettings):
     app_name: str = "Varinaut API"
     debug: bool = True
     database_url: str = "sqlite+aiosqlite:///./varinautsqlite.db"
 
+    # Database engine
+    db_echo: bool = False  # log every SQL statement; independent of `debug`
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: float = 30.0
+    db_read_pool_size: int = 10
+    db_read_max_overflow: int = 10
+
+    # SQLite pragmas applied to every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+
+    # Query monitoring
+    slow_query_ms: float = 200.0  # log statements slower than this; 0 disables
+    slow_query_explain: bool = True  # include EXPLAIN QUERY PLAN in slow-query logs
+    # warn when one request repeats a statement this often; 0 disables
+    n_plus_one_threshold: int = 10
+
+    # Response cache for prediction reads (per process); 0 entries or TTL disables it
+    response_cache_max_entries: int = 2048
+    response_cache_ttl_seconds: float = 30.0
+
+    # WebSocket progress events: per-subscriber queue bound, and what to do when
+    # it is full ("coalesce" keeps only the latest progress event, "drop_oldest")
+    event_queue_size: int = 64
+    event_overflow_policy: str = "coalesce"
+    # Bearer token the research agent publishes events with; "" disables
+    # `POST /predictions/{id}/events`
+    agent_api_key: str = ""
+
+    # Archival tier: SQLite file attached to every connection as `archive`
+    # ("" disables); `python -m src.cli archive` moves predictions resolved
+    # more than `archive_after_days` ago into it
+    archive_database_path: str = ""
+    archive_after_days: int = 365
+
+    # Group commit of PredictionUpdate/Source inserts: flush every
+    # `write_batch_rows` rows or `write_batch_delay_ms` after the first one;
+    # durability is "buffered", "committed" or "synced" (see write_buffer.py)
+    write_batch_rows: int = 500
+    write_batch_delay_ms: float = 20.0
+    write_buffer_max_pending: int = 10_000
+    write_durability: str = "committed"
+
+    # `GET /changes` delta sync: tokens trail the newest change by
+    # `changes_settle_seconds` and expire after `changes_retention_days`, when
+    # `prune-tombstones` may drop their deletes. The settle window defaults to
+    # the busy timeout, so rows stamped before waiting for the write lock are
+    # not skipped, plus a second for `updated_at`, which CURRENT_TIMESTAMP
+    # truncates to whole seconds
+    changes_settle_seconds: Optional[float] = None
+    changes_retention_days: int = 30
+
+    # Bulk ingest
+    batch_chunk_size: int = 500
+
     # Logging
     log_level: str = "INFO"
     log_dir: str = "logs"
+    log_format: str = "text"  # "text" or "json"
+    # logger name -> max records/s, e.g. {"varinaut.services": 50}
+    log_rate_limits: Dict[str, float] = {}
+
+    # Research sources: one pooled HTTP client per process; provider name ->
+    # limits, e.g. SOURCE_LIMITS='{"x": {"rate": 0.5, "burst": 5, "concurrency": 2}}'
+    source_max_connections: int = 100
+    source_timeout_seconds: float = 30.0
+    source_max_retries: int = 3
+    source_limits: Dict[str, SourceLimits] = {
+        "ai_model": SourceLimits(rate=2.0, burst=5, concurrency=8),
+        "x": SourceLimits(rate=0.5, burst=5, concurrency=2),  # 450 searches / 15 min
+        "polymarket": SourceLimits(rate=10.0, burst=20, concurrency=8),
+        "google": SourceLimits(rate=1.0, burst=5, concurrency=4),
+    }
 
     ai_model_name: str = ""
     ai_model_api_key: str = ""
     ai_model_api_url: str = ""
+    x_api_url: str = "https://api.x.com/2"
     x_api_key: str = ""
     x_api_secret: str = ""
+    polymarket_api_url: str = "https://gamma-api.polymarket.com"
     polymarket_api_key: str = ""
+    google_cse_url: str = "https://www.googleapis.com/customsearch/v1"
     google_api_key: str = ""
     google_cse_id: str = ""
 
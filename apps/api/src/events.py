@@ -0,0 +1,177 @@
+"""
+In-process pub/sub of prediction events for WebSocket clients.
+
+Research jobs publish `progress` and `need_approval` events per prediction
+with `EventHub.publish()` on the app's hub, `app.state.event_hub` (or
+`Depends(get_event_hub)`), or over HTTP with `POST /predictions/{id}/events`;
+every new update of a prediction is published as a `progress` event too.
+Every WebSocket subscribed to that prediction receives them. Publishing
+never waits on a subscriber: each event is encoded to JSON once and appended
+to every subscriber's bounded queue, so a slow browser tab costs the
+publisher one append and never more than `event_queue_size` pending
+messages of memory.
+
+When a queue is full the oldest pending event is evicted and the subscriber
+later receives a `lagged` event with the number it missed, so it can refetch
+state over HTTP. With the "coalesce" policy a new progress event also
+replaces the one still pending for the same subscriber, since clients only
+render the latest progress; `need_approval` events are never coalesced.
+
+Like the response cache, `create_app` builds one hub per app, so the hub is
+per process: events published in one worker only reach WebSockets connected
+to that worker, and the agent's HTTP events only reach sockets on the
+worker that serves the request. `publish` must be called from the event
+loop thread.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Deque, Dict, Iterator, Optional, Set, Tuple
+
+from fastapi.requests import HTTPConnection
+
+from .models import EventHubStats, EventType, PredictionEvent
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+
+
+# Event types where a newer event makes a pending one obsolete
+COALESCED_TYPES = frozenset({EventType.PROGRESS})
+
+
+class Subscription:
+    """One subscriber's bounded queue of encoded events."""
+
+    def __init__(self, prediction_id: int, max_size: int, policy: OverflowPolicy):
+        self.prediction_id = prediction_id
+        self.max_size = max_size
+        self.policy = policy
+        # (type, seq, encoded message); one tuple shared by every subscriber of an event
+        self._pending: Deque[Tuple[EventType, int, str]] = deque()
+        self._ready = asyncio.Event()
+        self.missed = 0  # dropped since the last message was taken
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def offer(self, entry: Tuple[EventType, int, str]) -> Tuple[bool, bool]:
+        """Queue `entry` without waiting; returns (replaced a pending one, evicted one)."""
+        pending = self._pending
+        event_type = entry[0]
+        coalesced = dropped = False
+        if self.policy == OverflowPolicy.COALESCE and event_type in COALESCED_TYPES:
+            for index, (pending_type, _, _) in enumerate(pending):
+                if pending_type == event_type:
+                    del pending[index]
+                    coalesced = True
+                    break
+        if len(pending) >= self.max_size:
+            pending.popleft()
+            self.missed += 1
+            dropped = True
+        pending.append(entry)
+        self._ready.set()
+        return coalesced, dropped
+
+    async def get(self) -> str:
+        """Next message, waiting for one; a `lagged` notice comes first after drops."""
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+        if self.missed:
+            missed, self.missed = self.missed, 0
+            return PredictionEvent(
+                type=EventType.LAGGED,
+                prediction_id=self.prediction_id,
+                # Seq of the next event delivered, so clients can tell where the gap ends
+                seq=self._pending[0][1],
+                data={"missed": missed},
+            ).model_dump_json()
+        return self._pending.popleft()[2]
+
+
+class EventHub:
+    """Fan-out of prediction events to bounded per-subscriber queues."""
+
+    def __init__(
+        self, max_queue_size: int = 64, policy: OverflowPolicy = OverflowPolicy.COALESCE
+    ):
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._seq: Dict[int, int] = {}
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def subscribe(self, prediction_id: int) -> Subscription:
+        subscription = Subscription(prediction_id, self.max_queue_size, self.policy)
+        self._subscribers.setdefault(prediction_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.prediction_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.prediction_id]
+
+    @contextmanager
+    def subscription(self, prediction_id: int) -> Iterator[Subscription]:
+        subscription = self.subscribe(prediction_id)
+        try:
+            yield subscription
+        finally:
+            self.unsubscribe(subscription)
+
+    def publish(
+        self, prediction_id: int, event_type: EventType, data: Optional[Dict[str, Any]] = None
+    ) -> PredictionEvent:
+        """Send an event to every current subscriber of the prediction without waiting."""
+        seq = self._seq.get(prediction_id, 0) + 1
+        self._seq[prediction_id] = seq
+        event = PredictionEvent(
+            type=event_type, prediction_id=prediction_id, seq=seq, data=data or {}
+        )
+        self.published += 1
+
+        subscribers = self._subscribers.get(prediction_id)
+        if not subscribers:
+            return event
+        # Encoded once and queued as the same tuple everywhere: allocating per
+        # subscriber made fan-out to thousands of sockets GC-bound
+        entry = (event_type, seq, event.model_dump_json())
+        for subscription in subscribers:
+            coalesced, dropped = subscription.offer(entry)
+            self.coalesced += coalesced
+            self.dropped += dropped
+        self.delivered += len(subscribers)
+        return event
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def stats(self) -> EventHubStats:
+        return EventHubStats(
+            subscribers=self.subscriber_count,
+            topics=len(self._subscribers),
+            max_queue_size=self.max_queue_size,
+            overflow_policy=self.policy.value,
+            published=self.published,
+            delivered=self.delivered,
+            coalesced=self.coalesced,
+            dropped=self.dropped,
+        )
+
+
+async def get_event_hub(connection: HTTPConnection) -> EventHub:
+    """The app's hub, for HTTP and WebSocket endpoints alike."""
+    return connection.app.state.event_hub
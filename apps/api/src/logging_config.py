@@ -2,39 +2,179 @@
 Logging configuration for Varinaut API.
 
 Provides a unified logging setup with:
+- Non-blocking emission: loggers only enqueue records, a background thread
+  does the file and console I/O (including rotation)
 - Rotating file handler (prevents unbounded log growth)
 - Console output for development
-- Consistent formatting across all modules
+- Plain text or structured JSON formatting
+- Optional per-logger rate limits so bursts can't flood the handlers
 """
 
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
+import queue
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
+TEXT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None)))
+_RECORD_ATTRS |= {"message", "asctime"}
+
+
+class _LoggingState:
+    """The running setup, so `setup_logging` can replace it and `stop_logging` undo it."""
+
+    listener: Optional[logging.handlers.QueueListener] = None
+    queue_handler: Optional[logging.Handler] = None
+
+
+_state = _LoggingState()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Fields passed through `extra=` are included as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        created = datetime.fromtimestamp(record.created, timezone.utc)
+        entry = {
+            "timestamp": created.isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token-bucket limit on records per second, per configured logger.
+
+    `rates` maps logger names to records per second; a limit applies to that
+    logger and its children, the most specific name winning. Each bucket
+    holds up to one second's worth of records so short bursts still pass.
+    WARNING and above are never dropped.
+    """
+
+    def __init__(self, rates: Mapping[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.dropped: Dict[str, int] = {}
+        self._buckets: Dict[str, list] = {}  # name -> [tokens, last refill]
+        self._lock = threading.Lock()
+
+    def _limit_for(self, name: str) -> Optional[str]:
+        while name:
+            if name in self.rates:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        limited = self._limit_for(record.name)
+        if limited is None:
+            return True
+
+        rate = self.rates[limited]
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(limited, [rate, now])
+            bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+            self.dropped[limited] = self.dropped.get(limited, 0) + 1
+            return False
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message.
+
+    The stock `prepare` merges the traceback into `msg`; keeping it in
+    `exc_text` lets the listener's formatter (e.g. JSON) place it itself.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Other handlers of the same logger still get the caller's record as is
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background logging thread."""
+    if _state.queue_handler is not None:
+        logging.getLogger().removeHandler(_state.queue_handler)
+        _state.queue_handler = None
+    if _state.listener is not None:
+        _state.listener.stop()
+        for handler in _state.listener.handlers:
+            handler.close()
+        _state.listener = None
 
 
 def setup_logging(
+    *,
     log_dir: Path = Path("logs"),
     log_level: int = logging.INFO,
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
     backup_count: int = 5,
-) -> None:
+    json_format: bool = False,
+    rate_limits: Optional[Mapping[str, float]] = None,
+) -> logging.handlers.QueueListener:
     """
     Configure application-wide logging.
 
+    The root logger gets a single queue handler; the file and console
+    handlers run on a QueueListener thread, so logging from request handlers
+    never blocks the event loop on I/O. Calling this again replaces the
+    previous setup.
+
     Args:
         log_dir: Directory for log files (created if doesn't exist)
         log_level: Minimum log level to capture
         max_bytes: Max size per log file before rotation
         backup_count: Number of rotated files to keep
+        json_format: Emit one JSON object per line instead of plain text
+        rate_limits: Max records per second keyed by logger name (see RateLimitFilter)
+
+    Returns:
+        The running QueueListener; it is also stopped automatically at exit.
     """
+    stop_logging()
+
     log_dir.mkdir(exist_ok=True)
     log_file = log_dir / "varinaut.log"
 
-    # Format: timestamp | level | logger name | message
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if json_format:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        # Format: timestamp | level | logger name | message
+        formatter = logging.Formatter(fmt=TEXT_FORMAT, datefmt=TEXT_DATEFMT)
 
     # Rotating file handler
     file_handler = logging.handlers.RotatingFileHandler(
@@ -51,11 +191,23 @@ def setup_logging(
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
 
+    # Loggers only enqueue; the listener thread does the actual I/O
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.setLevel(log_level)
+    if rate_limits:
+        queue_handler.addFilter(RateLimitFilter(rate_limits))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    _state.listener, _state.queue_handler = listener, queue_handler
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(queue_handler)
 
     # Quiet down noisy third-party libraries
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -65,4 +217,13 @@ def setup_logging(
 
     # Log startup message
     logger = logging.getLogger("varinaut")
-    logger.info("Logging initialized: level=%s, file=%s", logging.getLevelName(log_level), log_file)
+    logger.info(
+        "Logging initialized: level=%s, file=%s, format=%s",
+        logging.getLevelName(log_level),
+        log_file,
+        "json" if json_format else "text",
+    )
+    return listener
+
+
+atexit.register(stop_logging)
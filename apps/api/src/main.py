@@ -1,52 +1,159 @@
+"""
+Application factory.
+
+Importing this module has no side effects: `create_app` only assembles
+routes and middleware, and the database engines and logging are set up in
+the app's lifespan. Run it with `uvicorn --factory src.main:create_app`.
+"""
+
 import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .config import get_settings
-from .logging_config import setup_logging
-from .routers import predictions
+from .cache import ResponseCache
+from .config import Settings, get_settings
+from .events import EventHub, OverflowPolicy
+from .logging_config import setup_logging, stop_logging
+from .metrics import CONTENT_TYPE, MetricsMiddleware, metrics, render_gauge
+from .pagination import NEXT_CURSOR_HEADER
+from .query_monitor import QueryMonitorMiddleware
+from .routers import brier, cache, changes, evals, events, export, predictions, search
+from .source_client import SourceClient, providers_from_settings
+from .sqldb import Database, get_read_session
+from .write_buffer import Durability, WriteBuffer
 
-settings = get_settings()
+logger = logging.getLogger("varinaut.api")
 
-# Initialize logging before anything else
-setup_logging(
-    log_dir=Path(settings.log_dir),
-    log_level=getattr(logging, settings.log_level.upper(), logging.INFO),
-)
 
-logger = logging.getLogger("varinaut.api")
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build the API for `settings` (default: from the environment)."""
+    settings = settings or get_settings()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        setup_logging(
+            log_dir=Path(settings.log_dir),
+            log_level=getattr(logging, settings.log_level.upper(), logging.INFO),
+            json_format=settings.log_format.lower() == "json",
+            rate_limits=settings.log_rate_limits,
+        )
+        # Database schema is managed by Alembic migrations
+        app.state.db = Database(settings)
+        app.state.write_buffer = WriteBuffer(
+            app.state.db.engine,
+            max_rows=settings.write_batch_rows,
+            max_delay_ms=settings.write_batch_delay_ms,
+            max_pending=settings.write_buffer_max_pending,
+            durability=Durability(settings.write_durability),
+            response_cache=app.state.response_cache,
+        )
+        app.state.write_buffer.start()
+        app.state.source_client = SourceClient(
+            providers_from_settings(settings),
+            max_connections=settings.source_max_connections,
+            timeout=settings.source_timeout_seconds,
+            max_retries=settings.source_max_retries,
+        )
+        logger.info("Starting %s", settings.app_name)
+        yield
+        await app.state.source_client.aclose()
+        await app.state.write_buffer.stop()
+        await app.state.db.dispose()
+        logger.info("Shutting down %s", settings.app_name)
+        stop_logging()
 
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
+    # In memory only, so unlike the engines they exist without the lifespan
+    app.state.response_cache = ResponseCache(
+        settings.response_cache_max_entries, settings.response_cache_ttl_seconds
+    )
+    app.state.event_hub = EventHub(
+        settings.event_queue_size, OverflowPolicy(settings.event_overflow_policy)
+    )
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    logger.info("Starting %s", settings.app_name)
-    # Database schema is managed by Alembic migrations
-    yield
-    # Shutdown: cleanup if needed
-    logger.info("Shutting down %s", settings.app_name)
+    # CORS for frontend
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],  # Vite dev server
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
+    )
+    app.add_middleware(QueryMonitorMiddleware, threshold=settings.n_plus_one_threshold)
+    # Outermost, so latency includes every other middleware
+    app.add_middleware(MetricsMiddleware)
 
+    app.include_router(predictions.router)
+    app.include_router(export.router)
+    app.include_router(search.router)
+    app.include_router(brier.router)
+    app.include_router(evals.router)
+    app.include_router(cache.router)
+    app.include_router(events.router)
+    app.include_router(changes.router)
+    app.add_api_route("/health", health_check, methods=["GET"])
+    app.add_api_route("/metrics", get_metrics, methods=["GET"], include_in_schema=False)
+    return app
 
-app = FastAPI(
-    title=settings.app_name,
-    lifespan=lifespan,
-)
 
-# CORS for frontend
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],  # Vite dev server
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+async def health_check(
+    request: Request, response: Response, session: AsyncSession = Depends(get_read_session)
+):
+    """Liveness plus a `SELECT 1` round trip and connection pool saturation.
 
-# Include routers
-app.include_router(predictions.router)
+    The probe runs on the read engine: a write pool that is busy committing
+    is saturation, reported under `pools`, not an outage.
+    """
+    database = {"connected": True}
+    try:
+        await session.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        logger.warning("Health check could not reach the database: %s", e)
+        database = {"connected": False, "error": str(e)}
+        response.status_code = 503
+    return {
+        "status": "healthy" if database["connected"] else "unhealthy",
+        "database": database,
+        "pools": request.app.state.db.pool_statuses(),
+    }
 
 
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+async def get_metrics(request: Request):
+    """Prometheus scrape endpoint."""
+    pool_lines = []
+    for field, help_text in (
+        ("checked_out", "Connections currently checked out of the pool."),
+        ("saturation", "Checked-out connections over pool size plus max overflow."),
+    ):
+        pool_lines.extend(
+            render_gauge(
+                f"db_pool_{field}",
+                help_text,
+                [
+                    ({"engine": name}, status[field])
+                    for name, status in request.app.state.db.pool_statuses().items()
+                    if field in status
+                ],
+            )
+        )
+    event_lines = render_gauge(
+        "ws_subscribers",
+        "Open WebSocket event subscriptions.",
+        [({}, request.app.state.event_hub.subscriber_count)],
+    )
+    buffer_lines = render_gauge(
+        "db_write_pending_rows",
+        "Rows queued in the write buffer.",
+        [({}, request.app.state.write_buffer.pending_rows)],
+    )
+    return Response(
+        content=metrics.render(pool_lines + event_lines + buffer_lines), media_type=CONTENT_TYPE
+    )
@@ -0,0 +1,380 @@
+"""
+Request and database metrics in Prometheus text format.
+
+`MetricsMiddleware` is a plain ASGI middleware (no per-request task or body
+buffering) that records per-route latency, status counts and in-flight
+requests. `instrument_engine` hooks SQLAlchemy cursor events and charges
+each statement to the `QueryTracker`s of the current context (see
+`track_queries`), so every request also gets its SQL statement count and
+time. It is the only cursor-event timer: other per-statement consumers, such
+as the slow-query log, register with `add_statement_hook` instead of timing
+statements again.
+
+Metrics live in process memory; with several workers each reports its own.
+"""
+
+import collections
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Requests that matched no route share one label so bad URLs can't explode cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = Tuple[str, ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    def __init__(
+        self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = bound if isinstance(bound, str) else _format_value(bound)
+                bucket = _format_labels((*self.label_names, "le"), (*labels, le))
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            yield f"{self.name}_sum{base} {_format_value(total)}"
+            yield f"{self.name}_count{base} {count}"
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        self._values[labels] += amount
+
+    def value(self, labels: Labels) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (
+        str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values
+    )
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_gauge(
+    name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]
+) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(
+            f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}"
+        )
+    return lines
+
+
+class QueryTracker:
+    """Statements executed within one request or `track_queries` block.
+
+    Nested trackers also report to their parent, so the metrics middleware's
+    per-request tracker and the N+1 monitor's share one chain, and a
+    test-level tracker still sees the statements of the requests it makes.
+    """
+
+    def __init__(self, parent: Optional["QueryTracker"] = None):
+        self.parent = parent
+        self.statements: List[str] = []
+        self.db_seconds = 0.0
+
+    def record(self, statement: str, seconds: float) -> None:
+        tracker = self
+        while tracker is not None:
+            tracker.statements.append(statement)
+            tracker.db_seconds += seconds
+            tracker = tracker.parent
+
+    @property
+    def total(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least `threshold` times, most frequent first."""
+        counts = collections.Counter(self.statements)
+        return [(sql, n) for sql, n in counts.most_common() if n >= threshold]
+
+
+_current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("query_tracker", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryTracker]:
+    """Record every instrumented statement executed inside the block."""
+    tracker = QueryTracker(parent=_current_tracker.get())
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+# Called as hook(conn, statement, parameters, executemany, seconds) after every
+# instrumented statement
+StatementHook = Callable[..., None]
+_statement_hooks: List[StatementHook] = []
+
+
+def add_statement_hook(hook: StatementHook) -> None:
+    """Also pass every instrumented statement and its duration to `hook`.
+
+    Safe to call more than once with the same hook.
+    """
+    if hook not in _statement_hooks:
+        _statement_hooks.append(hook)
+
+
+class Metrics:
+    """Process-wide metric registry."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = Counter(
+            "http_requests_total",
+            "HTTP requests by route and status code.",
+            ("method", "route", "status"),
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency, including streaming the response body.",
+            ("method", "route"),
+            LATENCY_BUCKETS,
+        )
+        self.db_statements = Histogram(
+            "http_request_db_statements",
+            "SQL statements executed per HTTP request.",
+            ("method", "route"),
+            STATEMENT_BUCKETS,
+        )
+        self.db_time = Histogram(
+            "http_request_db_duration_seconds",
+            "Time spent executing SQL per HTTP request.",
+            ("method", "route"),
+            LATENCY_BUCKETS,
+        )
+        self.statements = Counter(
+            "db_statements_total", "SQL statements executed, by engine.", ("engine",)
+        )
+        self.statement_time = Counter(
+            "db_statement_duration_seconds_total",
+            "Time spent executing SQL, by engine.",
+            ("engine",),
+        )
+        self.write_batch_rows = Histogram(
+            "db_write_batch_rows", "Rows inserted per write buffer flush.", (), BATCH_BUCKETS
+        )
+        self.write_flush_time = Histogram(
+            "db_write_flush_duration_seconds",
+            "Time to insert and commit one write buffer batch.",
+            (),
+            LATENCY_BUCKETS,
+        )
+        self.write_wait_time = Histogram(
+            "db_write_wait_seconds",
+            "Time from queueing an update in the write buffer to its commit.",
+            (),
+            LATENCY_BUCKETS,
+        )
+        self.source_requests = Counter(
+            "source_requests_total",
+            'Requests to research source providers, by status code or "error".',
+            ("provider", "status"),
+        )
+        self.source_retries = Counter(
+            "source_retries_total", "Retried research source requests.", ("provider",)
+        )
+        self.source_request_time = Histogram(
+            "source_request_duration_seconds",
+            "Research source request latency, per attempt.",
+            ("provider",),
+            LATENCY_BUCKETS,
+        )
+        self.source_wait_time = Histogram(
+            "source_wait_seconds",
+            "Time a research source request waited for its provider's rate limit and slots.",
+            ("provider",),
+            LATENCY_BUCKETS,
+        )
+
+    def record_request(
+        self, method: str, route: str, status: int, seconds: float, queries: QueryTracker
+    ) -> None:
+        labels = (method, route)
+        self.requests.inc((method, route, str(status)))
+        self.latency.observe(labels, seconds)
+        self.db_statements.observe(labels, queries.total)
+        self.db_time.observe(labels, queries.db_seconds)
+
+    def _all(self):
+        return (
+            self.requests,
+            self.latency,
+            self.db_statements,
+            self.db_time,
+            self.statements,
+            self.statement_time,
+            self.write_batch_rows,
+            self.write_flush_time,
+            self.write_wait_time,
+            self.source_requests,
+            self.source_retries,
+            self.source_request_time,
+            self.source_wait_time,
+        )
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        """Prometheus text exposition of every metric, followed by `extra` lines."""
+        lines = render_gauge(
+            "http_requests_in_flight",
+            "HTTP requests currently being served.",
+            [({}, self.in_flight)],
+        )
+        for metric in self._all():
+            lines.extend(metric.render())
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in self._all():
+            metric.clear()
+
+
+metrics = Metrics()
+
+
+# Listeners are registered with `named=True`, so arguments arrive by keyword
+def _before_cursor_execute(*, conn, **_):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(*, conn, statement, parameters, executemany, **_):
+    elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+    engine_name = (conn.get_execution_options().get("metrics_engine", "default"),)
+    metrics.statements.inc(engine_name)
+    metrics.statement_time.inc(engine_name, elapsed)
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.record(statement, elapsed)
+    for hook in _statement_hooks:
+        hook(conn, statement, parameters, executemany, elapsed)
+
+
+def _handle_error(*, exception_context):
+    # A failed statement never reaches after_cursor_execute
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("metrics_started"):
+        conn.info["metrics_started"].pop()
+
+
+def instrument_engine(engine: AsyncEngine, name: Optional[str] = None) -> None:
+    """Time every statement on `engine` and charge it to the current trackers, if any.
+
+    Statements are labelled with `name`; without one, with the name given
+    earlier or "default". Safe to call more than once for the same engine.
+    """
+    sync_engine = engine.sync_engine
+    if name is not None:
+        sync_engine.update_execution_options(metrics_engine=name)
+    for identifier, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(sync_engine, identifier, listener):
+            event.listen(sync_engine, identifier, listener, named=True)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL usage per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.in_flight -= 1
+                route = scope.get("route")
+                metrics.record_request(
+                    scope["method"],
+                    getattr(route, "path", UNMATCHED_ROUTE),
+                    status,
+                    elapsed,
+                    queries,
+                )
@@ -1 +1,8 @@
 from .prediction import *
+from .search import *
+from .brier import *
+from .evals import *
+from .cache import *
+from .series import *
+from .events import *
+from .changes import *
@@ -0,0 +1,50 @@
+# pylint: disable=not-callable
+
+from enum import Enum
+from typing import Optional, List
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, func
+from sqlmodel import SQLModel, Field
+
+
+class BrierDimension(str, Enum):
+    ALL = "all"
+    MONTH = "month"  # bucket is the resolution month, YYYY-MM
+    REVIEWER = "reviewer"  # bucket is the reviewer of the scored update
+    DECISION = "decision"  # bucket is the review decision of the scored update
+
+
+# Bucket used when the scored update has no human review
+UNREVIEWED = "unreviewed"
+
+
+class BrierAggregate(SQLModel, table=True):
+    """BrierAggregate holds running Brier score sums for one slice of resolved predictions.
+
+    A resolved prediction is scored with the likelihood of its latest
+    PredictionUpdate and adds one row to every dimension it belongs to.
+    """
+    dimension: BrierDimension = Field(primary_key=True)
+    bucket: str = Field(primary_key=True)
+    count: int = Field(default=0)
+    sum_squared_error: float = Field(default=0.0)
+    sum_likelihood: float = Field(default=0.0)
+    sum_outcome: int = Field(default=0)
+    updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, onupdate=func.now()))
+
+
+class BrierScore(SQLModel):
+    bucket: str
+    count: int
+    brier_score: float
+    mean_likelihood: float
+    base_rate: float  # fraction of predictions that resolved TRUE
+
+
+class BrierSummary(SQLModel):
+    """BrierSummary is the schema for `GET /brier` responses."""
+    overall: Optional[BrierScore] = None
+    by_month: List[BrierScore] = []
+    by_reviewer: List[BrierScore] = []
+    by_decision: List[BrierScore] = []
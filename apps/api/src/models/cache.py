@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel
+
+
+class CacheStats(SQLModel):
+    """CacheStats is the schema for `GET /cache/stats` responses."""
+    entries: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float  # hits / (hits + misses) since start or the last clear
+    not_modified: int  # 304 responses, from cached and freshly built entries
+    evictions: int  # entries dropped to respect max_entries
+    invalidations: int  # entries dropped by writes
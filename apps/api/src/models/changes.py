@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import DDL, Column, DateTime, Index, event, func
+from sqlmodel import SQLModel, Field
+
+from .prediction import (
+    _NOW,
+    HumanReview,
+    HumanReviewRead,
+    Prediction,
+    PredictionUpdate,
+    PredictionUpdateRead,
+)
+
+# Tables whose rows `GET /changes` returns, by creation or last update time
+SYNCED_TABLES = (Prediction.__table__, PredictionUpdate.__table__, HumanReview.__table__)
+
+# Keyset index of each synced table in changed-at order; rows only get
+# `updated_at` on their first update, so the index covers the coalesce
+for _table in SYNCED_TABLES:
+    Index(
+        f"ix_{_table.name}_changed_at",
+        func.coalesce(_table.c.updated_at, _table.c.created_at),
+        _table.c.id,
+    )
+
+
+class Tombstone(SQLModel, table=True):
+    """Tombstone is a DB record of a deleted synced row, written by delete triggers."""
+    # AUTOINCREMENT, so ids are never reused after the newest tombstones are pruned
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    table_name: str
+    row_id: int
+    prediction_id: Optional[int] = Field(default=None, index=True)
+    deleted_at: datetime = Field(
+        sa_column=Column(DateTime, nullable=False, index=True, server_default=func.now())
+    )
+
+
+TOMBSTONE_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_tombstone_ad AFTER DELETE ON {table} BEGIN
+        INSERT INTO tombstone (table_name, row_id, prediction_id, deleted_at)
+        VALUES ('{table}', old.id, {prediction_id}, {_NOW});
+    END
+    """
+    for table, prediction_id in (
+        ("prediction", "old.id"),
+        ("predictionupdate", "old.prediction_id"),
+        ("humanreview", "(SELECT prediction_id FROM predictionupdate WHERE id = old.update_id)"),
+    )
+]
+
+for _statement in TOMBSTONE_DDL:
+    # DDL() applies %-formatting to its statement
+    event.listen(
+        SQLModel.metadata,
+        "after_create",
+        DDL(_statement.replace("%", "%%")).execute_if(dialect="sqlite"),
+    )
+
+
+class DeletedRow(SQLModel):
+    """DeletedRow is a tombstone in `GET /changes` responses."""
+    table: str  # "prediction", "predictionupdate" or "humanreview"
+    id: int
+    prediction_id: Optional[int] = None
+
+
+class ChangeSet(SQLModel):
+    """ChangeSet is the schema for `GET /changes` responses."""
+    predictions: List[Prediction] = []
+    updates: List[PredictionUpdateRead] = []
+    reviews: List[HumanReviewRead] = []
+    deleted: List[DeletedRow] = []
+    token: str  # pass back as `since` for the changes after these
+    has_more: bool = False  # more changes are ready; ask again with `token` right away
@@ -0,0 +1,35 @@
+from typing import Optional, List
+
+from sqlmodel import SQLModel
+
+
+class CalibrationBin(SQLModel):
+    """One bin of a reliability diagram."""
+    lower: float
+    upper: float
+    count: int
+    mean_likelihood: Optional[float] = None  # None for empty bins
+    observed_frequency: Optional[float] = None
+
+
+class ScoreReport(SQLModel):
+    """Proper scores for one slice of forecasts.
+
+    `brier_score` decomposes (Murphy) as reliability - resolution + uncertainty,
+    up to the within-bin variance lost by binning.
+    """
+    label: str
+    count: int
+    brier_score: Optional[float] = None
+    reliability: Optional[float] = None
+    resolution: Optional[float] = None
+    uncertainty: Optional[float] = None
+    log_loss: Optional[float] = None
+    bins: List[CalibrationBin] = []
+
+
+class CalibrationReport(SQLModel):
+    """CalibrationReport is the schema for `GET /evals/calibration` responses."""
+    overall: ScoreReport
+    by_horizon: List[ScoreReport] = []
+    by_review: List[ScoreReport] = []
@@ -0,0 +1,36 @@
+from enum import Enum
+from typing import Any, Dict, Literal
+
+from sqlmodel import SQLModel
+
+
+class EventType(str, Enum):
+    PROGRESS = "progress"  # research progress; only the latest one matters
+    NEED_APPROVAL = "need_approval"  # the agent is waiting at a human checkpoint
+    LAGGED = "lagged"  # the client fell behind and `data.missed` events were dropped
+
+
+class PredictionEvent(SQLModel):
+    """PredictionEvent is the schema of messages on `WS /predictions/{id}/events`."""
+    type: EventType
+    prediction_id: int
+    seq: int  # +1 per event published for the prediction; gaps are coalesced or dropped events
+    data: Dict[str, Any] = {}
+
+
+class PredictionEventPost(SQLModel):
+    """PredictionEventPost is the schema for `POST /predictions/{id}/events` requests."""
+    type: Literal[EventType.PROGRESS, EventType.NEED_APPROVAL]
+    data: Dict[str, Any] = {}
+
+
+class EventHubStats(SQLModel):
+    """EventHubStats is the schema for `GET /events/stats` responses."""
+    subscribers: int
+    topics: int  # predictions with at least one subscriber
+    max_queue_size: int
+    overflow_policy: str
+    published: int
+    delivered: int  # messages handed to subscribers' queues
+    coalesced: int  # queued progress events replaced by a newer one
+    dropped: int  # events evicted from a full queue
@@ -4,7 +4,7 @@ from enum import Enum
 from typing import Optional, List
 from datetime import date, datetime
 
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import DDL, Column, DateTime, Index, event, func
 from sqlalchemy.orm import RelationshipProperty
 from sqlmodel import SQLModel, Field, Relationship
 
@@ -17,6 +17,12 @@ class PredictionStatus(str, Enum):
     RESOLVED = "resolved"
 
 
+class PredictionSort(str, Enum):
+    """Orderings supported by `GET /predictions` keyset pagination."""
+    ID = "id"
+    KNOWN_DATE = "known_date"  # ties broken by id
+
+
 class PredictionBase(SQLModel):
     question: str = Field(index=True)
     description: Optional[str] = None
@@ -25,11 +31,21 @@ class PredictionBase(SQLModel):
 
 
 class Prediction(PredictionBase, table=True):
+    __table_args__ = (
+        # Dashboard: predictions in a status, by known_date
+        Index("ix_prediction_status_known_date", "status", "known_date"),
+        # Never reuse the id of a deleted or archived row
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     status: PredictionStatus = Field(default=PredictionStatus.DRAFT)
     outcome: Optional[bool] = None  # True/False when resolved
     updates: List["PredictionUpdate"] = Relationship(back_populates="prediction")
     resolved_at: Optional[datetime] = None
+    # Likelihood and created_at of the latest update, maintained by triggers
+    current_likelihood: Optional[float] = None
+    last_updated_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, onupdate=func.now()))
 
@@ -39,13 +55,45 @@ class PredictionPost(PredictionBase):
     pass
 
 
-class PredictionUpdate(SQLModel, table=True):
+class PredictionResolve(SQLModel):
+    """PredictionResolve is the schema for `POST /predictions/{id}/resolve` endpoint."""
+    outcome: bool
+
+
+class PredictionBatchError(SQLModel):
+    """PredictionBatchError describes why one row of a batch was not created."""
+    index: int
+    errors: List[dict]
+
+
+class PredictionBatchResult(SQLModel):
+    """PredictionBatchResult is the schema for `POST /predictions/batch` responses."""
+    created: List[Prediction] = []
+    errors: List[PredictionBatchError] = []
+
+
+class PredictionUpdateBase(SQLModel):
+    likelihood: float = Field(default=None, ge=0, le=1)
+    reasoning: str
+
+
+class PredictionUpdate(PredictionUpdateBase, table=True):
     """PredictionUpdate is a DB record for updating a Prediction entry."""
+    __table_args__ = (
+        # A prediction's history in order, and its latest update; covers the
+        # likelihood series so it is read without visiting table rows
+        Index(
+            "ix_predictionupdate_prediction_id_created_at_likelihood",
+            "prediction_id",
+            "created_at",
+            "likelihood",
+        ),
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     prediction_id: int = Field(foreign_key="prediction.id", ondelete="CASCADE")
     prediction: Prediction = Relationship(back_populates="updates")
-    likelihood: float = Field(default=None, ge=0, le=1)
-    reasoning: str
     sources: List["Source"] = Relationship(back_populates="update")
     review: Optional["HumanReview"] = Relationship(
         sa_relationship=RelationshipProperty(
@@ -56,10 +104,7 @@ class PredictionUpdate(SQLModel, table=True):
     updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, onupdate=func.now()))
 
 
-class Source(SQLModel, table=True):
-    id: Optional[int] = Field(default=None, primary_key=True)
-    update_id: int = Field(foreign_key="predictionupdate.id", ondelete="CASCADE")
-    update: PredictionUpdate = Relationship(back_populates="sources")
+class SourceBase(SQLModel):
     title: str = Field(index=True)
     url: str = Field(index=True)
     summary: str
@@ -68,7 +113,15 @@ class Source(SQLModel, table=True):
     # how relevant is the information with respect to updating the likelihood of the prediction
     relevance: float = Field(default=None, ge=0, le=1)
     reasoning: str
-    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class Source(SourceBase, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    update_id: int = Field(foreign_key="predictionupdate.id", ondelete="CASCADE", index=True)
+    update: PredictionUpdate = Relationship(back_populates="sources")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, onupdate=func.now()))
 
 
@@ -78,12 +131,127 @@ class ReviewDecision(str, Enum):
     REJECT = "reject"
 
 
-class HumanReview(SQLModel, table=True):
-    id: Optional[int] = Field(default=None, primary_key=True)
-    update_id: int = Field(foreign_key="predictionupdate.id", ondelete="CASCADE")
-    update: PredictionUpdate = Relationship(back_populates="review")
+class HumanReviewBase(SQLModel):
     name: str = Field(default="Zilong")
     decision: ReviewDecision = Field(default=ReviewDecision.CHALLENGE)
     feedback: str
-    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class HumanReview(HumanReviewBase, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    update_id: int = Field(foreign_key="predictionupdate.id", ondelete="CASCADE", index=True)
+    update: PredictionUpdate = Relationship(back_populates="review")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, onupdate=func.now()))
+
+
+# Keep Prediction.current_likelihood / last_updated_at equal to the latest
+# update (by created_at, then id) in the same transaction as every write to
+# predictionupdate, whichever code path makes it, and stamp updated_at so
+# `GET /changes` sends the prediction again. Attached to the metadata so
+# `create_all` matches migrations 010 and 014.
+
+# Same microsecond format as the datetimes SQLAlchemy stores
+_NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+_LATEST_UPDATE = """
+    UPDATE prediction SET
+        current_likelihood = (
+            SELECT likelihood FROM predictionupdate
+            WHERE prediction_id = {ref}.prediction_id
+            ORDER BY created_at DESC, id DESC LIMIT 1
+        ),
+        last_updated_at = (
+            SELECT MAX(created_at) FROM predictionupdate WHERE prediction_id = {ref}.prediction_id
+        ),
+        updated_at = {now}
+    WHERE id = {ref}.prediction_id;
+"""
+
+CURRENT_LIKELIHOOD_DDL = [
+    # An insert is newest unless it was backdated, so no lookup is needed
+    f"""
+    CREATE TRIGGER IF NOT EXISTS predictionupdate_current_ai AFTER INSERT ON predictionupdate BEGIN
+        UPDATE prediction SET
+            current_likelihood = new.likelihood,
+            last_updated_at = new.created_at,
+            updated_at = {_NOW}
+        WHERE id = new.prediction_id
+            AND (last_updated_at IS NULL OR new.created_at >= last_updated_at);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS predictionupdate_current_ad AFTER DELETE ON predictionupdate BEGIN
+        {_LATEST_UPDATE.format(ref="old", now=_NOW)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS predictionupdate_current_au
+    AFTER UPDATE OF likelihood, created_at, prediction_id ON predictionupdate BEGIN
+        {_LATEST_UPDATE.format(ref="old", now=_NOW)}
+        {_LATEST_UPDATE.format(ref="new", now=_NOW)}
+    END
+    """,
+]
+
+for _statement in CURRENT_LIKELIHOOD_DDL:
+    # DDL() applies %-formatting to its statement
+    event.listen(
+        SQLModel.metadata,
+        "after_create",
+        DDL(_statement.replace("%", "%%")).execute_if(dialect="sqlite"),
+    )
+
+
+class SourceRead(SourceBase):
+    id: int
+    update_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class HumanReviewRead(HumanReviewBase):
+    id: int
+    update_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class PredictionUpdateRead(PredictionUpdateBase):
+    """PredictionUpdateRead is a PredictionUpdate with optionally expanded children."""
+    id: int
+    prediction_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    sources: Optional[List[SourceRead]] = None
+    review: Optional[HumanReviewRead] = None
+
+
+class PredictionDetail(PredictionBase):
+    """PredictionDetail is the schema for `GET /predictions/{id}` with `expand`.
+
+    Relationship fields are only present in the response when expanded.
+    """
+    id: int
+    status: PredictionStatus
+    outcome: Optional[bool] = None
+    resolved_at: Optional[datetime] = None
+    current_likelihood: Optional[float] = None
+    last_updated_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    updates: Optional[List[PredictionUpdateRead]] = None
+
+
+class SourcePost(SourceBase):
+    """SourcePost is a source nested in `POST /predictions/{id}/updates` payloads."""
+    credibility: float = Field(ge=0, le=1)
+    relevance: float = Field(ge=0, le=1)
+
+
+class PredictionUpdatePost(PredictionUpdateBase):
+    """PredictionUpdatePost is the schema for `POST /predictions/{id}/updates` endpoint."""
+    likelihood: float = Field(ge=0, le=1)
+    sources: List[SourcePost] = []
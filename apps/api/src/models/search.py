@@ -0,0 +1,95 @@
+"""
+SQLite FTS5 full-text indexes over predictions and sources.
+
+The FTS tables use external content: they store only the inverted index and
+read the original text from `prediction` / `source`, and triggers keep them in
+sync on every insert, update and delete. The DDL is attached to the SQLModel
+metadata so that `create_all` (tests, fresh databases) builds the same indexes
+as migration 008 does for existing databases.
+"""
+
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import DDL, event
+from sqlmodel import SQLModel
+
+__all__ = ["FTS_TABLES", "SearchKind", "SearchHit"]
+
+FTS_TABLES = ("prediction_fts", "source_fts")
+
+SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS prediction_fts USING fts5(
+        question, description,
+        content='prediction', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prediction_fts_ai AFTER INSERT ON prediction BEGIN
+        INSERT INTO prediction_fts(rowid, question, description)
+        VALUES (new.id, new.question, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prediction_fts_ad AFTER DELETE ON prediction BEGIN
+        INSERT INTO prediction_fts(prediction_fts, rowid, question, description)
+        VALUES ('delete', old.id, old.question, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prediction_fts_au
+    AFTER UPDATE OF question, description ON prediction BEGIN
+        INSERT INTO prediction_fts(prediction_fts, rowid, question, description)
+        VALUES ('delete', old.id, old.question, old.description);
+        INSERT INTO prediction_fts(rowid, question, description)
+        VALUES (new.id, new.question, new.description);
+    END
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS source_fts USING fts5(
+        title, url, summary,
+        content='source', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS source_fts_ai AFTER INSERT ON source BEGIN
+        INSERT INTO source_fts(rowid, title, url, summary)
+        VALUES (new.id, new.title, new.url, new.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS source_fts_ad AFTER DELETE ON source BEGIN
+        INSERT INTO source_fts(source_fts, rowid, title, url, summary)
+        VALUES ('delete', old.id, old.title, old.url, old.summary);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS source_fts_au AFTER UPDATE OF title, url, summary ON source BEGIN
+        INSERT INTO source_fts(source_fts, rowid, title, url, summary)
+        VALUES ('delete', old.id, old.title, old.url, old.summary);
+        INSERT INTO source_fts(rowid, title, url, summary)
+        VALUES (new.id, new.title, new.url, new.summary);
+    END
+    """,
+]
+
+for _statement in SEARCH_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+class SearchKind(str, Enum):
+    PREDICTION = "prediction"
+    SOURCE = "source"
+
+
+class SearchHit(SQLModel):
+    """SearchHit is one ranked result of `GET /search`."""
+    kind: SearchKind
+    id: int
+    prediction_id: int
+    title: str
+    snippet: str
+    # BM25 relative to the best hit of the same kind: 1 for the best, higher is more relevant
+    score: float
+    update_id: Optional[int] = None
@@ -0,0 +1,14 @@
+from typing import List
+
+from sqlmodel import SQLModel
+
+
+class PredictionSeries(SQLModel):
+    """PredictionSeries is the schema for `GET /predictions/{id}/series` responses.
+
+    Columnar: the i-th timestamp and likelihood belong to the same update.
+    """
+    prediction_id: int
+    total_points: int  # updates before downsampling
+    timestamps: List[int] = []  # update created_at, milliseconds since the Unix epoch (UTC)
+    likelihoods: List[float] = []
@@ -0,0 +1,36 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the URL-safe base64 encoding of a small JSON object holding the
+sort key of the last row on a page. Clients must treat it as opaque and only
+pass it back verbatim.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: Dict[str, Any]) -> str:
+    """Encode a sort key into an opaque cursor string."""
+    raw = json.dumps(key, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by `encode_cursor`, raising 400 if it is malformed."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from e
+    if not isinstance(key, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return key
@@ -0,0 +1,110 @@
+"""
+Slow-query log and N+1 detection for the SQLAlchemy engines.
+
+Both build on the statement timing and tracking of `metrics.instrument_engine`
+rather than hooking the cursor events again. `instrument_queries` enables it
+on an engine and logs statements slower than `slow_query_ms` with their
+parameters and, on SQLite, the output of EXPLAIN QUERY PLAN.
+`QueryMonitorMiddleware` tracks the statements of each request and warns when
+the same SQL runs `n_plus_one_threshold` or more times, which usually means a
+relationship is loaded lazily inside a loop. `track_queries` exposes the same
+tracking to tests (see the `query_budget` fixture).
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .config import Settings, get_settings
+from .metrics import add_statement_hook, instrument_engine, track_queries
+
+logger = logging.getLogger("varinaut.sql")
+
+MAX_PARAMS_LENGTH = 500
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def _format_params(parameters) -> str:
+    text = repr(parameters)
+    if len(text) > MAX_PARAMS_LENGTH:
+        text = text[:MAX_PARAMS_LENGTH] + "..."
+    return text
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN QUERY PLAN on the raw DBAPI connection, bypassing the engine events."""
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug("EXPLAIN QUERY PLAN failed: %s", e)
+        return None
+    # Rows are (id, parent, notused, detail)
+    return "\n".join(f"  {row[-1]}" for row in rows)
+
+
+def _log_slow_query(conn, statement, parameters, executemany, seconds):
+    elapsed_ms = seconds * 1000
+    options = conn.get_execution_options()
+    threshold_ms = options.get("slow_query_ms", 0)
+    if threshold_ms <= 0 or elapsed_ms < threshold_ms:
+        return
+    plan = None
+    if options.get("slow_query_explain") and not executemany and conn.dialect.name == "sqlite":
+        plan = _explain(conn, statement, parameters)
+    logger.warning(
+        "Slow query (%.1f ms): %s\nParameters: %s%s",
+        elapsed_ms,
+        statement,
+        _format_params(parameters),
+        f"\nQuery plan:\n{plan}" if plan else "",
+    )
+
+
+def instrument_queries(engine: AsyncEngine, settings: Optional[Settings] = None) -> None:
+    """Enable the slow-query log and statement tracking on `engine`.
+
+    Safe to call more than once for the same engine.
+    """
+    settings = settings or get_settings()
+    engine.sync_engine.update_execution_options(
+        slow_query_ms=settings.slow_query_ms,
+        slow_query_explain=settings.slow_query_explain,
+    )
+    instrument_engine(engine)
+    add_statement_hook(_log_slow_query)
+
+
+class QueryMonitorMiddleware:
+    """ASGI middleware warning about suspected N+1 queries per request."""
+
+    def __init__(self, app, threshold: Optional[int] = None):
+        self.app = app
+        self.threshold = (
+            threshold if threshold is not None else get_settings().n_plus_one_threshold
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.threshold <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as tracker:
+            await self.app(scope, receive, send)
+
+        for statement, count in tracker.repeated(self.threshold):
+            route = getattr(scope.get("route"), "path", scope["path"])
+            logger.warning(
+                "Suspected N+1: statement ran %d times in %s %s: %s",
+                count,
+                scope["method"],
+                route,
+                statement,
+            )
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..sqldb import get_read_session
+from ..models import BrierSummary
+from ..services.brier_service import get_brier_summary
+
+router = APIRouter(prefix="/brier", tags=["brier"])
+
+
+@router.get("/", response_model=BrierSummary)
+async def get_brier(session: AsyncSession = Depends(get_read_session)):
+    """Brier scores of resolved predictions, overall and by month, reviewer and decision."""
+    return await get_brier_summary(session)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+
+from ..cache import ResponseCache, get_response_cache
+from ..models import CacheStats
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/stats", response_model=CacheStats)
+async def get_cache_stats(response_cache: ResponseCache = Depends(get_response_cache)):
+    """Hit rate and size of this process's response cache."""
+    return response_cache.stats()
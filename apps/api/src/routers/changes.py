@@ -0,0 +1,68 @@
+from datetime import timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import Settings, get_settings
+from ..models import ChangeSet, DeletedRow, HumanReviewRead, PredictionUpdateRead
+from ..pagination import decode_cursor, encode_cursor
+from ..services.changes_service import check_position, load_changes, position_expired
+from ..sqldb import get_read_session
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+MAX_CHANGES = 5000
+
+
+def settle_window(settings: Settings) -> timedelta:
+    """How far tokens trail the newest change; see `Settings.changes_settle_seconds`."""
+    if settings.changes_settle_seconds is not None:
+        return timedelta(seconds=settings.changes_settle_seconds)
+    return timedelta(milliseconds=settings.sqlite_busy_timeout_ms, seconds=1)
+
+
+@router.get("", response_model=ChangeSet)
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=MAX_CHANGES),
+    session: AsyncSession = Depends(get_read_session),
+    settings: Settings = Depends(get_settings),
+):
+    """Predictions, updates and reviews created or updated since a token, and deletes.
+
+    Without `since` every row is returned, page by page, for a first sync;
+    afterwards pass the `token` of the previous response. While `has_more`
+    is true, ask again right away. Each response holds up to `limit` rows
+    per kind. Rows changed in the last few seconds are sent again on the
+    next call in case an older change commits late, so apply rows by id
+    and then remove the `deleted` ones.
+
+    A token older than the tombstone retention gets 410; sync again from
+    scratch.
+    """
+    position = None
+    if since is not None:
+        position = decode_cursor(since)
+        try:
+            check_position(position)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail="Invalid token") from e
+        if position_expired(position, timedelta(days=settings.changes_retention_days)):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Token expired; sync again without `since`",
+            )
+
+    changes = await load_changes(session, position, limit, settle_window(settings))
+    return ChangeSet(
+        predictions=changes.predictions,
+        updates=[PredictionUpdateRead.model_validate(row.model_dump()) for row in changes.updates],
+        reviews=[HumanReviewRead.model_validate(row.model_dump()) for row in changes.reviews],
+        deleted=[
+            DeletedRow(table=row.table_name, id=row.row_id, prediction_id=row.prediction_id)
+            for row in changes.deleted
+        ],
+        token=encode_cursor(changes.position),
+        has_more=changes.has_more,
+    )
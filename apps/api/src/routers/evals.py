@@ -0,0 +1,45 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..sqldb import get_read_session
+from ..models import CalibrationReport
+
+router = APIRouter(prefix="/evals", tags=["evals"])
+
+
+def _parse_horizons(horizons: str) -> List[int]:
+    try:
+        values = [int(value) for value in horizons.split(",") if value.strip()]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail="horizons must be comma-separated integers"
+        ) from e
+    if not values or any(value <= 0 for value in values) or values != sorted(set(values)):
+        raise HTTPException(
+            status_code=400, detail="horizons must be increasing positive integers"
+        )
+    return values
+
+
+@router.get("/calibration", response_model=CalibrationReport)
+async def get_calibration(
+    bins: int = Query(10, ge=2, le=100),
+    horizons: str = "30,90,365",
+    latest_only: bool = False,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Reliability diagram, Brier decomposition and log loss over resolved predictions.
+
+    Every update of a resolved prediction counts as a forecast unless
+    `latest_only` is set. Results are also sliced by how many days before the
+    prediction's `known_date` the forecast was made (`horizons`, in days) and
+    by `require_review`.
+    """
+    # Imported on first use: it pulls in numpy, which dominates app import time
+    # pylint: disable-next=import-outside-toplevel
+    from ..services.eval_service import build_report, load_forecasts
+
+    forecasts = await load_forecasts(session, latest_only=latest_only)
+    return build_report(forecasts, bins, _parse_horizons(horizons))
@@ -0,0 +1,95 @@
+import asyncio
+import secrets
+from contextlib import suppress
+from typing import Optional
+
+from fastapi import status, APIRouter, Depends, HTTPException, WebSocket
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import Settings, get_settings
+from ..events import EventHub, get_event_hub
+from ..models import EventHubStats, Prediction, PredictionEvent, PredictionEventPost
+from ..sqldb import get_read_session
+
+router = APIRouter(tags=["events"])
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+async def require_agent(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    """Accept only requests bearing `Settings.agent_api_key`."""
+    if not settings.agent_api_key:
+        raise HTTPException(status_code=403, detail="Event publishing is disabled")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.agent_api_key.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid agent API key",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.websocket("/predictions/{prediction_id}/events")
+async def prediction_events(
+    websocket: WebSocket, prediction_id: int, event_hub: EventHub = Depends(get_event_hub)
+):
+    """Stream a prediction's `progress` and `need_approval` events as JSON text messages.
+
+    Messages follow the `PredictionEvent` schema. A client that reads too
+    slowly has events dropped from its queue instead of slowing down the
+    publisher, and then receives a `lagged` event; it should refetch the
+    prediction over HTTP. Messages from the client are ignored.
+    """
+    # Subscribe before accepting so no event published after the handshake is missed
+    with event_hub.subscription(prediction_id) as subscription:
+        await websocket.accept()
+
+        async def forward():
+            while True:
+                await websocket.send_text(await subscription.get())
+
+        sender = asyncio.create_task(forward())
+        try:
+            # Receiving is the only way to notice the client going away
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            sender.cancel()
+            # Wait for the sender to stop before unsubscribing, so it never
+            # writes to a closed socket or outlives the handler
+            with suppress(asyncio.CancelledError):
+                await sender
+
+
+@router.post(
+    "/predictions/{prediction_id}/events",
+    response_model=PredictionEvent,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_agent)],
+)
+async def post_prediction_event(
+    prediction_id: int,
+    payload: PredictionEventPost,
+    session: AsyncSession = Depends(get_read_session),
+    event_hub: EventHub = Depends(get_event_hub),
+):
+    """Publish a `progress` or `need_approval` event to the prediction's WebSockets.
+
+    For the research agent; requires `Authorization: Bearer <agent_api_key>`.
+    Returns the event as sent, with its `seq`. Events are not stored: only
+    sockets connected to this worker at the time receive them.
+    """
+    if not await session.get(Prediction, prediction_id):
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    return event_hub.publish(prediction_id, payload.type, payload.data)
+
+
+@router.get("/events/stats", response_model=EventHubStats)
+async def get_event_stats(event_hub: EventHub = Depends(get_event_hub)):
+    """Subscribers and queue overflow counts of this process's event hub."""
+    return event_hub.stats()
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..sqldb import get_read_session
+from ..models import Prediction, PredictionUpdate, Source, HumanReview
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows fetched from the cursor and written to the response per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ExportTable(str, Enum):
+    PREDICTIONS = "predictions"
+    UPDATES = "updates"
+    SOURCES = "sources"
+    REVIEWS = "reviews"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+EXPORT_TABLES = {
+    ExportTable.PREDICTIONS: Prediction.__table__,
+    ExportTable.UPDATES: PredictionUpdate.__table__,
+    ExportTable.SOURCES: Source.__table__,
+    ExportTable.REVIEWS: HumanReview.__table__,
+}
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _plain(value: Any) -> Any:
+    """Convert a column value into something JSON and CSV can represent."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def _stream_rows(
+    session: AsyncSession, table: Table, export_format: ExportFormat
+) -> AsyncIterator[str]:
+    columns = [column.name for column in table.columns]
+    result = await session.stream(
+        select(table).order_by(table.c.id).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if export_format == ExportFormat.CSV:
+        writer.writerow(columns)
+
+    async for rows in result.partitions():
+        for row in rows:
+            values = [_plain(value) for value in row]
+            if export_format == ExportFormat.CSV:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                buffer.write("\n")
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/{table}")
+async def export_table(
+    table: ExportTable,
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Stream every row of a table as NDJSON or CSV, ordered by id.
+
+    Rows are read through a server-side cursor and written out in chunks, so
+    memory use stays flat however large the table is. Child tables reference
+    their parents by `prediction_id` / `update_id`.
+    """
+    filename = f"{table.value}.{export_format.value}"
+    return StreamingResponse(
+        _stream_rows(session, EXPORT_TABLES[table], export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,48 +1,494 @@
-from typing import List
+from datetime import date, datetime
+from typing import Any, List, Optional, Set, TypedDict
 
-from fastapi import status, APIRouter, Depends, HTTPException
-from sqlmodel import select
+from fastapi import status, APIRouter, Body, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from sqlmodel import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
 
-from ..sqldb import get_session
-from ..models import Prediction, PredictionPost
+from ..cache import (
+    PREDICTION_LIST_TAG,
+    ResponseCache,
+    body_etag,
+    cache_key,
+    get_response_cache,
+    make_etag,
+    prediction_tag,
+    row_version,
+)
+from ..config import get_settings
+from ..events import EventHub, get_event_hub
+from ..sqldb import get_session, get_read_session
+from ..models import (
+    EventType,
+    Prediction,
+    PredictionPost,
+    PredictionResolve,
+    PredictionSort,
+    PredictionStatus,
+    PredictionBatchResult,
+    PredictionDetail,
+    PredictionSeries,
+    PredictionUpdate,
+    PredictionUpdatePost,
+    PredictionUpdateRead,
+    Source,
+    SourceRead,
+    HumanReviewRead,
+)
+from ..services.archive_service import ARCHIVE, archive_attached
+from ..services.brier_service import record_resolution
+from ..services.prediction_service import create_predictions
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from ..write_buffer import WriteBuffer, get_write_buffer
 
 router = APIRouter(prefix="/predictions", tags=["predictions"])
 
+# Relationships that `GET /predictions/{id}?expand=` can eager load
+EXPANDABLE = {"updates", "sources", "review"}
+
+# Columns `GET /predictions/?fields=` can select, in response order
+PREDICTION_FIELDS = list(Prediction.__table__.columns.keys())
+
+# Plain-dict twin of Prediction: serializing rows against a typed schema is
+# several times faster than inferring types per value, and skips validation
+_prediction_annotations = {
+    name: field.annotation for name, field in Prediction.model_fields.items()
+}
+PredictionRow = TypedDict(
+    "PredictionRow",
+    {name: _prediction_annotations[name] for name in PREDICTION_FIELDS},
+    total=False,
+)
+_prediction_rows = TypeAdapter(List[PredictionRow])
+_prediction_series = TypeAdapter(List[PredictionSeries])
+
+# Bounds of `GET /predictions/series`: a dashboard page of sparklines
+MAX_SERIES_IDS = 100
+MAX_SERIES_POINTS = 5000
+
 
 @router.get("/", response_model=List[Prediction])
 async def list_predictions(
+    request: Request,
+    *,
     skip: int = 0,
-    limit: int = 100,
-    session: AsyncSession = Depends(get_session),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    prediction_status: Optional[PredictionStatus] = Query(None, alias="status"),
+    sort: PredictionSort = PredictionSort.ID,
+    fields: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+    response_cache: ResponseCache = Depends(get_response_cache),
+):
+    """List predictions ordered by id or `known_date`, with offset or keyset pagination.
+
+    Passing `cursor` (taken from the `X-Next-Cursor` header of a previous page)
+    seeks directly past the last seen row instead of scanning `skip` rows, so
+    every page costs the same regardless of depth. The header is omitted on
+    the last page. Filtering by `status` with `sort=known_date` is served by
+    the (status, known_date) index.
+
+    `fields` is a comma-separated subset of the prediction's columns to
+    return (`id` is always included). Rows are selected as plain column
+    tuples and encoded straight to JSON, without building ORM objects or
+    validating them again against the response model.
+
+    Pages are served from the response cache when possible and carry an ETag;
+    `If-None-Match` with a current ETag returns 304.
+    """
+    selected = _parse_fields(fields)
+    key = cache_key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    generation = response_cache.generation
+
+    # The ETag and the cursor need these even when they aren't returned
+    extra = ("known_date", "created_at", "updated_at", "last_updated_at")
+    columns = {name: Prediction.__table__.c[name] for name in (*selected, *extra)}
+    query = select(*columns.values())
+    if sort == PredictionSort.KNOWN_DATE:
+        query = query.order_by(Prediction.known_date, Prediction.id)
+    else:
+        query = query.order_by(Prediction.id)
+    if prediction_status is not None:
+        query = query.where(Prediction.status == prediction_status)
+
+    if cursor is not None:
+        if skip:
+            raise HTTPException(status_code=400, detail="skip cannot be combined with cursor")
+        query = query.where(_after_cursor(decode_cursor(cursor), sort))
+    else:
+        query = query.offset(skip)
+
+    # Fetch one extra row to know whether another page exists; Core execution
+    # on the session's connection skips ORM identity-map bookkeeping
+    connection = await session.connection()
+    rows = (await connection.execute(query.limit(limit + 1))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(_cursor_for(rows[-1], sort))
+
+    entry = response_cache.set(
+        key,
+        _prediction_rows.dump_json([dict(zip(selected, row)) for row in rows]),
+        make_etag(key, [row_version("prediction", row) for row in rows]),
+        tags=[PREDICTION_LIST_TAG],
+        generation=generation,
+        headers=headers,
+    )
+    return response_cache.respond(request, entry)
+
+
+@router.get("/series", response_model=List[PredictionSeries])
+async def get_predictions_series(
+    request: Request,
+    ids: str,
+    points: int = Query(50, ge=3, le=MAX_SERIES_POINTS),
+    session: AsyncSession = Depends(get_read_session),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
-    """List all predictions with pagination."""
-    result = await session.execute(select(Prediction).offset(skip).limit(limit))
-    predictions = result.scalars().all()
-    return predictions
+    """Likelihood series of several predictions in one query, e.g. for a page of sparklines.
 
+    `ids` is a comma-separated list of up to 100 prediction ids, looked up in
+    the archive too; unknown ids are left out of the response, which is
+    ordered by id. Each series is downsampled to at most `points` updates as
+    in `GET /predictions/{id}/series`.
+    """
+    prediction_ids = _parse_ids(ids)
+    key = cache_key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    generation = response_cache.generation
 
-@router.get("/{prediction_id}", response_model=Prediction)
+    series = await _load_series(session, prediction_ids, points)
+    missing = sorted(set(prediction_ids) - {entry.prediction_id for entry in series})
+    if missing:
+        series += await _load_archived_series(session, missing, points)
+        series.sort(key=lambda entry: entry.prediction_id)
+    body = _prediction_series.dump_json(series)
+    # The list tag covers requested ids that don't exist yet
+    tags = [PREDICTION_LIST_TAG, *map(prediction_tag, prediction_ids)]
+    entry = response_cache.set(key, body, body_etag(body), tags=tags, generation=generation)
+    return response_cache.respond(request, entry)
+
+
+@router.get("/{prediction_id}", response_model=PredictionDetail, response_model_exclude_unset=True)
 async def get_prediction(
+    request: Request,
     prediction_id: int,
-    session: AsyncSession = Depends(get_session),
+    expand: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
-    """Get a single prediction by ID."""
-    prediction = await session.get(Prediction, prediction_id)
+    """Get a single prediction by ID.
+
+    `expand` is a comma-separated subset of `updates`, `sources` and `review`
+    (the latter two imply `updates`). The requested tree is eager loaded in a
+    fixed number of queries regardless of how long the update history is.
+    Predictions missing from the hot database are looked up in the archive.
+
+    Responses are cached and carry an ETag over every row they contain;
+    `If-None-Match` with a current ETag returns 304 without a database query.
+    """
+    expanded = _parse_expand(expand)
+    key = cache_key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    generation = response_cache.generation
+
+    prediction = await _load_prediction(session, prediction_id, expanded)
+    if not prediction and await archive_attached(session):
+        prediction = await _load_prediction(session, prediction_id, expanded, ARCHIVE)
     if not prediction:
         raise HTTPException(status_code=404, detail="Prediction not found")
-    return prediction
+
+    detail = PredictionDetail.model_validate(prediction.model_dump())
+    versions = [row_version("prediction", prediction)]
+    if expanded:
+        updates = sorted(prediction.updates, key=lambda u: (u.created_at, u.id))
+        detail.updates = [_expand_update(update, expanded) for update in updates]
+        versions.extend(_update_versions(updates, expanded))
+
+    entry = response_cache.set(
+        key,
+        detail.model_dump_json(exclude_unset=True).encode(),
+        make_etag(key, versions),
+        tags=[prediction_tag(prediction_id)],
+        generation=generation,
+    )
+    return response_cache.respond(request, entry)
+
+
+@router.get("/{prediction_id}/series", response_model=PredictionSeries)
+async def get_prediction_series(
+    request: Request,
+    prediction_id: int,
+    points: int = Query(300, ge=3, le=MAX_SERIES_POINTS),
+    session: AsyncSession = Depends(get_read_session),
+    response_cache: ResponseCache = Depends(get_response_cache),
+):
+    """Likelihood history of a prediction as columnar `timestamps` and `likelihoods` arrays.
+
+    Histories longer than `points` updates are downsampled server-side with
+    Largest-Triangle-Three-Buckets, which keeps the first and last update and
+    the visually significant peaks in between; `total_points` is the length
+    before downsampling. Timestamps are milliseconds since the Unix epoch.
+    """
+    key = cache_key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    generation = response_cache.generation
+
+    series = await _load_series(session, [prediction_id], points)
+    if not series:
+        series = await _load_archived_series(session, [prediction_id], points)
+    if not series:
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    body = series[0].model_dump_json().encode()
+    entry = response_cache.set(
+        key, body, body_etag(body), tags=[prediction_tag(prediction_id)], generation=generation
+    )
+    return response_cache.respond(request, entry)
+
+
+def _cursor_for(row, sort: PredictionSort) -> dict:
+    if sort == PredictionSort.KNOWN_DATE:
+        return {"known_date": row.known_date.isoformat(), "id": row.id}
+    return {"id": row.id}
+
+
+def _after_cursor(position: dict, sort: PredictionSort):
+    """WHERE clause selecting the rows after `position` in `sort` order."""
+    last_id = position.get("id")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if sort != PredictionSort.KNOWN_DATE:
+        return Prediction.id > last_id
+    try:
+        known_date = date.fromisoformat(position["known_date"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    return or_(
+        Prediction.known_date > known_date,
+        and_(Prediction.known_date == known_date, Prediction.id > last_id),
+    )
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return PREDICTION_FIELDS
+    requested = {part.strip() for part in fields.split(",") if part.strip()} | {"id"}
+    unknown = requested - set(PREDICTION_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}",
+        )
+    return [name for name in PREDICTION_FIELDS if name in requested]
+
+
+def _parse_ids(ids: str) -> List[int]:
+    try:
+        parsed = sorted({int(part) for part in ids.split(",") if part.strip()})
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400, detail="ids must be comma-separated integers"
+        ) from exc
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(parsed) > MAX_SERIES_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SERIES_IDS} ids per request")
+    return parsed
+
+
+async def _load_prediction(
+    session: AsyncSession,
+    prediction_id: int,
+    expanded: Set[str],
+    execution_options: Optional[dict] = None,
+) -> Optional[Prediction]:
+    if not expanded:
+        return await session.get(
+            Prediction, prediction_id, execution_options=execution_options or {}
+        )
+    update_loader = selectinload(Prediction.updates)
+    if "sources" in expanded:
+        update_loader = update_loader.options(selectinload(PredictionUpdate.sources))
+    if "review" in expanded:
+        update_loader = update_loader.options(joinedload(PredictionUpdate.review))
+    result = await session.execute(
+        select(Prediction).where(Prediction.id == prediction_id).options(update_loader),
+        execution_options=execution_options,
+    )
+    return result.scalars().first()
+
+
+async def _load_series(
+    session: AsyncSession,
+    prediction_ids: List[int],
+    points: int,
+    execution_options: Optional[dict] = None,
+) -> List[PredictionSeries]:
+    # Imported on first use: it pulls in numpy, which dominates app import time
+    # pylint: disable-next=import-outside-toplevel
+    from ..services.series_service import load_series
+
+    return await load_series(session, prediction_ids, points, execution_options)
+
+
+async def _load_archived_series(
+    session: AsyncSession, prediction_ids: List[int], points: int
+) -> List[PredictionSeries]:
+    if not await archive_attached(session):
+        return []
+    return await _load_series(session, prediction_ids, points, ARCHIVE)
+
+
+def _parse_expand(expand: Optional[str]) -> Set[str]:
+    if not expand:
+        return set()
+    expanded = {part.strip() for part in expand.split(",") if part.strip()}
+    unknown = expanded - EXPANDABLE
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown expand value(s): {', '.join(sorted(unknown))}",
+        )
+    return expanded
+
+
+def _expand_update(update: PredictionUpdate, expanded: Set[str]) -> PredictionUpdateRead:
+    read = PredictionUpdateRead.model_validate(update.model_dump())
+    if "sources" in expanded:
+        read.sources = [
+            SourceRead.model_validate(source.model_dump())
+            for source in sorted(update.sources, key=lambda s: s.id)
+        ]
+    if "review" in expanded:
+        read.review = (
+            HumanReviewRead.model_validate(update.review.model_dump()) if update.review else None
+        )
+    return read
+
+
+def _update_versions(updates: List[PredictionUpdate], expanded: Set[str]):
+    for update in updates:
+        yield row_version("update", update)
+        if "sources" in expanded:
+            for source in update.sources:
+                yield row_version("source", source)
+        if "review" in expanded and update.review:
+            yield row_version("review", update.review)
 
 
 @router.post('/', response_model=Prediction, status_code=status.HTTP_201_CREATED)
 async def post_prediction(
     payload: PredictionPost,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     """Create a single prediction object."""
     prediction = Prediction.model_validate(payload)
     session.add(prediction)
     await session.commit()
+    response_cache.invalidate(PREDICTION_LIST_TAG)
+    await session.refresh(prediction)
+    return prediction
+
+
+@router.post('/batch', response_model=PredictionBatchResult)
+async def post_predictions_batch(
+    payload: List[Any] = Body(...),
+    session: AsyncSession = Depends(get_session),
+    response_cache: ResponseCache = Depends(get_response_cache),
+):
+    """Create many predictions in one transaction.
+
+    Rows are validated individually; invalid rows are reported under `errors`
+    by their position in the payload while the valid ones are still created.
+    """
+    result = await create_predictions(session, payload, chunk_size=get_settings().batch_chunk_size)
+    if result.created:
+        response_cache.invalidate(PREDICTION_LIST_TAG)
+    return result
+
+
+@router.post(
+    '/{prediction_id}/updates',
+    response_model=PredictionUpdateRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def post_prediction_update(
+    prediction_id: int,
+    payload: PredictionUpdatePost,
+    session: AsyncSession = Depends(get_read_session),
+    write_buffer: WriteBuffer = Depends(get_write_buffer),
+    event_hub: EventHub = Depends(get_event_hub),
+):
+    """Add an update with its sources to a prediction.
+
+    The update is queued on the write buffer, which inserts it together with
+    concurrent updates in one transaction and then invalidates the cached
+    responses of the prediction. The response carries the new ids, so it
+    waits for that commit whatever the buffer's durability. Once committed,
+    the update is published to the prediction's WebSockets as a `progress`
+    event.
+
+    Reads go through the read engine: a write-pool session would hold its
+    connection while waiting, and enough waiting producers would leave the
+    buffer no connection to commit them with.
+    """
+    if not await session.get(Prediction, prediction_id):
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    update = PredictionUpdate.model_validate(
+        {**payload.model_dump(exclude={"sources"}), "prediction_id": prediction_id}
+    )
+    # Already validated as `SourcePost`; the constructor fills in defaults
+    sources = [Source(**source.model_dump()) for source in payload.sources]
+    update_id = await (await write_buffer.submit(update, sources))
+    event_hub.publish(
+        prediction_id,
+        EventType.PROGRESS,
+        {"update_id": update_id, "likelihood": update.likelihood},
+    )
+
+    rows = await session.scalars(
+        select(Source).where(Source.update_id == update_id).order_by(Source.id)
+    )
+    return PredictionUpdateRead(
+        **update.model_dump(exclude={"id"}),
+        id=update_id,
+        sources=[SourceRead(**row.model_dump()) for row in rows],
+    )
+
+
+@router.post('/{prediction_id}/resolve', response_model=Prediction)
+async def resolve_prediction(
+    prediction_id: int,
+    payload: PredictionResolve,
+    session: AsyncSession = Depends(get_session),
+    response_cache: ResponseCache = Depends(get_response_cache),
+):
+    """Mark a prediction as resolved with its outcome and add it to the Brier aggregates."""
+    prediction = await session.get(Prediction, prediction_id)
+    if not prediction:
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    if prediction.status == PredictionStatus.RESOLVED:
+        raise HTTPException(status_code=409, detail="Prediction already resolved")
+
+    prediction.status = PredictionStatus.RESOLVED
+    prediction.outcome = payload.outcome
+    prediction.resolved_at = datetime.utcnow()
+    await record_resolution(session, prediction)
+    await session.commit()
+    response_cache.invalidate(prediction_tag(prediction_id), PREDICTION_LIST_TAG)
     await session.refresh(prediction)
     return prediction
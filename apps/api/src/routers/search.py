@@ -0,0 +1,102 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..sqldb import get_read_session
+from ..models import SearchHit, SearchKind
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_TOKENS = 16
+
+# bm25() column weights: a match in the question or title counts double
+PREDICTION_QUERY = text(
+    f"""
+    SELECT p.id AS id, p.id AS prediction_id, p.question AS title,
+           snippet(prediction_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', '…', {SNIPPET_TOKENS})
+               AS snippet,
+           bm25(prediction_fts, 2.0, 1.0) AS score
+    FROM prediction_fts
+    JOIN prediction p ON p.id = prediction_fts.rowid
+    WHERE prediction_fts MATCH :query
+    ORDER BY score
+    LIMIT :limit
+    """
+)
+
+SOURCE_QUERY = text(
+    f"""
+    SELECT s.id AS id, u.prediction_id AS prediction_id, s.update_id AS update_id,
+           s.title AS title,
+           snippet(source_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', '…', {SNIPPET_TOKENS})
+               AS snippet,
+           bm25(source_fts, 2.0, 1.0, 1.0) AS score
+    FROM source_fts
+    JOIN source s ON s.id = source_fts.rowid
+    JOIN predictionupdate u ON u.id = s.update_id
+    WHERE source_fts MATCH :query
+    ORDER BY score
+    LIMIT :limit
+    """
+)
+
+
+def to_match_expression(query: str) -> str:
+    """Quote every term of a free-text query so FTS5 operators in user input are matched literally.
+
+    Terms are ANDed together; a trailing `*` on a term is kept as a prefix match.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*") and len(term) > 1
+        term = term.rstrip("*") if prefix else term
+        quoted = '"' + term.replace('"', '""') + '"'
+        terms.append(quoted + "*" if prefix else quoted)
+    return " ".join(terms)
+
+
+def _relative_scores(kind: SearchKind, rows) -> List[SearchHit]:
+    """Hits with BM25 scores divided by the best one, so the top hit of each kind scores 1.
+
+    BM25 depends on the FTS table's column weights and corpus statistics, so
+    raw scores from `prediction_fts` and `source_fts` can't be compared.
+    """
+    rows = list(rows)
+    best = rows[0]["score"] if rows and rows[0]["score"] else 1.0
+    return [SearchHit(kind=kind, **{**row, "score": row["score"] / best}) for row in rows]
+
+
+@router.get("/", response_model=List[SearchHit])
+async def search(
+    query: str = Query(..., min_length=1, alias="q"),
+    kind: Optional[SearchKind] = None,
+    limit: int = Query(20, ge=1, le=100),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Full-text search over prediction questions and source titles, URLs and summaries.
+
+    Each kind is ranked by BM25, and `score` is relative to the best hit of
+    the same kind (1 for the best, higher is better), which is what merges
+    the two kinds. Hits carry a highlighted snippet of the best matching
+    column.
+    """
+    match = to_match_expression(query)
+    if not match:
+        return []
+
+    hits: List[SearchHit] = []
+    params = {"query": match, "limit": limit}
+    if kind in (None, SearchKind.PREDICTION):
+        result = await session.execute(PREDICTION_QUERY, params)
+        hits.extend(_relative_scores(SearchKind.PREDICTION, result.mappings()))
+    if kind in (None, SearchKind.SOURCE):
+        result = await session.execute(SOURCE_QUERY, params)
+        hits.extend(_relative_scores(SearchKind.SOURCE, result.mappings()))
+
+    # Stable, so predictions come first on ties
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    return hits[:limit]
@@ -0,0 +1,201 @@
+"""
+Archival tier for resolved predictions.
+
+Predictions resolved before a cutoff are moved, with their updates, sources
+and reviews, out of the hot database into an archive SQLite file that every
+connection attaches as `archive` (see `Settings.archive_database_path`).
+The archive has the same tables, created when it is attached, so the ORM
+reads it by translating the default schema::
+
+    await session.get(Prediction, prediction_id, execution_options=ARCHIVE)
+
+Reads by id try the hot tables first and fall through to the archive on a
+miss. Writes never do: archived predictions are resolved and final.
+
+Each batch of predictions is copied to the archive and deleted from the hot
+tables in one transaction. SQLite does not commit attached WAL databases
+atomically together, so a crash can leave a batch in both; the next run
+skips rows the archive already has unchanged and finishes the delete. A row
+whose id the archive holds with different values fails the batch with an
+IntegrityError rather than overwriting history. The archived tables use
+AUTOINCREMENT, so the hot database never hands out an archived id again;
+each run first raises the hot id sequences past the archive's ids, for rows
+archived before the tables had it. Deleting hot rows also drops them from
+the full-text search indexes.
+
+Schema changes to the archived tables must be applied to `archive.<table>`
+as well, since migrations only manage the hot database.
+"""
+
+import logging
+from datetime import datetime
+from typing import List, NamedTuple
+
+from sqlalchemy import Insert, MetaData, Table, delete, func, insert, select, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from ..models import (
+    HumanReview,
+    Prediction,
+    PredictionStatus,
+    PredictionUpdate,
+    Source,
+    Tombstone,
+)
+
+logger = logging.getLogger("varinaut.services.archive")
+
+ARCHIVE_SCHEMA = "archive"
+
+# Execution options that run a statement against the archive's tables
+ARCHIVE = {"schema_translate_map": {None: ARCHIVE_SCHEMA}}
+
+_archive_metadata = MetaData()
+# Parents before children; hot table -> its archive twin
+_ARCHIVE_TABLES = {
+    table: table.to_metadata(_archive_metadata, schema=ARCHIVE_SCHEMA)
+    for table in (
+        Prediction.__table__,
+        PredictionUpdate.__table__,
+        Source.__table__,
+        HumanReview.__table__,
+    )
+}
+
+
+class ArchiveReport(NamedTuple):
+    predictions: int = 0
+    updates: int = 0
+    sources: int = 0
+    reviews: int = 0
+
+
+def attach_statements(path: str) -> List[str]:
+    """Attach the archive at `path` and create its tables and indexes if missing."""
+    dialect = sqlite.dialect()
+    quoted = path.replace("'", "''")
+    statements = [f"ATTACH DATABASE '{quoted}' AS {ARCHIVE_SCHEMA}"]
+    for table in _ARCHIVE_TABLES.values():
+        statements.append(str(CreateTable(table, if_not_exists=True).compile(dialect=dialect)))
+        statements.extend(
+            str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+            for index in table.indexes
+        )
+    return statements
+
+
+async def archive_attached(session: AsyncSession) -> bool:
+    """Whether the session's connection has the archive attached.
+
+    Read from the pooled connection's `info`, which the engine's connect
+    hook sets, so checking costs no query.
+    """
+    connection = await session.connection()
+    return connection.info.get(ARCHIVE_SCHEMA, False)
+
+
+def _copy(table: Table, condition) -> Insert:
+    """Copy matching rows, skipping those the archive already has unchanged."""
+    # Aliased, since the archived and hot tables share their name
+    archived = _ARCHIVE_TABLES[table].alias("archived")
+    unchanged = select(archived.c.id).where(
+        *(archived.c[column.name].is_(column) for column in table.columns)
+    )
+    columns = [column.name for column in table.columns]
+    return insert(_ARCHIVE_TABLES[table]).from_select(
+        columns, select(*table.columns).where(condition, ~unchanged.exists())
+    )
+
+
+async def _raise_id_sequences(session: AsyncSession) -> None:
+    """Keep the hot tables' AUTOINCREMENT sequences above every archived id."""
+    for table, archived in _ARCHIVE_TABLES.items():
+        high_water = await session.scalar(select(func.max(archived.c.id)))
+        if high_water is None:
+            continue
+        params = {"name": table.name, "seq": high_water}
+        await session.execute(
+            text("DELETE FROM main.sqlite_sequence WHERE name = :name AND seq < :seq"), params
+        )
+        await session.execute(
+            text(
+                "INSERT INTO main.sqlite_sequence (name, seq) SELECT :name, :seq "
+                "WHERE NOT EXISTS (SELECT 1 FROM main.sqlite_sequence WHERE name = :name)"
+            ),
+            params,
+        )
+
+
+async def archive_resolved(
+    session: AsyncSession, resolved_before: datetime, batch_size: int = 500
+) -> ArchiveReport:
+    """Move predictions resolved before `resolved_before` into the archive.
+
+    Commits once per batch of `batch_size` predictions, so the writer lock
+    is held briefly and an interrupted run keeps the batches it finished.
+    Raises IntegrityError, leaving the batch in the hot tables, when the
+    archive holds one of its ids with different values.
+    """
+    if not await archive_attached(session):
+        raise RuntimeError("No archive database attached; set ARCHIVE_DATABASE_PATH")
+    await _raise_id_sequences(session)
+    await session.commit()
+
+    prediction, update = Prediction.__table__, PredictionUpdate.__table__
+    totals = ArchiveReport()
+    last_id = 0
+    while True:
+        ids = (
+            await session.scalars(
+                select(prediction.c.id)
+                .where(
+                    prediction.c.status == PredictionStatus.RESOLVED,
+                    prediction.c.resolved_at < resolved_before,
+                    prediction.c.id > last_id,
+                )
+                .order_by(prediction.c.id)
+                .limit(batch_size)
+            )
+        ).all()
+        if not ids:
+            break
+
+        update_ids = select(update.c.id).where(update.c.prediction_id.in_(ids))
+        conditions = {
+            prediction: prediction.c.id.in_(ids),
+            update: update.c.prediction_id.in_(ids),
+            Source.__table__: Source.__table__.c.update_id.in_(update_ids),
+            HumanReview.__table__: HumanReview.__table__.c.update_id.in_(update_ids),
+        }
+        for table, condition in conditions.items():
+            await session.execute(_copy(table, condition))
+        # Sources and reviews first, while `update_ids` still finds them; then
+        # predictions before their updates, so the delete triggers on
+        # predictionupdate have no prediction row left to recompute
+        moved = {}
+        for table in (Source.__table__, HumanReview.__table__, prediction, update):
+            moved[table] = (await session.execute(delete(table).where(conditions[table]))).rowcount
+        # Archived rows are still readable, so they are not deletes for
+        # `GET /changes`; this also drops older tombstones of these predictions
+        await session.execute(delete(Tombstone).where(Tombstone.prediction_id.in_(ids)))
+        await session.commit()
+
+        totals = ArchiveReport(*(total + moved[table] for total, table in zip(totals, conditions)))
+        last_id = ids[-1]
+        logger.info("Archived %d predictions up to id %d", len(ids), last_id)
+    return totals
+
+
+async def compact(engine: AsyncEngine) -> None:
+    """Return the hot database's free pages to the filesystem.
+
+    Rewrites the file with `VACUUM`, which blocks writers until it
+    finishes, then checkpoints the rewritten pages out of the WAL so the
+    main file shrinks.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM main"))
+        await conn.execute(text("PRAGMA main.wal_checkpoint(TRUNCATE)"))
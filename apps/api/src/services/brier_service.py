@@ -0,0 +1,199 @@
+"""
+Brier score aggregates for resolved predictions.
+
+Scores are kept as running sums in `BrierAggregate` so `GET /brier` reads a
+handful of rows instead of rescanning every resolved prediction. The sums are
+updated in the same transaction that resolves a prediction, and
+`rebuild_brier_aggregates` recomputes them from scratch for repair.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import (
+    BrierAggregate,
+    BrierDimension,
+    BrierScore,
+    BrierSummary,
+    HumanReview,
+    Prediction,
+    PredictionStatus,
+    PredictionUpdate,
+    UNREVIEWED,
+)
+from .archive_service import ARCHIVE, archive_attached
+
+logger = logging.getLogger("varinaut.services.brier")
+
+AggregateKey = Tuple[BrierDimension, str]
+
+
+def _scored_predictions_query():
+    """Latest update of every resolved prediction, joined with the review of that update."""
+    latest = (
+        select(
+            PredictionUpdate.id.label("update_id"),
+            PredictionUpdate.likelihood,
+            Prediction.outcome,
+            Prediction.resolved_at,
+            func.row_number()
+            .over(
+                partition_by=Prediction.id,
+                order_by=(PredictionUpdate.created_at.desc(), PredictionUpdate.id.desc()),
+            )
+            .label("rn"),
+        )
+        .join(PredictionUpdate, PredictionUpdate.prediction_id == Prediction.id)
+        .where(Prediction.status == PredictionStatus.RESOLVED, Prediction.outcome.is_not(None))
+        .subquery()
+    )
+    return (
+        select(
+            latest.c.likelihood,
+            latest.c.outcome,
+            latest.c.resolved_at,
+            HumanReview.name,
+            HumanReview.decision,
+        )
+        .outerjoin(HumanReview, HumanReview.update_id == latest.c.update_id)
+        .where(latest.c.rn == 1)
+    )
+
+
+def _buckets(
+    resolved_at: Optional[datetime], reviewer: Optional[str], decision: Optional[str]
+) -> List[AggregateKey]:
+    return [
+        (BrierDimension.ALL, BrierDimension.ALL.value),
+        (BrierDimension.MONTH, resolved_at.strftime("%Y-%m") if resolved_at else "unknown"),
+        (BrierDimension.REVIEWER, reviewer or UNREVIEWED),
+        (BrierDimension.DECISION, decision or UNREVIEWED),
+    ]
+
+
+async def record_resolution(session: AsyncSession, prediction: Prediction) -> bool:
+    """Add a newly resolved prediction to the aggregates without committing.
+
+    Returns False if the prediction has no updates and therefore no forecast to score.
+    """
+    result = await session.execute(
+        select(PredictionUpdate.id, PredictionUpdate.likelihood)
+        .where(PredictionUpdate.prediction_id == prediction.id)
+        .order_by(PredictionUpdate.created_at.desc(), PredictionUpdate.id.desc())
+        .limit(1)
+    )
+    latest = result.first()
+    if latest is None:
+        logger.info("Prediction %s resolved without updates; not scored", prediction.id)
+        return False
+
+    review = (
+        await session.execute(select(HumanReview).where(HumanReview.update_id == latest.id))
+    ).scalars().first()
+
+    outcome = int(prediction.outcome)
+    for dimension, bucket in _buckets(
+        prediction.resolved_at,
+        review.name if review else None,
+        review.decision.value if review else None,
+    ):
+        stmt = sqlite_insert(BrierAggregate).values(
+            dimension=dimension,
+            bucket=bucket,
+            count=1,
+            sum_squared_error=(latest.likelihood - outcome) ** 2,
+            sum_likelihood=latest.likelihood,
+            sum_outcome=outcome,
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BrierAggregate.dimension, BrierAggregate.bucket],
+            set_={
+                "count": BrierAggregate.count + excluded.count,
+                "sum_squared_error": BrierAggregate.sum_squared_error + excluded.sum_squared_error,
+                "sum_likelihood": BrierAggregate.sum_likelihood + excluded.sum_likelihood,
+                "sum_outcome": BrierAggregate.sum_outcome + excluded.sum_outcome,
+                "updated_at": func.now(),
+            },
+        )
+        await session.execute(stmt)
+    return True
+
+
+async def rebuild_brier_aggregates(session: AsyncSession) -> int:
+    """Recompute every aggregate from the resolved predictions and commit.
+
+    Archived predictions are included when the archive is attached.
+    Returns the number of predictions scored.
+    """
+    sums: Dict[AggregateKey, List[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0])
+    scored = 0
+    sources = [{}, ARCHIVE] if await archive_attached(session) else [{}]
+    for execution_options in sources:
+        result = await session.stream(
+            _scored_predictions_query(), execution_options=execution_options
+        )
+        async for likelihood, outcome, resolved_at, reviewer, decision in result:
+            outcome = int(outcome)
+            for key in _buckets(resolved_at, reviewer, decision.value if decision else None):
+                entry = sums[key]
+                entry[0] += 1
+                entry[1] += (likelihood - outcome) ** 2
+                entry[2] += likelihood
+                entry[3] += outcome
+            scored += 1
+
+    await session.execute(delete(BrierAggregate))
+    if sums:
+        await session.execute(
+            insert(BrierAggregate),
+            [
+                {
+                    "dimension": dimension,
+                    "bucket": bucket,
+                    "count": count,
+                    "sum_squared_error": error,
+                    "sum_likelihood": likelihood,
+                    "sum_outcome": outcome,
+                }
+                for (dimension, bucket), (count, error, likelihood, outcome) in sums.items()
+            ],
+        )
+    await session.commit()
+    logger.info("Rebuilt Brier aggregates from %d resolved predictions", scored)
+    return scored
+
+
+def _score(aggregate: BrierAggregate) -> BrierScore:
+    return BrierScore(
+        bucket=aggregate.bucket,
+        count=aggregate.count,
+        brier_score=aggregate.sum_squared_error / aggregate.count,
+        mean_likelihood=aggregate.sum_likelihood / aggregate.count,
+        base_rate=aggregate.sum_outcome / aggregate.count,
+    )
+
+
+async def get_brier_summary(session: AsyncSession) -> BrierSummary:
+    """Read the precomputed aggregates; cost depends on the number of buckets, not predictions."""
+    result = await session.execute(
+        select(BrierAggregate).where(BrierAggregate.count > 0).order_by(BrierAggregate.bucket)
+    )
+    summary = BrierSummary()
+    for aggregate in result.scalars():
+        score = _score(aggregate)
+        if aggregate.dimension == BrierDimension.ALL:
+            summary.overall = score
+        elif aggregate.dimension == BrierDimension.MONTH:
+            summary.by_month.append(score)
+        elif aggregate.dimension == BrierDimension.REVIEWER:
+            summary.by_reviewer.append(score)
+        elif aggregate.dimension == BrierDimension.DECISION:
+            summary.by_decision.append(score)
+    return summary
@@ -0,0 +1,146 @@
+"""
+Delta sync of predictions, updates and reviews for polling clients.
+
+`load_changes` returns the rows created or updated after a position, and
+tombstones of the rows deleted since. Each synced table is read in keyset
+order of `COALESCE(updated_at, created_at)` and id, which the
+`ix_<table>_changed_at` indexes serve; tombstones are read in id order,
+which is commit order because SQLite has a single writer.
+
+Timestamps are taken before their transaction holds the write lock:
+`created_at` when the object is built, and a writer may then wait up to the
+busy timeout. A row can therefore commit with a time older than rows that
+were already sent, so positions never move past `now - settle`. Rows that
+changed in that window are sent again on the next call, and clients must
+apply changes idempotently, by table and id.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import String, and_, delete, func, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import HumanReview, Prediction, PredictionUpdate, Tombstone
+
+# Position keys besides the synced tables' names
+TOMBSTONES = "tombstone"
+ISSUED = "issued"
+
+# Keyset positions compare against the stored text, in the format SQLAlchemy
+# stores datetimes in; `updated_at` set by the ORM is SQLite's
+# CURRENT_TIMESTAMP, without the fraction, which still orders correctly
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_SYNCED_MODELS = (Prediction, PredictionUpdate, HumanReview)
+
+
+class Changes(NamedTuple):
+    predictions: List[Prediction]
+    updates: List[PredictionUpdate]
+    reviews: List[HumanReview]
+    deleted: List[Tombstone]
+    position: Dict[str, Any]  # pass back to `load_changes` for the next changes
+    has_more: bool  # a table had more settled changes than `limit`
+
+
+def check_position(position: Dict[str, Any]) -> None:
+    """Raise ValueError unless `position` has the shape `load_changes` returns."""
+    for model in _SYNCED_MODELS:
+        key = position.get(model.__tablename__)
+        if key is None:
+            continue
+        if not (
+            isinstance(key, list)
+            and len(key) == 2
+            and isinstance(key[0], str)
+            and isinstance(key[1], int)
+        ):
+            raise ValueError(f"Invalid position for {model.__tablename__}")
+    if not isinstance(position.get(TOMBSTONES), int) or not isinstance(position.get(ISSUED), str):
+        raise ValueError("Invalid position")
+    datetime.strptime(position[ISSUED], _TIME_FORMAT)
+
+
+def position_expired(position: Dict[str, Any], retention: timedelta) -> bool:
+    """Whether tombstones after `position` may already have been pruned."""
+    return datetime.strptime(position[ISSUED], _TIME_FORMAT) < datetime.utcnow() - retention
+
+
+def _changed_at(table):
+    return type_coerce(func.coalesce(table.c.updated_at, table.c.created_at), String)
+
+
+async def load_changes(
+    session: AsyncSession,
+    position: Optional[Dict[str, Any]],
+    limit: int,
+    settle: timedelta,
+) -> Changes:
+    """Up to `limit` changed rows per table after `position`, or all rows from the start.
+
+    The queries do not share a snapshot: pysqlite only opens a transaction
+    before writes, so every SELECT reads the database as of its own start.
+    Tombstones are therefore read first. A row deleted after that may still
+    be returned, but its tombstone is after the returned position and is
+    sent on the next call; reading tombstones last would skip it instead.
+    """
+    now = datetime.utcnow()
+    settled = ((now - settle).strftime(_TIME_FORMAT), 0)
+    position = position or {}
+    next_position: Dict[str, Any] = {ISSUED: now.strftime(_TIME_FORMAT)}
+    has_more = False
+
+    last_tombstone = position.get(TOMBSTONES)
+    deleted: List[Tombstone] = []
+    if last_tombstone is None:
+        # A first sync reads every current row, so earlier deletes don't matter
+        last_tombstone = await session.scalar(select(func.max(Tombstone.id))) or 0
+    else:
+        deleted = list(
+            await session.scalars(
+                select(Tombstone)
+                .where(Tombstone.id > last_tombstone)
+                .order_by(Tombstone.id)
+                .limit(limit + 1)
+            )
+        )
+        if len(deleted) > limit:
+            deleted = deleted[:limit]
+            has_more = True
+        if deleted:
+            last_tombstone = deleted[-1].id
+    next_position[TOMBSTONES] = last_tombstone
+
+    rows = []
+    for model in _SYNCED_MODELS:
+        table = model.__table__
+        changed_at = _changed_at(table)
+        query = select(model, changed_at).order_by(changed_at, table.c.id).limit(limit + 1)
+        key = position.get(table.name)
+        if key is not None:
+            # The leading range lets SQLite search the expression index
+            query = query.where(
+                changed_at >= key[0],
+                or_(changed_at > key[0], and_(changed_at == key[0], table.c.id > key[1])),
+            )
+        result = (await session.execute(query)).all()
+        truncated = len(result) > limit
+        result = result[:limit]
+        rows.append([row for row, _ in result])
+
+        if result:
+            last = (result[-1][1], result[-1][0].id)
+            has_more = has_more or (truncated and last <= settled)
+            # Up to the settle window, and never back past the old position
+            key = max(min(last, settled), tuple(key)) if key is not None else min(last, settled)
+        next_position[table.name] = list(key) if key is not None else None
+
+    return Changes(*rows, deleted, next_position, has_more)
+
+
+async def prune_tombstones(session: AsyncSession, deleted_before: datetime) -> int:
+    """Delete tombstones older than `deleted_before`; returns how many were deleted."""
+    result = await session.execute(delete(Tombstone).where(Tombstone.deleted_at < deleted_before))
+    await session.commit()
+    return result.rowcount
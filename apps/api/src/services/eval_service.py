@@ -0,0 +1,243 @@
+"""
+Calibration and scoring of forecasts against resolved outcomes.
+
+Every PredictionUpdate of a resolved prediction is a forecast. Forecasts are
+streamed from one query, `LOAD_CHUNK_ROWS` rows at a time, into columnar NumPy
+arrays and all metrics are computed with vectorized binning (`np.bincount`),
+so cost is dominated by the query rather than by per-row Python, and memory by
+the arrays rather than by row objects. Archived predictions are resolved, so
+their forecasts are read from the archive as well when it is attached.
+"""
+
+from itertools import chain
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import (
+    CalibrationBin,
+    CalibrationReport,
+    Prediction,
+    PredictionStatus,
+    PredictionUpdate,
+    ScoreReport,
+)
+from .archive_service import ARCHIVE, archive_attached
+
+# Likelihoods are clipped away from 0 and 1 so log loss stays finite
+LOG_LOSS_EPSILON = 1e-15
+
+# Rows fetched from the cursor per batch; each batch is 32 bytes per row as arrays
+LOAD_CHUNK_ROWS = 50_000
+
+
+class Forecasts(NamedTuple):
+    likelihood: np.ndarray  # float64, in [0, 1]
+    outcome: np.ndarray  # float64, 0.0 or 1.0
+    horizon_days: np.ndarray  # float64, days from the forecast to the prediction's known_date
+    require_review: np.ndarray  # bool
+
+
+def _forecasts_query(latest_only: bool):
+    horizon = func.julianday(Prediction.known_date) - func.julianday(PredictionUpdate.created_at)
+    columns = [
+        PredictionUpdate.likelihood,
+        Prediction.outcome,
+        func.coalesce(horizon, 0.0),
+        Prediction.require_review,
+    ]
+    if latest_only:
+        rn = (
+            func.row_number()
+            .over(
+                partition_by=PredictionUpdate.prediction_id,
+                order_by=(PredictionUpdate.created_at.desc(), PredictionUpdate.id.desc()),
+            )
+            .label("rn")
+        )
+        columns.append(rn)
+    query = (
+        select(*columns)
+        .join(Prediction, Prediction.id == PredictionUpdate.prediction_id)
+        .where(Prediction.status == PredictionStatus.RESOLVED, Prediction.outcome.is_not(None))
+    )
+    if latest_only:
+        latest = query.subquery()
+        query = select(*list(latest.c)[:4]).where(latest.c.rn == 1)
+    return query
+
+
+async def load_forecasts(
+    session: AsyncSession, latest_only: bool = False, chunk_rows: int = LOAD_CHUNK_ROWS
+) -> Forecasts:
+    """Load (likelihood, outcome, horizon, require_review) for resolved predictions as arrays.
+
+    Rows are streamed `chunk_rows` at a time, so only one batch of Row
+    objects is alive at once. Includes archived predictions when the
+    archive is attached.
+    """
+    # Core execution on the session's connection skips ORM row processing
+    connection = await session.connection()
+    sources = [{}, ARCHIVE] if await archive_attached(session) else [{}]
+    chunks = []
+    for execution_options in sources:
+        result = await connection.stream(
+            _forecasts_query(latest_only).execution_options(
+                yield_per=chunk_rows, **execution_options
+            )
+        )
+        async for rows in result.partitions():
+            # Flatten each batch straight into floats; building the matrix from
+            # Row objects with np.array() is an order of magnitude slower
+            chunks.append(
+                np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=4 * len(rows))
+            )
+    data = np.concatenate(chunks).reshape(-1, 4) if chunks else np.empty((0, 4))
+    return Forecasts(data[:, 0], data[:, 1], data[:, 2], data[:, 3].astype(bool))
+
+
+class _BinSums(NamedTuple):
+    """Per-group, per-bin sums; every field has a leading group axis."""
+    counts: np.ndarray  # (groups, bins)
+    sum_likelihood: np.ndarray  # (groups, bins)
+    sum_outcome: np.ndarray  # (groups, bins)
+    sum_squared_error: np.ndarray  # (groups,)
+    sum_log_loss: np.ndarray  # (groups,)
+
+    def total(self) -> "_BinSums":
+        """Collapse all groups into one."""
+        return _BinSums(*(getattr(self, name).sum(axis=0, keepdims=True) for name in self._fields))
+
+
+class _Terms(NamedTuple):
+    """Per-forecast quantities shared by every grouping."""
+    bin_index: np.ndarray
+    likelihood: np.ndarray
+    outcome: np.ndarray
+    squared_error: np.ndarray
+    log_loss: np.ndarray
+
+
+def _terms(likelihood: np.ndarray, outcome: np.ndarray, bins: int) -> _Terms:
+    clipped = np.clip(likelihood, LOG_LOSS_EPSILON, 1 - LOG_LOSS_EPSILON)
+    # Outcomes are 0 or 1, so log loss only needs the log of the probability given to what happened
+    return _Terms(
+        bin_index=np.minimum((likelihood * bins).astype(np.intp), bins - 1),
+        likelihood=likelihood,
+        outcome=outcome,
+        squared_error=(likelihood - outcome) ** 2,
+        log_loss=-np.log(np.where(outcome > 0.5, clipped, 1 - clipped)),
+    )
+
+
+def _bin_sums(group: np.ndarray, groups: int, terms: _Terms, bins: int) -> _BinSums:
+    """Accumulate every group's reliability-diagram bins with one `bincount` per quantity."""
+    cell = group * bins + terms.bin_index
+    size = groups * bins
+
+    def per_cell(weights=None) -> np.ndarray:
+        return np.bincount(cell, weights=weights, minlength=size).reshape(groups, bins)
+
+    return _BinSums(
+        counts=per_cell(),
+        sum_likelihood=per_cell(terms.likelihood),
+        sum_outcome=per_cell(terms.outcome),
+        sum_squared_error=np.bincount(group, weights=terms.squared_error, minlength=groups),
+        sum_log_loss=np.bincount(group, weights=terms.log_loss, minlength=groups),
+    )
+
+
+def _reports(labels: Sequence[str], sums: _BinSums) -> List[ScoreReport]:
+    """Turn bin sums into one ScoreReport per group, vectorized across groups and bins."""
+    bins = sums.counts.shape[1]
+    edges = np.linspace(0.0, 1.0, bins + 1)
+
+    counts = sums.counts
+    n = counts.sum(axis=1)
+    filled = counts > 0
+    mean_likelihood = np.divide(
+        sums.sum_likelihood, counts, out=np.zeros(counts.shape), where=filled
+    )
+    observed_frequency = np.divide(
+        sums.sum_outcome, counts, out=np.zeros(counts.shape), where=filled
+    )
+
+    has_forecasts = n > 0
+    safe_n = np.where(has_forecasts, n, 1)
+    base_rate = sums.sum_outcome.sum(axis=1) / safe_n
+    brier_score = sums.sum_squared_error / safe_n
+    reliability = (counts * (mean_likelihood - observed_frequency) ** 2).sum(axis=1) / safe_n
+    resolution = (counts * (observed_frequency - base_rate[:, None]) ** 2).sum(axis=1) / safe_n
+    uncertainty = base_rate * (1 - base_rate)
+    log_loss = sums.sum_log_loss / safe_n
+
+    reports = []
+    for g, label in enumerate(labels):
+        scored = bool(has_forecasts[g])
+        reports.append(
+            ScoreReport(
+                label=label,
+                count=int(n[g]),
+                brier_score=float(brier_score[g]) if scored else None,
+                reliability=float(reliability[g]) if scored else None,
+                resolution=float(resolution[g]) if scored else None,
+                uncertainty=float(uncertainty[g]) if scored else None,
+                log_loss=float(log_loss[g]) if scored else None,
+                bins=[
+                    CalibrationBin(
+                        lower=float(edges[i]),
+                        upper=float(edges[i + 1]),
+                        count=int(counts[g, i]),
+                        mean_likelihood=float(mean_likelihood[g, i]) if filled[g, i] else None,
+                        observed_frequency=(
+                            float(observed_frequency[g, i]) if filled[g, i] else None
+                        ),
+                    )
+                    for i in range(bins)
+                ],
+            )
+        )
+    return reports
+
+
+def score_forecasts(
+    label: str, likelihood: np.ndarray, outcome: np.ndarray, bins: int
+) -> ScoreReport:
+    """Brier score with its reliability/resolution/uncertainty decomposition, log loss and
+    a reliability diagram over `bins` equal-width bins."""
+    group = np.zeros(likelihood.size, dtype=np.intp)
+    return _reports([label], _bin_sums(group, 1, _terms(likelihood, outcome, bins), bins))[0]
+
+
+def horizon_labels(horizons: Sequence[int]) -> List[str]:
+    bounds = [0, *horizons]
+    labels = [f"{lower}-{upper}d" for lower, upper in zip(bounds, bounds[1:])]
+    return labels + [f"{bounds[-1]}d+"]
+
+
+def build_report(forecasts: Forecasts, bins: int, horizons: Sequence[int]) -> CalibrationReport:
+    """Score all forecasts, then each known_date horizon bucket and each require_review value.
+
+    Each slicing is a single grouped pass; the overall report is the sum of
+    the horizon groups since they partition all forecasts.
+    """
+    terms = _terms(forecasts.likelihood, forecasts.outcome, bins)
+
+    # Bucket 0 holds forecasts made less than horizons[0] days ahead (including late ones)
+    labels = horizon_labels(horizons)
+    horizon_group = np.zeros(forecasts.horizon_days.size, dtype=np.intp)
+    for edge in horizons:
+        horizon_group += forecasts.horizon_days >= edge
+    horizon_sums = _bin_sums(horizon_group, len(labels), terms, bins)
+
+    # Group 0 is review_required, group 1 no_review
+    review_group = (~forecasts.require_review).astype(np.intp)
+    review_sums = _bin_sums(review_group, 2, terms, bins)
+
+    return CalibrationReport(
+        overall=_reports(["all"], horizon_sums.total())[0],
+        by_horizon=_reports(labels, horizon_sums),
+        by_review=_reports(["review_required", "no_review"], review_sums),
+    )
@@ -0,0 +1,90 @@
+"""
+Prediction write operations shared by the API and command-line tools.
+"""
+
+import logging
+from itertools import islice
+from typing import Any, Iterable, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import (
+    Prediction,
+    PredictionPost,
+    PredictionBatchError,
+    PredictionBatchResult,
+)
+
+logger = logging.getLogger("varinaut.services.prediction")
+
+
+def validate_prediction_rows(
+    rows: Iterable[Any], start: int = 0
+) -> Tuple[List[Tuple[int, dict]], List[PredictionBatchError]]:
+    """Validate raw rows against `PredictionPost`.
+
+    Returns `(index, insert values)` pairs for valid rows and an error entry for
+    each invalid one, with indexes counted from `start`.
+    """
+    valid: List[Tuple[int, dict]] = []
+    errors: List[PredictionBatchError] = []
+    for index, row in enumerate(rows, start=start):
+        try:
+            payload = PredictionPost.model_validate(row)
+        except ValidationError as e:
+            errors.append(
+                PredictionBatchError(
+                    index=index,
+                    errors=e.errors(include_url=False, include_context=False, include_input=False),
+                )
+            )
+            continue
+        values = Prediction.model_validate(payload).model_dump(exclude={"id"})
+        valid.append((index, values))
+    return valid, errors
+
+
+async def create_predictions(
+    session: AsyncSession,
+    rows: Iterable[Any],
+    chunk_size: int,
+) -> PredictionBatchResult:
+    """Validate and insert many predictions, committing once at the end.
+
+    Each chunk of valid rows is written with a single multi-row
+    `INSERT ... RETURNING` inside its own savepoint, so a database error only
+    fails the rows of that chunk. Invalid rows are reported by their index in
+    `rows` and never abort the batch.
+    """
+    result = PredictionBatchResult()
+    iterator = iter(rows)
+    start = 0
+    while chunk := list(islice(iterator, chunk_size)):
+        valid, errors = validate_prediction_rows(chunk, start=start)
+        result.errors.extend(errors)
+        start += len(chunk)
+        if not valid:
+            continue
+
+        try:
+            async with session.begin_nested():
+                created = await session.scalars(
+                    insert(Prediction).returning(Prediction),
+                    [values for _, values in valid],
+                )
+                result.created.extend(created.all())
+        except SQLAlchemyError as e:
+            logger.warning("Batch chunk of %d predictions failed: %s", len(valid), e)
+            result.errors.extend(
+                PredictionBatchError(
+                    index=index, errors=[{"msg": "database error", "type": "database"}]
+                )
+                for index, _ in valid
+            )
+
+    await session.commit()
+    result.errors.sort(key=lambda error: error.index)
+    return result
@@ -0,0 +1,120 @@
+"""
+Likelihood history of predictions as downsampled time series.
+
+Updates are loaded in one query per request (however many predictions it
+covers) as columnar NumPy arrays, with timestamps converted to epoch
+milliseconds by SQLite, and reduced to at most `points` samples with
+Largest-Triangle-Three-Buckets. LTTB keeps the first and last update and,
+in each bucket between them, the update forming the largest triangle with
+the previously kept one and the next bucket's mean, so peaks and reversals
+survive downsampling where averaging or striding would flatten them.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Integer, and_, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Prediction, PredictionSeries, PredictionUpdate
+
+# Julian day of 1970-01-01T00:00:00
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+_MS_PER_DAY = 86_400_000.0
+
+
+def lttb(xs: np.ndarray, ys: np.ndarray, points: int) -> np.ndarray:
+    """Indices of at most `points` samples chosen by Largest-Triangle-Three-Buckets.
+
+    `xs` must be sorted. Series that already fit, and `points` below 3,
+    return every index.
+    """
+    n = len(xs)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    # Buckets between the fixed first and last samples: [bounds[i], bounds[i + 1])
+    bounds = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.intp) + 1
+    bounds[-1] = n - 1
+    # Bucket means from prefix sums; the bucket after the last one is the last sample
+    sizes = bounds[1:] - bounds[:-1]
+    cum_x = np.concatenate(([0.0], np.cumsum(xs)))
+    cum_y = np.concatenate(([0.0], np.cumsum(ys)))
+    mean_x = np.append((cum_x[bounds[1:]] - cum_x[bounds[:-1]]) / sizes, xs[-1])
+    mean_y = np.append((cum_y[bounds[1:]] - cum_y[bounds[:-1]]) / sizes, ys[-1])
+
+    selected = np.empty(points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        start, end = bounds[i], bounds[i + 1]
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs(
+            (xs[a] - mean_x[i + 1]) * (ys[start:end] - ys[a])
+            - (xs[a] - xs[start:end]) * (mean_y[i + 1] - ys[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+async def load_series(
+    session: AsyncSession,
+    prediction_ids: Sequence[int],
+    points: int,
+    execution_options: Optional[dict] = None,
+) -> List[PredictionSeries]:
+    """Downsampled likelihood series of the predictions among `prediction_ids` that exist.
+
+    Series are ordered by prediction id; predictions without updates get
+    empty ones. `execution_options` are passed to the query, e.g. to read
+    the archive.
+    """
+    epoch_ms = (func.julianday(PredictionUpdate.created_at) - _UNIX_EPOCH_JULIAN_DAY) * _MS_PER_DAY
+    # One row per prediction with its updates concatenated by SQLite, read
+    # from the covering (prediction_id, created_at, likelihood) index: parsing
+    # three strings is several times cheaper than fetching a row per update.
+    # The aggregates step through the same rows, so the lists line up; their
+    # order is unspecified and restored below.
+    query = (
+        select(
+            Prediction.id,
+            func.group_concat(PredictionUpdate.id),
+            func.group_concat(cast(func.round(epoch_ms), Integer)),
+            func.group_concat(PredictionUpdate.likelihood),
+        )
+        .outerjoin(
+            PredictionUpdate,
+            and_(
+                PredictionUpdate.prediction_id == Prediction.id,
+                PredictionUpdate.likelihood.is_not(None),
+            ),
+        )
+        .where(Prediction.id.in_(prediction_ids))
+        .group_by(Prediction.id)
+        .order_by(Prediction.id)
+    )
+    connection = await session.connection()
+    rows = (await connection.execute(query, execution_options=execution_options)).all()
+
+    series = []
+    for prediction_id, update_ids, timestamps, likelihoods in rows:
+        if update_ids is None:  # outer join row: no updates
+            series.append(PredictionSeries(prediction_id=prediction_id, total_points=0))
+            continue
+        ids = np.fromstring(update_ids, dtype=np.int64, sep=",")
+        x = np.fromstring(timestamps, dtype=np.int64, sep=",")
+        y = np.fromstring(likelihoods, dtype=np.float64, sep=",")
+        # Chronological, ties broken by id
+        order = np.lexsort((ids, x))
+        x, y = x[order], y[order]
+        keep = lttb(x.astype(np.float64), y, points)
+        series.append(
+            PredictionSeries(
+                prediction_id=prediction_id,
+                total_points=len(x),
+                timestamps=x[keep].tolist(),
+                likelihoods=y[keep].tolist(),
+            )
+        )
+    return series
@@ -0,0 +1,273 @@
+"""
+Shared HTTP client for research source providers.
+
+Research fans out many concurrent calls to the AI model, X, Polymarket and
+Google. `SourceClient` owns one pooled `httpx.AsyncClient` for all of them,
+so connections stay open across requests. Each provider also gets its own
+limits, so a burst of searches cannot use up another provider's quota or
+connections:
+
+- a token bucket that allows `rate` requests per second on average, and
+  up to `burst` requests back to back
+- a semaphore that allows `concurrency` requests in flight
+
+Connection errors, timeouts and 429, 500, 502, 503 and 504 responses are
+retried up to `max_retries` times. The wait between attempts is an
+exponential backoff with full jitter. A `Retry-After` header overrides the
+backoff and pauses the provider's bucket, so the other requests to that
+provider hold off too. A response asking for a longer wait than
+`max_backoff` is returned as is.
+
+Requests that are not idempotent, POST and PATCH unless the caller says
+otherwise, may already have taken effect when a response is lost or fails,
+so they are only retried when the provider cannot have seen them: the
+connection was never made, or a 429 or 503 with `Retry-After` refused them.
+
+`create_app` opens one client per process in its lifespan, as
+`app.state.source_client`; endpoints get it with
+`Depends(get_source_client)`. Providers are plain base URLs, so tests can
+point them at local stub servers.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import httpx
+from fastapi import Request
+
+from .config import Settings, SourceLimits
+from .metrics import metrics
+
+logger = logging.getLogger("varinaut.source_client")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Statuses that, with `Retry-After`, refuse a request without processing it
+REFUSED_STATUSES = frozenset({429, 503})
+# Raised before the request was sent
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# For providers missing from `Settings.source_limits`
+DEFAULT_LIMITS = SourceLimits(rate=1.0)
+
+
+class Provider(NamedTuple):
+    name: str
+    base_url: str
+    limits: SourceLimits = DEFAULT_LIMITS
+    headers: Optional[Dict[str, str]] = None  # sent with every request, e.g. credentials
+    params: Optional[Dict[str, str]] = None
+
+
+def providers_from_settings(settings: Settings) -> List[Provider]:
+    """The providers that have a base URL, with their credentials and limits."""
+    providers = [
+        Provider(
+            "ai_model",
+            settings.ai_model_api_url,
+            headers=(
+                {"Authorization": f"Bearer {settings.ai_model_api_key}"}
+                if settings.ai_model_api_key
+                else None
+            ),
+        ),
+        # X and Polymarket trading endpoints sign requests with their keys;
+        # callers add those per request
+        Provider("x", settings.x_api_url),
+        Provider("polymarket", settings.polymarket_api_url),
+        Provider(
+            "google",
+            settings.google_cse_url,
+            params=(
+                {"key": settings.google_api_key, "cx": settings.google_cse_id}
+                if settings.google_api_key
+                else None
+            ),
+        ),
+    ]
+    return [
+        provider._replace(limits=settings.source_limits.get(provider.name, DEFAULT_LIMITS))
+        for provider in providers
+        if provider.base_url
+    ]
+
+
+class TokenBucket:
+    """Hands out `rate` tokens per second on average, at most `burst` at once."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated: Optional[float] = None
+        self._paused_until = 0.0
+        # Waiters take tokens one at a time, in arrival order
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for a token and take it."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+                self._updated = now
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+                if wait <= 0:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for `seconds`, e.g. after the provider returned 429."""
+        now = asyncio.get_running_loop().time()
+        self._paused_until = max(self._paused_until, now + seconds)
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait according to the response's `Retry-After` header, if any."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class SourceClient:
+    """Sends requests to research source providers within each provider's limits."""
+
+    def __init__(
+        self,
+        providers: Iterable[Provider],
+        *,
+        max_connections: int = 100,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.providers = {provider.name: provider for provider in providers}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._buckets = {
+            name: TokenBucket(provider.limits.rate, provider.limits.burst)
+            for name, provider in self.providers.items()
+        }
+        self._slots = {
+            name: asyncio.Semaphore(provider.limits.concurrency)
+            for name, provider in self.providers.items()
+        }
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            timeout=timeout,
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._client.is_closed
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        await self._client.aclose()
+
+    async def get(self, provider: str, path: str = "", **kwargs) -> httpx.Response:
+        return await self.request(provider, "GET", path, **kwargs)
+
+    async def post(self, provider: str, path: str = "", **kwargs) -> httpx.Response:
+        return await self.request(provider, "POST", path, **kwargs)
+
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        path: str = "",
+        *,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send `method` to `path` under the provider's base URL, retrying failures.
+
+        Takes the keyword arguments of `httpx.AsyncClient.request`; `headers`
+        and `params` are merged over the provider's own. `idempotent`
+        defaults to whether `method` is; pass True for a POST that is safe
+        to repeat, e.g. a search. Returns the last response, whatever its
+        status, and raises `httpx.TransportError` when the last attempt
+        could not connect or timed out.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        spec = self.providers[provider]
+        url = spec.base_url.rstrip("/") + ("/" + path.lstrip("/") if path else "")
+        kwargs["headers"] = {**(spec.headers or {}), **(kwargs.get("headers") or {})}
+        kwargs["params"] = {**(spec.params or {}), **(kwargs.get("params") or {})}
+        bucket, slots = self._buckets[provider], self._slots[provider]
+        labels = (provider,)
+        loop = asyncio.get_running_loop()
+
+        attempt = 0
+        while True:
+            queued = loop.time()
+            await bucket.acquire()
+            async with slots:
+                started = loop.time()
+                metrics.source_wait_time.observe(labels, started - queued)
+                try:
+                    response = await self._client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    metrics.source_requests.inc((provider, "error"))
+                    if attempt == self.max_retries or not (
+                        idempotent or isinstance(e, NOT_SENT_ERRORS)
+                    ):
+                        raise
+                    response, reason = None, repr(e)
+                else:
+                    metrics.source_requests.inc((provider, str(response.status_code)))
+                    reason = str(response.status_code)
+                finally:
+                    metrics.source_request_time.observe(labels, loop.time() - started)
+
+            delay = self._delay(attempt)
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                wait = retry_after(response)
+                if not idempotent and (
+                    wait is None or response.status_code not in REFUSED_STATUSES
+                ):
+                    return response
+                if wait is not None:
+                    if wait > self.max_backoff:
+                        return response
+                    bucket.pause(wait)
+                    # Jittered, so the paused requests don't all return at once
+                    delay = wait + random.uniform(0, self.backoff)
+            logger.info("Retrying %s %s on %s in %.2fs (%s)", method, url, provider, delay, reason)
+            metrics.source_retries.inc(labels)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _delay(self, attempt: int) -> float:
+        # Full jitter: anywhere up to the exponential backoff
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+async def get_source_client(request: Request) -> SourceClient:
+    return request.app.state.source_client
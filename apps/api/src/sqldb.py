@@ -1,19 +1,123 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Any, Dict, List
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from .config import Settings
+from .metrics import instrument_engine
+from .query_monitor import instrument_queries
+from .services.archive_service import ARCHIVE_SCHEMA, attach_statements
+
+
+def _sqlite_pragmas(settings: Settings, read_only: bool) -> List[str]:
+    pragmas = []
+    if settings.archive_database_path:
+        # Attached first, so journal_mode applies to the archive as well
+        pragmas += attach_statements(settings.archive_database_path)
+    pragmas += [
+        f"PRAGMA journal_mode = {settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms:d}",
+        # A negative cache_size is interpreted by SQLite as KiB rather than pages
+        f"PRAGMA cache_size = {-settings.sqlite_cache_size_kib:d}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size:d}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def create_engine_from_settings(settings: Settings, read_only: bool = False) -> AsyncEngine:
+    """
+    Create an async engine for `settings.database_url`.
+
+    For SQLite every new connection is configured with the pragmas from
+    `settings` (WAL, synchronous, busy timeout, cache and mmap sizes) and
+    attaches the archive database, if one is set, creating its tables. A
+    read-only engine gets its own, larger pool and `query_only` connections,
+    so in WAL mode reads never wait for the single writer connection.
+    """
+    url = make_url(settings.database_url)
+    kwargs = {}
+    if url.database not in (None, "", ":memory:"):
+        kwargs.update(
+            pool_size=settings.db_read_pool_size if read_only else settings.db_pool_size,
+            max_overflow=settings.db_read_max_overflow if read_only else settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+
+    new_engine = create_async_engine(url, echo=settings.db_echo, future=True, **kwargs)
+
+    if new_engine.dialect.name == "sqlite":
+        pragmas = _sqlite_pragmas(settings, read_only)
 
-from .config import get_settings
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+            # Lets `archive_attached` answer without querying the connection
+            connection_record.info[ARCHIVE_SCHEMA] = bool(settings.archive_database_path)
 
-settings = get_settings()
+    return new_engine
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    future=True,
-)
 
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+class Database:
+    """
+    The write and read engines of one application, with their session factories.
 
+    Nothing connects until the first session is used. `create_app` builds one
+    in its lifespan and stores it as `app.state.db`; scripts build their own.
+    """
 
-async def get_session() -> AsyncSession:
-    async with async_session() as session:
+    def __init__(self, settings: Settings):
+        self.engine = create_engine_from_settings(settings)
+        self.read_engine = create_engine_from_settings(settings, read_only=True)
+        for engine, name in ((self.engine, "write"), (self.read_engine, "read")):
+            instrument_engine(engine, name)
+            instrument_queries(engine, settings)
+        self.session = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.read_session = sessionmaker(
+            self.read_engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+    def pool_statuses(self) -> Dict[str, Dict[str, Any]]:
+        return {"write": pool_status(self.engine), "read": pool_status(self.read_engine)}
+
+    async def dispose(self) -> None:
+        """Close pooled connections."""
+        await self.read_engine.dispose()
+        await self.engine.dispose()
+
+
+async def get_session(request: Request) -> AsyncSession:
+    async with request.app.state.db.session() as session:
         yield session
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    """Session bound to the read-only engine, for endpoints that never write."""
+    async with request.app.state.db.read_session() as session:
+        yield session
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, Any]:
+    """Connection pool usage; `saturation` is checked-out connections over the pool's capacity."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(pool._max_overflow, 0)  # pylint: disable=protected-access
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,  # pylint: disable=protected-access
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "saturation": checked_out / capacity if capacity else 0.0,
+    }
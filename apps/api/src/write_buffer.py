@@ -0,0 +1,280 @@
+"""
+Group commit for high-rate `PredictionUpdate` and `Source` inserts.
+
+Inserting each update and its sources in a transaction of its own costs a
+WAL sync per update, and concurrent writers queue behind SQLite's single
+writer lock or fail with "database is locked". `WriteBuffer` instead queues
+updates from any number of producers, and one writer task inserts whatever
+has accumulated in a single transaction once `max_rows` rows are pending or
+`max_delay_ms` after the oldest one was queued, whichever comes first.
+
+Producers choose nothing per write; the buffer's `Durability` decides when
+`write` returns:
+
+- `buffered`: once queued. Fastest, but rows still pending when the process
+  dies are lost, and failures are only logged.
+- `committed`: once the batch has committed with the connection's usual
+  `synchronous` setting. In WAL mode with `NORMAL` that survives a process
+  crash but not a power cut.
+- `synced`: once the batch has committed with `synchronous = FULL`, so the
+  WAL is synced before `write` returns.
+
+A batch that fails is retried one update per transaction, so a bad row
+only fails its own producer. At most `max_pending` rows wait in the queue;
+beyond that `write` waits for the writer to catch up. After each commit the
+buffer invalidates the cached responses of the predictions it wrote to,
+before their producers hear back.
+
+`create_app` runs one buffer per process on the write engine as
+`app.state.write_buffer`; endpoints get it with `Depends(get_write_buffer)`.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, List, NamedTuple, Optional, Sequence
+
+from fastapi import Request
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .cache import PREDICTION_LIST_TAG, ResponseCache, prediction_tag
+from .metrics import metrics
+from .models import PredictionUpdate, Source
+
+logger = logging.getLogger("varinaut.write_buffer")
+
+
+class Durability(str, Enum):
+    BUFFERED = "buffered"
+    COMMITTED = "committed"
+    SYNCED = "synced"
+
+
+class _Pending(NamedTuple):
+    update: dict
+    sources: List[dict]
+    future: asyncio.Future
+    queued_at: float  # loop time
+
+    @property
+    def rows(self) -> int:
+        return 1 + len(self.sources)
+
+
+class WriteBuffer:
+    """Queues updates with their sources and inserts them in batches from one task."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        max_rows: int = 500,
+        max_delay_ms: float = 20.0,
+        max_pending: int = 10_000,
+        durability: Durability = Durability.COMMITTED,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        self.engine = engine
+        self.response_cache = response_cache
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self.max_pending = max_pending
+        self.durability = durability
+        self._pending: Deque[_Pending] = deque()
+        self.pending_rows = 0
+        self._ready = asyncio.Event()  # something to flush, or closing
+        self._full = asyncio.Event()  # a whole batch is waiting, or closing
+        self._room = asyncio.Event()  # below `max_pending`
+        self._room.set()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="write-buffer")
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the writer task."""
+        self._closing = True
+        self._ready.set()
+        self._full.set()
+        if self._task is not None:
+            await self._task
+
+    async def write(
+        self, update: PredictionUpdate, sources: Sequence[Source] = ()
+    ) -> Optional[int]:
+        """Queue `update` and its `sources` for insertion.
+
+        Returns the update's id once the batch is committed, or None right
+        away with `buffered` durability. `update_id` of the sources is set
+        by the buffer. Raises the database error if the update could not
+        be inserted.
+        """
+        future = await self.submit(update, sources)
+        if self.durability == Durability.BUFFERED:
+            return None
+        return await future
+
+    async def submit(
+        self, update: PredictionUpdate, sources: Sequence[Source] = ()
+    ) -> asyncio.Future:
+        """Queue `update` and its `sources`; the future resolves to the update's id on commit."""
+        if self._closing:
+            raise RuntimeError("The write buffer is closed")
+        while self.pending_rows >= self.max_pending:
+            self._room.clear()
+            await self._room.wait()
+
+        loop = asyncio.get_running_loop()
+        pending = _Pending(
+            update.model_dump(exclude={"id"}),
+            [source.model_dump(exclude={"id", "update_id"}) for source in sources],
+            loop.create_future(),
+            loop.time(),
+        )
+        if self.durability == Durability.BUFFERED:
+            pending.future.add_done_callback(_log_failure)
+        self._pending.append(pending)
+        self.pending_rows += pending.rows
+        self._ready.set()
+        if self.pending_rows >= self.max_rows:
+            self._full.set()
+        return pending.future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._ready.wait()
+            if not self._pending:
+                if self._closing:
+                    return
+                self._ready.clear()
+                continue
+
+            # Linger for a fuller batch, unless one is already waiting
+            delay = self._pending[0].queued_at + self.max_delay - loop.time()
+            if self.pending_rows < self.max_rows and delay > 0 and not self._closing:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._take()
+            try:
+                await self._flush(batch)
+            except Exception as e:  # pylint: disable=broad-except
+                # Keep the writer alive for the next batch
+                logger.exception("Write buffer flush failed")
+                for pending in batch:
+                    _fail(pending.future, e)
+
+    def _take(self) -> List[_Pending]:
+        batch: List[_Pending] = []
+        rows = 0
+        while self._pending and (not batch or rows + self._pending[0].rows <= self.max_rows):
+            pending = self._pending.popleft()
+            batch.append(pending)
+            rows += pending.rows
+        self.pending_rows -= rows
+        if self.pending_rows < self.max_pending:
+            self._room.set()
+        return batch
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        async with self.engine.connect() as conn:
+            synchronous = None
+            if self.durability == Durability.SYNCED:
+                synchronous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+                # Outside a transaction, where SQLite accepts the change
+                await conn.exec_driver_sql("PRAGMA synchronous = FULL")
+                await conn.commit()
+            try:
+                try:
+                    ids = await _insert(conn, batch)
+                except SQLAlchemyError as e:
+                    logger.warning(
+                        "Batch of %d updates failed, retrying one by one: %s", len(batch), e
+                    )
+                    await self._insert_each(conn, batch)
+                else:
+                    self._committed(batch, ids)
+            finally:
+                if synchronous is not None:
+                    await conn.exec_driver_sql(f"PRAGMA synchronous = {int(synchronous)}")
+                    await conn.commit()
+
+        now = asyncio.get_running_loop().time()
+        metrics.write_batch_rows.observe((), sum(pending.rows for pending in batch))
+        metrics.write_flush_time.observe((), time.perf_counter() - started)
+        for pending in batch:
+            metrics.write_wait_time.observe((), now - pending.queued_at)
+
+    async def _insert_each(self, conn: AsyncConnection, batch: List[_Pending]) -> None:
+        for pending in batch:
+            try:
+                ids = await _insert(conn, [pending])
+            except SQLAlchemyError as e:
+                _fail(pending.future, e)
+            else:
+                self._committed([pending], ids)
+
+    def _committed(self, batch: List[_Pending], ids: List[int]) -> None:
+        # New updates change their predictions' current likelihood
+        if self.response_cache is not None:
+            tags = {prediction_tag(pending.update["prediction_id"]) for pending in batch}
+            self.response_cache.invalidate(PREDICTION_LIST_TAG, *tags)
+        for pending, update_id in zip(batch, ids):
+            _resolve(pending.future, update_id)
+
+
+async def _insert(conn: AsyncConnection, batch: List[_Pending]) -> List[int]:
+    """Insert `batch` in one transaction; returns the update ids in batch order."""
+    try:
+        # SQLite has no sentinel to match RETURNING rows to parameters, so
+        # SQLAlchemy keeps them in order by inserting one row per statement;
+        # the batch still shares one transaction and one commit
+        result = await conn.execute(
+            insert(PredictionUpdate).returning(PredictionUpdate.id, sort_by_parameter_order=True),
+            [pending.update for pending in batch],
+        )
+        # SQLite hands RETURNING ids back as floats here
+        ids = [int(update_id) for update_id in result.scalars()]
+        sources = [
+            {**source, "update_id": update_id}
+            for pending, update_id in zip(batch, ids)
+            for source in pending.sources
+        ]
+        if sources:
+            await conn.execute(insert(Source), sources)
+        await conn.commit()
+    except BaseException:
+        await conn.rollback()
+        raise
+    return ids
+
+
+# A producer that stopped waiting has cancelled its future
+def _resolve(future: asyncio.Future, update_id: int) -> None:
+    if not future.done():
+        future.set_result(update_id)
+
+
+def _fail(future: asyncio.Future, error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+
+def _log_failure(future: asyncio.Future) -> None:
+    # Nobody awaits futures of buffered writes
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Buffered update was not written: %s", future.exception())
+
+
+async def get_write_buffer(request: Request) -> WriteBuffer:
+    return request.app.state.write_buffer
@@ -1,29 +1,38 @@
 import json
 import asyncio
+import sqlite3
+import tempfile
 from pathlib import Path
 from datetime import date, datetime
-from typing import AsyncGenerator, List
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, ContextManager, Dict, Iterator, List, Optional
 
+import aiosqlite
 import pytest
 from httpx import AsyncClient, ASGITransport
 from sqlmodel import SQLModel
-from sqlalchemy import text, inspect
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import Engine, create_engine, update
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 
-from src.main import app
 from src import models  # pylint: disable=unused-import
-from src.sqldb import get_session
-
-
-# Test database URL
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test_varinautsqlite.db"
-
-# Test engine and session
-test_engine = create_async_engine(TEST_DATABASE_URL, echo=False, future=True)
-test_async_session = sessionmaker(
-    test_engine, class_=AsyncSession, expire_on_commit=False
+from src.config import Settings
+from src.main import create_app
+from src.metrics import QueryTracker, track_queries
+from src.query_monitor import instrument_queries
+from src.sqldb import get_session, get_read_session
+from src.write_buffer import WriteBuffer, get_write_buffer
+
+
+_test_dir = Path(tempfile.gettempdir())
+test_settings = Settings(
+    # Requests use `test_session`, so the app's own engines never connect;
+    # a file URL gives them the production pools that /health and /metrics report
+    database_url=f"sqlite+aiosqlite:///{_test_dir / 'varinaut-test-unused.db'}",
+    log_dir=str(_test_dir / "varinaut-test-logs"),
 )
+app = create_app(test_settings)
 
 
 @pytest.fixture(scope="session")
@@ -34,58 +43,154 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture(scope="session", autouse=True)
-async def setup_test_database():
-    """Set up test database schema."""
-    async with test_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    yield
-    # Clean up after all tests
-    await test_engine.dispose()
+def _serialize(engine: Engine) -> bytes:
+    raw_connection = engine.raw_connection()
+    try:
+        return raw_connection.driver_connection.serialize()
+    finally:
+        raw_connection.close()
 
 
-@pytest.fixture
-async def test_session() -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session."""
-    async with test_async_session() as session:
-        # Clear all tables before each test
-        def get_table_names(conn):
-            inspector = inspect(conn)
-            return inspector.get_table_names()
+@pytest.fixture(scope="session")
+def template_databases() -> Dict[bool, bytes]:
+    """Serialized in-memory databases with the schema, its triggers and FTS tables.
+
+    Keyed by whether the JSON fixtures are loaded. Built once per process,
+    so every xdist worker has its own.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    try:
+        SQLModel.metadata.create_all(engine)
+        templates = {False: _serialize(engine)}
+        with Session(engine) as session:
+            stamps = []
+            for rows in fixture_rows():
+                stamps += [
+                    {"id": row.id, "updated_at": row.updated_at}
+                    for row in rows
+                    if isinstance(row, models.Prediction)
+                ]
+                session.add_all(rows)
+                session.commit()
+            # The current likelihood triggers stamp predictions as updated
+            # when their updates load; keep the fixtures' own times
+            session.execute(update(models.Prediction), stamps)
+            session.commit()
+        templates[True] = _serialize(engine)
+        return templates
+    finally:
+        engine.dispose()
+
 
-        async with test_engine.begin() as conn:
-            table_names = await conn.run_sync(get_table_names)
+@pytest.fixture
+async def test_engine(
+    request: pytest.FixtureRequest, template_databases: Dict[bool, bytes]
+) -> AsyncGenerator[AsyncEngine, None]:
+    """A private in-memory copy of a template database.
+
+    Copying the template is cheaper than emptying every table and leaves
+    nothing behind for other tests or workers to see. Tests that use
+    `load_test_data` get the copy with the fixtures already loaded.
+    """
+    template = template_databases["load_test_data" in request.fixturenames]
+
+    def connect() -> sqlite3.Connection:
+        # Runs on aiosqlite's thread, which owns the connection from then on
+        connection = sqlite3.connect(":memory:", check_same_thread=False)
+        connection.deserialize(template)
+        return connection
+
+    async def async_creator() -> aiosqlite.Connection:
+        return await aiosqlite.Connection(connect, iter_chunk_size=64)
+
+    # One connection, since every connection to ":memory:" is a separate database
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", async_creator=async_creator, poolclass=StaticPool
+    )
+    yield engine
+    await engine.dispose()
 
-        for table_name in table_names:
-            await session.execute(text(f"DELETE FROM {table_name}"))
-        await session.commit()
 
+@pytest.fixture
+async def test_session(test_engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Create a test database session."""
+    async with AsyncSession(test_engine, expire_on_commit=False) as session:
         yield session
 
-        # Rollback any changes after each test
-        await session.rollback()
+
+@pytest.fixture
+def query_budget(test_engine: AsyncEngine) -> Callable[..., ContextManager[QueryTracker]]:
+    """Fail the test if the block runs more SQL statements than allowed.
+
+    Usage::
+
+        with query_budget(3):
+            await client.get("/predictions/1?expand=updates")
+    """
+    instrument_queries(test_engine)
+
+    @contextmanager
+    def budget(max_statements: int, max_repeats: Optional[int] = None) -> Iterator[QueryTracker]:
+        with track_queries() as tracker:
+            yield tracker
+        if tracker.total > max_statements:
+            pytest.fail(
+                f"{tracker.total} SQL statements exceed the budget of {max_statements}:\n"
+                + "\n".join(tracker.statements)
+            )
+        if max_repeats is not None:
+            repeated = tracker.repeated(max_repeats + 1)
+            if repeated:
+                pytest.fail(
+                    f"Suspected N+1, statement ran {repeated[0][1]} times:\n{repeated[0][0]}"
+                )
+
+    return budget
 
 
 @pytest.fixture
-async def client(test_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(
+    test_engine: AsyncEngine, test_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client with dependency override."""
 
     async def override_get_session() -> AsyncGenerator[AsyncSession, None]:
         yield test_session
 
+    # Writes the test's database, without lingering for fuller batches
+    write_buffer = WriteBuffer(
+        test_engine, max_delay_ms=0, response_cache=app.state.response_cache
+    )
+
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_write_buffer] = lambda: write_buffer
+    # Every test has its own database, so cached responses are stale
+    app.state.response_cache.clear()
 
-    # Use ASGITransport for FastAPI apps with httpx
+    # ASGITransport does not run the lifespan, which sets up app.state
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
-        yield client
+    async with app.router.lifespan_context(app):
+        write_buffer.start()
+        async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+        await write_buffer.stop()
 
     app.dependency_overrides.clear()
 
 
 @pytest.fixture
 async def load_test_data(test_session: AsyncSession):
-    """Load test data from JSON fixtures."""
+    """Test data from the JSON fixtures.
+
+    The data comes with the test's copy of the template database (see
+    `test_engine`), so requesting this fixture is all it takes.
+    """
+    yield
+
+
+def fixture_rows() -> Iterator[List[SQLModel]]:
+    """Model instances from each JSON fixture file, one list per file."""
     fixtures_dir = Path(__file__).parent / "fixtures"
 
     # Get all model classes from the models module
@@ -114,6 +219,7 @@ async def load_test_data(test_session: AsyncSession):
         with open(fixture_file, encoding="utf-8") as f:
             fixture_data = json.load(f)
 
+        rows = []
         for item_data in fixture_data:
             # Convert date/datetime strings to objects for specified fields
 
@@ -127,10 +233,5 @@ async def load_test_data(test_session: AsyncSession):
                 if field_value is not None:
                     item_data[field_name] = datetime.fromisoformat(field_value)
 
-            # Create and save the model instance
-            model_instance = model_class(**item_data)
-            test_session.add(model_instance)
-
-        await test_session.commit()
-
-    yield
+            rows.append(model_class(**item_data))
+        yield rows
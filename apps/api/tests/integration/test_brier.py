@@ -0,0 +1,67 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.brier_service import rebuild_brier_aggregates
+
+
+class TestBrierAPI:
+    """Integration tests for Brier score endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_get_brier_empty(self, client: AsyncClient):
+        """Test GET /brier with no resolved predictions."""
+        response = await client.get("/brier/")
+        assert response.status_code == 200
+        assert response.json()["overall"] is None
+
+    @pytest.mark.asyncio
+    async def test_rebuild_brier(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data
+    ):
+        """Test rebuilding aggregates scores each resolved prediction by its latest update."""
+        assert await rebuild_brier_aggregates(test_session) == 2
+
+        response = await client.get("/brier/")
+        assert response.status_code == 200
+        data = response.json()
+        # (0.08 - 0)^2 and (0.98 - 1)^2
+        assert data["overall"]["count"] == 2
+        assert data["overall"]["brier_score"] == pytest.approx((0.0064 + 0.0004) / 2)
+        assert data["overall"]["base_rate"] == 0.5
+        assert [m["bucket"] for m in data["by_month"]] == ["2025-01", "2026-01"]
+        assert [r["bucket"] for r in data["by_reviewer"]] == ["unreviewed"]
+
+    @pytest.mark.asyncio
+    async def test_resolve_updates_aggregates_incrementally(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data
+    ):
+        """Test POST /predictions/{id}/resolve keeps aggregates equal to a full rebuild."""
+        await rebuild_brier_aggregates(test_session)
+
+        response = await client.post("/predictions/1/resolve", json={"outcome": True})
+        assert response.status_code == 200
+        assert response.json()["status"] == "resolved"
+        assert response.json()["resolved_at"] is not None
+
+        incremental = (await client.get("/brier/")).json()
+        assert incremental["overall"]["count"] == 3
+        reviewers = {r["bucket"]: r for r in incremental["by_reviewer"]}
+        assert reviewers["Zilong"]["brier_score"] == pytest.approx((0.48 - 1) ** 2)
+        assert {d["bucket"] for d in incremental["by_decision"]} == {"accept", "unreviewed"}
+
+        await rebuild_brier_aggregates(test_session)
+        rebuilt = (await client.get("/brier/")).json()
+        assert rebuilt["overall"]["brier_score"] == pytest.approx(
+            incremental["overall"]["brier_score"]
+        )
+        assert rebuilt["by_reviewer"] == incremental["by_reviewer"]
+
+    @pytest.mark.asyncio
+    async def test_resolve_twice_conflicts(self, client: AsyncClient, load_test_data):
+        """Test resolving an already resolved prediction is rejected."""
+        response = await client.post("/predictions/3/resolve", json={"outcome": True})
+        assert response.status_code == 409
+
+        response = await client.post("/predictions/999/resolve", json={"outcome": True})
+        assert response.status_code == 404
@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import Settings, get_settings
+from src.models import HumanReview, Prediction, PredictionUpdate, Tombstone
+from src.pagination import encode_cursor
+from src.routers.changes import settle_window
+from src.services.changes_service import load_changes, prune_tombstones
+from tests.conftest import app
+
+
+async def _sync(client: AsyncClient, token=None, limit=500):
+    """Follow `has_more` from `token`; returns the responses and the last token."""
+    pages = []
+    while True:
+        params = {"limit": limit} if token is None else {"limit": limit, "since": token}
+        response = await client.get("/changes", params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        token = pages[-1]["token"]
+        if not pages[-1]["has_more"]:
+            return pages, token
+
+
+class _DeleteDuringRead:
+    """Session that deletes a prediction right after the first table is read."""
+
+    def __init__(self, session: AsyncSession, prediction_id: int):
+        self._session = session
+        self._prediction_id = prediction_id
+        self.deleted = False
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    async def execute(self, *args, **kwargs):
+        result = await self._session.execute(*args, **kwargs)
+        if not self.deleted:
+            self.deleted = True
+            await self._session.execute(
+                delete(Prediction).where(Prediction.id == self._prediction_id)
+            )
+            await self._session.commit()
+        return result
+
+
+class TestChangesAPI:
+    """Integration tests for the delta sync endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_first_sync_pages_through_every_row(
+        self, client: AsyncClient, load_test_data, query_budget
+    ):
+        """Test GET /changes without a token returns all rows, `limit` per kind and page."""
+        with query_budget(4):
+            first = (await client.get("/changes?limit=4")).json()
+        assert first["has_more"]
+        assert len(first["predictions"]) == 4
+
+        pages, _ = await _sync(client, first["token"], limit=4)
+        pages.insert(0, first)
+        assert sorted(p["id"] for page in pages for p in page["predictions"]) == list(range(1, 11))
+        assert len({u["id"] for page in pages for u in page["updates"]}) == 20
+        assert len({r["id"] for page in pages for r in page["reviews"]}) == 8
+        assert not any(page["deleted"] for page in pages)
+
+    @pytest.mark.asyncio
+    async def test_changes_since_token(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data
+    ):
+        """Test a token returns only later writes and deletes, resending the settle window."""
+        _, token = await _sync(client)
+
+        assert (await client.post("/predictions/2/resolve", json={"outcome": True})).is_success
+        created = await client.post(
+            "/predictions/3/updates", json={"likelihood": 0.3, "reasoning": "New"}
+        )
+        review = await test_session.scalar(select(HumanReview).limit(1))
+        update = await test_session.get(PredictionUpdate, review.update_id)
+        await test_session.execute(delete(HumanReview).where(HumanReview.id == review.id))
+        await test_session.commit()
+
+        changes = (await client.get("/changes", params={"since": token})).json()
+        # Prediction 3 through the triggers keeping its current likelihood
+        assert [p["id"] for p in changes["predictions"]] == [2, 3]
+        assert changes["predictions"][0]["status"] == "resolved"
+        assert changes["predictions"][1]["current_likelihood"] == 0.3
+        assert [u["id"] for u in changes["updates"]] == [created.json()["id"]]
+        assert changes["reviews"] == []
+        assert changes["deleted"] == [
+            {"table": "humanreview", "id": review.id, "prediction_id": update.prediction_id}
+        ]
+
+        # Within the settle window the rows come again, the deletes don't
+        again = (await client.get("/changes", params={"since": changes["token"]})).json()
+        assert [p["id"] for p in again["predictions"]] == [2, 3]
+        assert again["deleted"] == []
+
+        app.dependency_overrides[get_settings] = lambda: Settings(changes_settle_seconds=0)
+        settled = (await client.get("/changes", params={"since": again["token"]})).json()
+        assert [p["id"] for p in settled["predictions"]] == [2, 3]
+        empty = (await client.get("/changes", params={"since": settled["token"]})).json()
+        assert empty["predictions"] == empty["updates"] == empty["deleted"] == []
+
+    def test_settle_window_covers_busy_timeout(self):
+        """Test the default settle window outlasts the busy timeout and second truncation."""
+        assert settle_window(Settings(sqlite_busy_timeout_ms=5000)) == timedelta(seconds=6)
+        assert settle_window(Settings(changes_settle_seconds=2.5)) == timedelta(seconds=2.5)
+
+    @pytest.mark.asyncio
+    async def test_invalid_and_expired_tokens(self, client: AsyncClient):
+        """Test malformed tokens get 400 and tokens past the tombstone retention 410."""
+        assert (await client.get("/changes?since=garbage")).status_code == 400
+        wrong_shape = encode_cursor({"prediction": "x", "tombstone": 0, "issued": "now"})
+        assert (await client.get(f"/changes?since={wrong_shape}")).status_code == 400
+
+        expired = encode_cursor({"tombstone": 0, "issued": "2020-01-01 00:00:00.000000"})
+        response = await client.get(f"/changes?since={expired}")
+        assert response.status_code == 410
+
+    @pytest.mark.asyncio
+    async def test_prune_tombstones(self, test_session: AsyncSession, load_test_data):
+        """Test pruning only drops tombstones older than the cutoff."""
+        await test_session.execute(delete(HumanReview))
+        await test_session.commit()
+
+        assert await prune_tombstones(test_session, datetime.utcnow() - timedelta(days=1)) == 0
+        assert await prune_tombstones(test_session, datetime.utcnow() + timedelta(days=1)) == 8
+        assert not (await test_session.scalars(select(Tombstone))).all()
+
+    @pytest.mark.asyncio
+    async def test_delete_during_sync_is_sent_next(
+        self, test_session: AsyncSession, load_test_data
+    ):
+        """Test a row deleted while a sync reads the tables has its delete sent next time."""
+        session = _DeleteDuringRead(test_session, 1)
+        first = await load_changes(session, None, 500, timedelta(0))
+        assert session.deleted
+        assert 1 in [prediction.id for prediction in first.predictions]
+
+        second = await load_changes(test_session, first.position, 500, timedelta(0))
+        assert [(t.table_name, t.row_id) for t in second.deleted] == [("prediction", 1)]
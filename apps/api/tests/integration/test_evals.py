@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.services.eval_service import load_forecasts
+
+
+class TestEvalsAPI:
+    """Integration tests for evals API endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_get_calibration(self, client: AsyncClient, load_test_data):
+        """Test GET /evals/calibration scores every update of resolved predictions."""
+        response = await client.get("/evals/calibration?bins=5")
+        assert response.status_code == 200
+
+        data = response.json()
+        overall = data["overall"]
+        # Prediction 3 (FALSE): 0.15, 0.08; prediction 6 (TRUE): 0.72, 0.85, 0.98
+        assert overall["count"] == 5
+        expected = (0.15**2 + 0.08**2 + 0.28**2 + 0.15**2 + 0.02**2) / 5
+        assert overall["brier_score"] == pytest.approx(expected)
+        assert len(overall["bins"]) == 5
+        assert sum(s["count"] for s in data["by_horizon"]) == 5
+        assert sum(s["count"] for s in data["by_review"]) == 5
+
+    @pytest.mark.asyncio
+    async def test_get_calibration_latest_only(self, client: AsyncClient, load_test_data):
+        """Test latest_only scores just the final update of each prediction."""
+        response = await client.get("/evals/calibration?latest_only=true")
+        assert response.status_code == 200
+        overall = response.json()["overall"]
+        assert overall["count"] == 2
+        assert overall["brier_score"] == pytest.approx((0.08**2 + 0.02**2) / 2)
+
+    @pytest.mark.asyncio
+    async def test_load_forecasts_in_chunks(self, test_session: AsyncSession, load_test_data):
+        """Test streaming forecasts in small chunks builds the same arrays as one chunk."""
+        whole = await load_forecasts(test_session)
+        chunked = await load_forecasts(test_session, chunk_rows=2)
+        assert whole.likelihood.size == 5
+        for expected, actual in zip(whole, chunked):
+            np.testing.assert_array_equal(expected, actual)
+
+    @pytest.mark.asyncio
+    async def test_get_calibration_invalid_horizons(self, client: AsyncClient):
+        """Test horizons must be increasing positive integers."""
+        response = await client.get("/evals/calibration?horizons=90,30")
+        assert response.status_code == 400
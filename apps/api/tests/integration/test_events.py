@@ -0,0 +1,147 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlmodel import SQLModel
+
+from src.config import Settings, get_settings
+from src.main import create_app
+from src.models import EventType, Prediction
+from tests.conftest import app, test_settings
+
+AGENT_KEY = "agent-secret"
+
+
+@pytest.fixture
+def ws_client():
+    """Synchronous client: httpx has no WebSocket support.
+
+    Its portal runs the app's event loop, where events must be published.
+    """
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def agent_client(tmp_path):
+    """Client of an app with its own file database, one prediction and an agent key.
+
+    The app's engines run on the client's event loop, unlike the per-test
+    in-memory engine of `client`.
+    """
+    settings = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'events.db'}",
+        log_dir=str(tmp_path / "logs"),
+        agent_api_key=AGENT_KEY,
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Prediction), [{"question": "Q?", "known_date": date(2030, 1, 1)}])
+    engine.dispose()
+
+    agent_app = create_app(settings)
+    agent_app.dependency_overrides[get_settings] = lambda: settings
+    with TestClient(agent_app) as client:
+        yield client
+
+
+class TestEventsAPI:
+    """Integration tests for the prediction events WebSocket."""
+
+    def test_events_streamed_to_subscribers(self, ws_client: TestClient):
+        """Test published events reach the prediction's sockets as JSON messages."""
+        before = ws_client.get("/events/stats").json()
+
+        with (
+            ws_client.websocket_connect("/predictions/1/events") as first,
+            ws_client.websocket_connect("/predictions/1/events") as second,
+            ws_client.websocket_connect("/predictions/2/events") as other,
+        ):
+            subscribers = ws_client.get("/events/stats").json()["subscribers"]
+            assert subscribers == before["subscribers"] + 3
+
+            publish = app.state.event_hub.publish
+            ws_client.portal.call(publish, 1, EventType.PROGRESS, {"step": "search"})
+            ws_client.portal.call(publish, 1, EventType.NEED_APPROVAL, {"update_id": 3})
+            ws_client.portal.call(publish, 2, EventType.PROGRESS, {"step": "draft"})
+
+            for websocket in (first, second):
+                progress, approval = websocket.receive_json(), websocket.receive_json()
+                assert progress["type"] == "progress"
+                assert progress["data"] == {"step": "search"}
+                assert approval["type"] == "need_approval"
+                assert approval["seq"] == progress["seq"] + 1
+            assert other.receive_json()["data"] == {"step": "draft"}
+
+        stats = ws_client.get("/events/stats").json()
+        assert stats["published"] == before["published"] + 3
+        assert stats["delivered"] == before["delivered"] + 5
+
+    def test_subscription_removed_on_disconnect(self, ws_client: TestClient):
+        """Test closing the socket unsubscribes it from the hub."""
+        event_hub = app.state.event_hub
+        before = event_hub.subscriber_count
+        with ws_client.websocket_connect("/predictions/1/events") as websocket:
+            ws_client.portal.call(event_hub.publish, 1, EventType.PROGRESS)
+            websocket.receive_json()
+            websocket.send_text("ignored")
+            assert event_hub.subscriber_count == before + 1
+        # Leaving the block waits for the handler to finish
+        assert event_hub.subscriber_count == before
+        assert "ws_subscribers" in ws_client.get("/metrics").text
+
+    def test_agent_events_reach_subscribers(self, agent_client: TestClient):
+        """Test events posted by the agent, and new updates, are streamed to the socket."""
+        headers = {"Authorization": f"Bearer {AGENT_KEY}"}
+        with agent_client.websocket_connect("/predictions/1/events") as websocket:
+            response = agent_client.post(
+                "/predictions/1/events",
+                json={"type": "need_approval", "data": {"checkpoint": "sources"}},
+                headers=headers,
+            )
+            assert response.status_code == 202
+            assert response.json()["seq"] == 1
+            assert websocket.receive_json() == response.json()
+
+            response = agent_client.post(
+                "/predictions/1/updates", json={"likelihood": 0.7, "reasoning": "r"}
+            )
+            assert response.status_code == 201
+            progress = websocket.receive_json()
+            assert progress["type"] == "progress"
+            assert progress["seq"] == 2
+            assert progress["data"] == {"update_id": response.json()["id"], "likelihood": 0.7}
+
+        assert agent_client.get("/events/stats").json()["published"] == 2
+
+    def test_agent_events_require_key(self, agent_client: TestClient):
+        """Test publishing needs the agent key, an existing prediction and a public event type."""
+        event = {"type": "progress"}
+        assert agent_client.post("/predictions/1/events", json=event).status_code == 401
+        wrong = {"Authorization": "Bearer wrong"}
+        response = agent_client.post("/predictions/1/events", json=event, headers=wrong)
+        assert response.status_code == 401
+
+        headers = {"Authorization": f"Bearer {AGENT_KEY}"}
+        response = agent_client.post("/predictions/99/events", json=event, headers=headers)
+        assert response.status_code == 404
+        response = agent_client.post(
+            "/predictions/1/events", json={"type": "lagged"}, headers=headers
+        )
+        assert response.status_code == 422
+        assert agent_client.get("/events/stats").json()["published"] == 0
+
+    def test_agent_events_disabled_without_key(self, ws_client: TestClient):
+        """Test the endpoint refuses every request when no agent key is configured."""
+        app.dependency_overrides[get_settings] = lambda: test_settings
+        try:
+            response = ws_client.post(
+                "/predictions/1/events",
+                json={"type": "progress"},
+                headers={"Authorization": "Bearer anything"},
+            )
+        finally:
+            del app.dependency_overrides[get_settings]
+        assert response.status_code == 403
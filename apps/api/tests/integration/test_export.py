@@ -0,0 +1,44 @@
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+
+class TestExportAPI:
+    """Integration tests for export API endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_export_predictions_ndjson(self, client: AsyncClient, load_test_data):
+        """Test GET /export/predictions streams one JSON object per line."""
+        response = await client.get("/export/predictions")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == list(range(1, 11))
+        assert rows[0]["status"] == "reviewed"
+        assert rows[0]["known_date"] == "2029-12-31"
+
+    @pytest.mark.asyncio
+    async def test_export_updates_csv(self, client: AsyncClient, load_test_data):
+        """Test GET /export/updates?format=csv streams a header and every update."""
+        response = await client.get("/export/updates?format=csv")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="updates.csv"' in response.headers["content-disposition"]
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 20
+        assert rows[0]["prediction_id"] == "1"
+        assert float(rows[0]["likelihood"]) == 0.35
+
+    @pytest.mark.asyncio
+    async def test_export_empty_csv_has_header(self, client: AsyncClient):
+        """Test exporting an empty table still returns the CSV header."""
+        response = await client.get("/export/reviews?format=csv")
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        assert len(lines) == 1
+        assert "id" in lines[0].split(",")
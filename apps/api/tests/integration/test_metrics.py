@@ -0,0 +1,87 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.config import Settings
+from src.main import create_app
+from src.metrics import instrument_engine, metrics
+
+
+@pytest.fixture
+def fresh_metrics(test_engine):
+    """Reset the process-wide registry and time statements on the test engine."""
+    instrument_engine(test_engine, "test")
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+class TestMetricsAPI:
+    """Integration tests for request metrics and health checks."""
+
+    @pytest.mark.asyncio
+    async def test_requests_recorded_per_route(
+        self, client: AsyncClient, fresh_metrics, load_test_data
+    ):
+        """Test latency, status and SQL usage are labelled with the route template."""
+        for prediction_id in (1, 2):
+            assert (await client.get(f"/predictions/{prediction_id}")).status_code == 200
+        assert (await client.get("/predictions/999")).status_code == 404
+        assert (await client.get("/no-such-path")).status_code == 404
+
+        route = "/predictions/{prediction_id}"
+        assert fresh_metrics.requests.value(("GET", route, "200")) == 2
+        assert fresh_metrics.requests.value(("GET", route, "404")) == 1
+        assert fresh_metrics.requests.value(("GET", "<unmatched>", "404")) == 1
+        assert fresh_metrics.statements.value(("test",)) >= 3
+        assert fresh_metrics.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_exposition(self, client: AsyncClient, fresh_metrics, load_test_data):
+        """Test /metrics serves Prometheus text with histograms and pool gauges."""
+        await client.get("/predictions/1")
+
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        labels = 'method="GET",route="/predictions/{prediction_id}"'
+        assert f"http_request_duration_seconds_count{{{labels}}} 1" in body
+        assert f'http_request_db_statements_bucket{{{labels},le="+Inf"}} 1' in body
+        assert (
+            'http_requests_total{method="GET",route="/predictions/{prediction_id}",status="200"} 1'
+            in body
+        )
+        assert 'db_statements_total{engine="test"}' in body
+        assert 'db_pool_saturation{engine="write"}' in body
+        assert "http_requests_in_flight 1" in body  # the scrape itself
+
+    @pytest.mark.asyncio
+    async def test_health_reports_database_and_pools(self, client: AsyncClient):
+        """Test /health checks connectivity and reports pool usage."""
+        response = await client.get("/health")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert data["database"] == {"connected": True}
+        assert set(data["pools"]) == {"write", "read"}
+        assert 0 <= data["pools"]["read"]["saturation"] <= 1
+
+    @pytest.mark.asyncio
+    async def test_health_probes_read_engine(self, tmp_path):
+        """Test /health stays healthy while every write connection is checked out."""
+        settings = Settings(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+            log_dir=str(tmp_path / "logs"),
+            db_pool_size=1,
+            db_max_overflow=0,
+            db_pool_timeout=1,
+        )
+        app = create_app(settings)
+        async with app.router.lifespan_context(app):
+            async with app.state.db.engine.connect():
+                transport = ASGITransport(app=app)
+                async with AsyncClient(transport=transport, base_url="http://test") as client:
+                    response = await client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["pools"]["write"]["saturation"] == 1
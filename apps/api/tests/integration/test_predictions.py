@@ -1,9 +1,13 @@
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from httpx import AsyncClient
 from sqlmodel import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models import Prediction
+from src.models import Prediction, PredictionUpdate
+from src.services.archive_service import ARCHIVE_SCHEMA, archive_resolved, attach_statements
+from tests.conftest import app
 
 
 class TestPredictionsAPI:
@@ -83,6 +87,100 @@ class TestPredictionsAPI:
         data2 = response2.json()
         assert data1[0]["id"] != data2[0]["id"]
 
+    @pytest.mark.asyncio
+    async def test_get_predictions_cursor_pagination(
+        self, client: AsyncClient, load_test_data
+    ):
+        """Test GET /predictions walking every page with keyset cursors."""
+        response = await client.get("/predictions/?limit=4")
+        assert response.status_code == 200
+        seen = [p["id"] for p in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+
+        while cursor is not None:
+            response = await client.get(f"/predictions/?limit=4&cursor={cursor}")
+            assert response.status_code == 200
+            seen.extend(p["id"] for p in response.json())
+            cursor = response.headers.get("x-next-cursor")
+
+        assert seen == list(range(1, 11))
+
+    @pytest.mark.asyncio
+    async def test_get_predictions_cursor_with_status_filter(
+        self, client: AsyncClient, load_test_data
+    ):
+        """Test GET /predictions cursor pages only contain the filtered status."""
+        response = await client.get("/predictions/?status=reviewed&limit=2")
+        assert response.status_code == 200
+        first_page = response.json()
+        assert [p["id"] for p in first_page] == [1, 8]
+
+        cursor = response.headers["x-next-cursor"]
+        response = await client.get(f"/predictions/?status=reviewed&limit=2&cursor={cursor}")
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()] == [9]
+        assert "x-next-cursor" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_get_predictions_sorted_by_known_date(self, client: AsyncClient, load_test_data):
+        """Test GET /predictions?sort=known_date pages by (known_date, id) with cursors."""
+        seen = []
+        url = "/predictions/?sort=known_date&limit=4"
+        response = await client.get(url)
+        while True:
+            assert response.status_code == 200
+            seen.extend((p["known_date"], p["id"]) for p in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+            response = await client.get(f"{url}&cursor={cursor}")
+
+        assert [i for _, i in seen] == [2, 3, 6, 4, 7, 1, 8, 9, 10, 5]
+        assert seen == sorted(seen)
+
+        # An id-only cursor lacks the known_date position
+        id_cursor = (await client.get("/predictions/?limit=1")).headers["x-next-cursor"]
+        response = await client.get(f"{url}&cursor={id_cursor}")
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_current_likelihood_follows_latest_update(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data
+    ):
+        """Test current_likelihood/last_updated_at track the newest update on insert."""
+        data = (await client.get("/predictions/1")).json()
+        assert data["current_likelihood"] == 0.48
+        assert data["last_updated_at"] == "2025-10-15T12:00:00"
+        assert (await client.get("/predictions/4")).json()["current_likelihood"] is None
+
+        test_session.add(
+            PredictionUpdate(prediction_id=1, likelihood=0.9, reasoning="New evidence")
+        )
+        # Backdated updates don't replace the current one
+        test_session.add(
+            PredictionUpdate(
+                prediction_id=1,
+                likelihood=0.1,
+                reasoning="Late import",
+                created_at=datetime(2024, 1, 1),
+            )
+        )
+        await test_session.commit()
+
+        result = await test_session.execute(
+            select(Prediction.current_likelihood)
+            .where(Prediction.id == 1)
+            .execution_options(populate_existing=True)
+        )
+        assert result.scalar() == 0.9
+
+    @pytest.mark.asyncio
+    async def test_get_predictions_invalid_cursor(self, client: AsyncClient):
+        """Test GET /predictions rejects malformed cursors."""
+        response = await client.get("/predictions/?cursor=not-a-cursor")
+        assert response.status_code == 400
+        assert "Invalid cursor" in response.json()["detail"]
+
     @pytest.mark.asyncio
     async def test_get_single_prediction(self, client: AsyncClient, load_test_data):
         """Test GET /predictions/{id} endpoint."""
@@ -105,6 +203,40 @@ class TestPredictionsAPI:
         assert response.status_code == 404
         assert "Prediction not found" in response.json()["detail"]
 
+    @pytest.mark.asyncio
+    async def test_get_single_prediction_expanded(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data, query_budget
+    ):
+        """Test GET /predictions/{id}?expand= loads the whole tree in a fixed number of queries."""
+        test_session.expunge_all()
+
+        # prediction, updates joined with reviews, sources
+        with query_budget(3, max_repeats=1):
+            response = await client.get("/predictions/1?expand=updates,sources,review")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["id"] == 1
+        assert [u["id"] for u in data["updates"]] == [1, 2, 18]
+        assert [s["id"] for s in data["updates"][0]["sources"]] == [1, 2]
+        assert data["updates"][0]["review"]["decision"] == "accept"
+        assert all(u["review"] is not None for u in data["updates"])
+
+    @pytest.mark.asyncio
+    async def test_get_single_prediction_expand_subset(self, client: AsyncClient, load_test_data):
+        """Test GET /predictions/{id} only includes the requested relationships."""
+        response = await client.get("/predictions/2")
+        assert "updates" not in response.json()
+
+        response = await client.get("/predictions/2?expand=updates")
+        assert response.status_code == 200
+        updates = response.json()["updates"]
+        assert len(updates) == 3
+        assert all("sources" not in u and "review" not in u for u in updates)
+
+        response = await client.get("/predictions/2?expand=comments")
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     async def test_post_prediction_201(self, client: AsyncClient, test_session: AsyncSession):
         """Test POST /predictions with a valid payload."""
@@ -132,3 +264,285 @@ class TestPredictionsAPI:
         assert data["status"] == "draft"
         assert data["outcome"] == None
         assert data["resolved_at"] == None
+
+    @pytest.mark.asyncio
+    async def test_post_predictions_batch(self, client: AsyncClient, test_session: AsyncSession):
+        """Test POST /predictions/batch creates valid rows and reports invalid ones."""
+        payload = [
+            {"question": "Will it rain in London tomorrow?", "known_date": "2026-01-02"},
+            {"question": "Missing known date"},
+            {
+                "question": "Will Mars have a human visitor by 2040?",
+                "known_date": "2040-12-31",
+                "require_review": True,
+            },
+            "not an object",
+        ]
+        response = await client.post("/predictions/batch", json=payload)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert [p["question"] for p in data["created"]] == [
+            payload[0]["question"],
+            payload[2]["question"],
+        ]
+        assert all(p["id"] is not None and p["status"] == "draft" for p in data["created"])
+        assert [e["index"] for e in data["errors"]] == [1, 3]
+        assert data["errors"][0]["errors"][0]["loc"] == ["known_date"]
+
+        result = await test_session.execute(select(func.count()).select_from(Prediction))
+        assert result.scalar() == 2
+
+    @pytest.mark.asyncio
+    async def test_post_prediction_update_with_sources(
+        self, client: AsyncClient, test_session: AsyncSession, query_budget
+    ):
+        """Test POST /predictions/{id}/updates writes the update and its sources in bulk."""
+        created = await client.post(
+            "/predictions/", json={"question": "New?", "known_date": "2030-01-01"}
+        )
+        prediction_id = created.json()["id"]
+        source = {
+            "url": "https://example.com",
+            "summary": "Summary",
+            "credibility": 0.9,
+            "relevance": 0.4,
+            "reasoning": "Relevant",
+        }
+        payload = {
+            "likelihood": 0.7,
+            "reasoning": "New evidence",
+            "sources": [{**source, "title": f"Source {i}"} for i in range(5)],
+        }
+        with query_budget(3):
+            response = await client.post(f"/predictions/{prediction_id}/updates", json=payload)
+        assert response.status_code == 201
+
+        data = response.json()
+        assert data["prediction_id"] == prediction_id
+        assert data["likelihood"] == 0.7
+        assert [s["title"] for s in data["sources"]] == [f"Source {i}" for i in range(5)]
+        assert all(s["update_id"] == data["id"] for s in data["sources"])
+        assert all(isinstance(row["id"], int) for row in [data, *data["sources"]])
+        detail = await client.get(f"/predictions/{prediction_id}?expand=sources")
+        assert detail.json()["current_likelihood"] == 0.7
+        assert len(detail.json()["updates"][0]["sources"]) == 5
+
+    @pytest.mark.asyncio
+    async def test_post_prediction_update_invalid(
+        self, client: AsyncClient, test_session: AsyncSession
+    ):
+        """Test POST /predictions/{id}/updates checks the model bounds and the prediction."""
+        created = await client.post(
+            "/predictions/", json={"question": "New?", "known_date": "2030-01-01"}
+        )
+        url = f"/predictions/{created.json()['id']}/updates"
+        source = {"title": "T", "url": "https://example.com", "summary": "S", "reasoning": "R"}
+
+        too_likely = await client.post(url, json={"likelihood": 1.5, "reasoning": "R"})
+        assert too_likely.status_code == 422
+        missing = await client.post(url, json={"reasoning": "R"})
+        assert missing.status_code == 422
+        bad_source = await client.post(
+            url,
+            json={
+                "likelihood": 0.5,
+                "reasoning": "R",
+                "sources": [{**source, "credibility": -0.1, "relevance": 0.5}],
+            },
+        )
+        assert bad_source.status_code == 422
+        assert bad_source.json()["detail"][0]["loc"] == ["body", "sources", 0, "credibility"]
+        unknown = await client.post(
+            "/predictions/999/updates", json={"likelihood": 0.5, "reasoning": "R"}
+        )
+        assert unknown.status_code == 404
+
+        result = await test_session.execute(select(func.count()).select_from(PredictionUpdate))
+        assert result.scalar() == 0
+
+    @pytest.mark.asyncio
+    async def test_get_single_prediction_etag(
+        self, client: AsyncClient, load_test_data, query_budget
+    ):
+        """Test a matching If-None-Match is answered with 304 from the cache, without queries."""
+        response = await client.get("/predictions/1?expand=updates")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert etag.startswith('"')
+
+        with query_budget(0):
+            cached = await client.get("/predictions/1?expand=updates")
+            not_modified = await client.get(
+                "/predictions/1?expand=updates", headers={"If-None-Match": etag}
+            )
+        assert cached.json() == response.json()
+        assert cached.headers["etag"] == etag
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        # Different representation, different ETag
+        other = await client.get("/predictions/1")
+        assert other.headers["etag"] != etag
+
+        stats = (await client.get("/cache/stats")).json()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == 0.5
+        assert stats["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resolve_invalidates_cached_reads(self, client: AsyncClient, load_test_data):
+        """Test writes evict the cached prediction and list pages and change their ETags."""
+        detail = await client.get("/predictions/1")
+        page = await client.get("/predictions/?limit=5")
+        assert detail.json()["status"] != "resolved"
+
+        resolved = await client.post("/predictions/1/resolve", json={"outcome": True})
+        assert resolved.status_code == 200
+
+        new_detail = await client.get(
+            "/predictions/1", headers={"If-None-Match": detail.headers["etag"]}
+        )
+        assert new_detail.status_code == 200
+        assert new_detail.json()["status"] == "resolved"
+        assert new_detail.headers["etag"] != detail.headers["etag"]
+        new_page = await client.get("/predictions/?limit=5")
+        assert new_page.json()[0]["status"] == "resolved"
+        assert new_page.headers["x-next-cursor"] == page.headers["x-next-cursor"]
+
+        response = await client.post(
+            "/predictions/", json={"question": "New?", "known_date": "2030-01-01"}
+        )
+        assert response.status_code == 201
+        # detail and page by the resolve, the re-cached page by the post
+        assert (await client.get("/cache/stats")).json()["invalidations"] == 3
+
+    @pytest.mark.asyncio
+    async def test_post_update_invalidates_cached_reads(self, client: AsyncClient, load_test_data):
+        """Test an update written through the buffer evicts the cached prediction."""
+        detail = await client.get("/predictions/1")
+        assert detail.json()["current_likelihood"] != 0.42
+
+        response = await client.post(
+            "/predictions/1/updates", json={"likelihood": 0.42, "reasoning": "New evidence"}
+        )
+        assert response.status_code == 201
+        assert response.json()["sources"] == []
+
+        new_detail = await client.get(
+            "/predictions/1", headers={"If-None-Match": detail.headers["etag"]}
+        )
+        assert new_detail.status_code == 200
+        assert new_detail.json()["current_likelihood"] == 0.42
+
+    @pytest.mark.asyncio
+    async def test_get_predictions_sparse_fields(self, client: AsyncClient, load_test_data):
+        """Test ?fields= returns only the requested columns, always with id."""
+        full = (await client.get("/predictions/?limit=3")).json()
+
+        response = await client.get("/predictions/?limit=3&fields=question,status")
+        assert response.status_code == 200
+        data = response.json()
+        assert [set(p) for p in data] == [{"id", "question", "status"}] * 3
+        assert data == [
+            {"id": p["id"], "question": p["question"], "status": p["status"]} for p in full
+        ]
+        full_page = await client.get("/predictions/?limit=3")
+        assert response.headers["etag"] != full_page.headers["etag"]
+
+    @pytest.mark.asyncio
+    async def test_get_predictions_unknown_field(self, client: AsyncClient):
+        """Test ?fields= rejects names that are not prediction columns."""
+        response = await client.get("/predictions/?fields=id,secret")
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_get_prediction_series(self, client: AsyncClient, load_test_data):
+        """Test GET /predictions/{id}/series returns the update history as columns."""
+        response = await client.get("/predictions/1/series")
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["prediction_id"] == 1
+        assert data["total_points"] == 3
+        assert data["likelihoods"] == [0.35, 0.42, 0.48]
+        expected = datetime(2025, 10, 15, 12, tzinfo=timezone.utc).timestamp() * 1000
+        assert data["timestamps"][-1] == expected
+        assert "etag" in response.headers
+
+        empty = (await client.get("/predictions/4/series")).json()
+        assert empty == {
+            "prediction_id": 4, "total_points": 0, "timestamps": [], "likelihoods": []
+        }
+        assert (await client.get("/predictions/999/series")).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_get_prediction_series_downsampled(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data
+    ):
+        """Test long histories are downsampled to `points`, keeping the endpoints and spikes."""
+        start = datetime(2024, 1, 1)
+        test_session.add_all(
+            PredictionUpdate(
+                prediction_id=4,
+                likelihood=0.99 if day == 250 else 0.5,
+                reasoning="Daily cycle",
+                created_at=start + timedelta(days=day),
+            )
+            for day in range(1000)
+        )
+        await test_session.commit()
+
+        data = (await client.get("/predictions/4/series?points=40")).json()
+        assert data["total_points"] == 1000
+        assert len(data["timestamps"]) == len(data["likelihoods"]) == 40
+        assert data["timestamps"] == sorted(data["timestamps"])
+        assert data["timestamps"][0] == start.replace(tzinfo=timezone.utc).timestamp() * 1000
+        assert 0.99 in data["likelihoods"]
+
+        assert (await client.get("/predictions/4/series?points=2")).status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_get_predictions_series_many(
+        self, client: AsyncClient, load_test_data, query_budget
+    ):
+        """Test GET /predictions/series fetches several series in one query."""
+        with query_budget(1):
+            response = await client.get("/predictions/series?ids=2,1,4,999&points=3")
+        assert response.status_code == 200
+        data = response.json()
+        assert [s["prediction_id"] for s in data] == [1, 2, 4]
+        assert data[0] == (await client.get("/predictions/1/series")).json()
+        assert [len(s["likelihoods"]) for s in data] == [3, 3, 0]
+
+        assert (await client.get("/predictions/series?ids=1,x")).status_code == 400
+        too_many = ",".join(str(i) for i in range(101))
+        assert (await client.get(f"/predictions/series?ids={too_many}")).status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_archived_prediction_reads_fall_through(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data
+    ):
+        """Test reads by id find predictions moved to the archive, and lists don't."""
+        urls = [
+            "/predictions/6?expand=updates,sources,review",
+            "/predictions/6/series",
+            "/predictions/series?ids=1,6",
+        ]
+        before = [(await client.get(url)).json() for url in urls]
+
+        connection = await test_session.connection()
+        for statement in attach_statements(":memory:"):
+            await connection.exec_driver_sql(statement)
+        connection.info[ARCHIVE_SCHEMA] = True
+        report = await archive_resolved(test_session, datetime(2025, 6, 1))
+        assert report.predictions == 1
+        test_session.expunge_all()
+        app.state.response_cache.clear()
+
+        assert [(await client.get(url)).json() for url in urls] == before
+        ids = [p["id"] for p in (await client.get("/predictions/")).json()]
+        assert 6 not in ids and 3 in ids
+        assert (await client.get("/predictions/999")).status_code == 404
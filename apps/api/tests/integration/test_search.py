@@ -0,0 +1,62 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import Prediction
+
+
+class TestSearchAPI:
+    """Integration tests for search API endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_search_predictions_and_sources(self, client: AsyncClient, load_test_data):
+        """Test GET /search finds predictions and sources with highlighted snippets."""
+        response = await client.get("/search/?q=AGI")
+        assert response.status_code == 200
+
+        hits = response.json()
+        assert {hit["kind"] for hit in hits} == {"prediction", "source"}
+        prediction_hits = [hit for hit in hits if hit["kind"] == "prediction"]
+        assert prediction_hits[0]["id"] == 1
+        assert "<mark>AGI</mark>" in prediction_hits[0]["snippet"]
+        assert all(hit["prediction_id"] == 1 for hit in hits if hit["kind"] == "source")
+        assert [hit["score"] for hit in hits] == sorted(
+            (hit["score"] for hit in hits), reverse=True
+        )
+        # Each kind's best hit scores 1, whatever the raw BM25 scales of the two tables
+        assert [hit["score"] for hit in hits[:2]] == [1.0, 1.0]
+        assert {hits[0]["kind"], hits[1]["kind"]} == {"prediction", "source"}
+
+    @pytest.mark.asyncio
+    async def test_search_filter_by_kind(self, client: AsyncClient, load_test_data):
+        """Test GET /search?kind= restricts results to one table."""
+        response = await client.get("/search/?q=stanford&kind=source")
+        assert response.status_code == 200
+        hits = response.json()
+        assert hits
+        assert all(hit["kind"] == "source" and hit["update_id"] is not None for hit in hits)
+
+    @pytest.mark.asyncio
+    async def test_search_treats_operators_literally(self, client: AsyncClient, load_test_data):
+        """Test FTS5 syntax in the query does not cause errors."""
+        response = await client.get('/search/?q=AGI" OR (NEAR')
+        assert response.status_code == 200
+        assert response.json() == []
+
+    @pytest.mark.asyncio
+    async def test_search_index_follows_writes(
+        self, client: AsyncClient, test_session: AsyncSession, load_test_data
+    ):
+        """Test triggers keep the index in sync with updates and deletes."""
+        prediction = await test_session.get(Prediction, 4)
+        prediction.question = "Will quantum computers break RSA-2048 by 2030?"
+        await test_session.commit()
+
+        response = await client.get("/search/?q=quantum&kind=prediction")
+        assert [hit["id"] for hit in response.json()] == [4]
+
+        await test_session.delete(prediction)
+        await test_session.commit()
+
+        response = await client.get("/search/?q=quantum&kind=prediction")
+        assert response.json() == []
@@ -0,0 +1,293 @@
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from src.config import Settings
+from src.models import HumanReview, Prediction, PredictionStatus, PredictionUpdate, Source
+from src.services.archive_service import ARCHIVE, archive_resolved, compact
+from src.services.eval_service import load_forecasts
+from src.sqldb import create_engine_from_settings
+
+NOW = datetime(2026, 6, 1)
+
+MIGRATIONS = Path(__file__).parents[2] / "alembic"
+
+
+def _prediction(prediction_id: int, status: PredictionStatus, resolved_days_ago=None):
+    return Prediction(
+        id=prediction_id,
+        question=f"Question {prediction_id}?",
+        known_date=date(2026, 1, 1),
+        status=status,
+        outcome=True if resolved_days_ago is not None else None,
+        resolved_at=NOW - timedelta(days=resolved_days_ago) if resolved_days_ago else None,
+    )
+
+
+def _history(prediction_id: int, updates: int, first: int = 0, reasoning: str = "Because"):
+    for i in range(first, first + updates):
+        update_id = prediction_id * 10_000 + i
+        yield PredictionUpdate(
+            id=update_id,
+            prediction_id=prediction_id,
+            likelihood=0.5,
+            reasoning=reasoning,
+            created_at=NOW,
+        )
+        yield Source(
+            update_id=update_id,
+            title="Title",
+            url="https://example.com",
+            summary="Summary",
+            credibility=0.5,
+            relevance=0.5,
+            reasoning="Relevant",
+            created_at=NOW,
+        )
+        yield HumanReview(update_id=update_id, feedback="Looks fine", created_at=NOW)
+
+
+@pytest.fixture
+async def settings(tmp_path):
+    settings = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'hot.db'}",
+        archive_database_path=str(tmp_path / "archive.db"),
+    )
+    engine = create_engine_from_settings(settings)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add_all(
+            [
+                _prediction(1, PredictionStatus.RESOLVED, resolved_days_ago=700),
+                _prediction(2, PredictionStatus.RESOLVED, resolved_days_ago=1),
+                _prediction(3, PredictionStatus.REVIEWED),
+            ]
+        )
+        await session.flush()
+        for prediction_id in (1, 2, 3):
+            session.add_all(_history(prediction_id, 2))
+        await session.commit()
+    await engine.dispose()
+    return settings
+
+
+async def _ids(session: AsyncSession, table: str, schema: str = "main"):
+    result = await session.execute(text(f"SELECT id FROM {schema}.{table} ORDER BY id"))
+    return result.scalars().all()
+
+
+class TestArchiveResolved:
+    """Unit tests for moving resolved predictions into the archive database."""
+
+    @pytest.mark.asyncio
+    async def test_moves_old_resolved_predictions_with_children(self, settings):
+        """Test only predictions resolved before the cutoff move, together with their history."""
+        engine = create_engine_from_settings(settings)
+        try:
+            async with AsyncSession(engine) as session:
+                report = await archive_resolved(session, NOW - timedelta(days=365), batch_size=1)
+                assert tuple(report) == (1, 2, 2, 2)
+
+                assert await _ids(session, "prediction") == [2, 3]
+                assert await _ids(session, "prediction", "archive") == [1]
+                assert await _ids(session, "predictionupdate", "archive") == [10_000, 10_001]
+                assert len(await _ids(session, "source", "archive")) == 2
+                assert len(await _ids(session, "humanreview", "archive")) == 2
+                assert len(await _ids(session, "source")) == 4
+                assert await _ids(session, "tombstone") == []  # archived, not deleted
+                assert await session.get(Prediction, 1) is None
+
+                archived = await session.get(Prediction, 1, execution_options=ARCHIVE)
+                assert archived.status == PredictionStatus.RESOLVED
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_rerun_skips_rows_copied_before_a_crash(self, settings):
+        """Test a batch already present in the archive unchanged is moved without conflicts."""
+        engine = create_engine_from_settings(settings)
+        try:
+            async with AsyncSession(engine) as session:
+                copy = "INSERT INTO archive.prediction SELECT * FROM main.prediction WHERE id = 1"
+                await session.execute(text(copy))
+                await session.commit()
+
+                report = await archive_resolved(session, NOW - timedelta(days=365))
+                assert report.predictions == 1
+                assert await _ids(session, "prediction") == [2, 3]
+                assert await _ids(session, "prediction", "archive") == [1]
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_conflicting_archived_id_fails_the_batch(self, settings):
+        """Test a different archived row with the same id is never overwritten."""
+        engine = create_engine_from_settings(settings)
+        try:
+            async with AsyncSession(engine) as session:
+                copy = "INSERT INTO archive.prediction SELECT * FROM main.prediction WHERE id = 1"
+                await session.execute(text(copy))
+                await session.execute(
+                    text("UPDATE archive.prediction SET question = 'Other?' WHERE id = 1")
+                )
+                await session.commit()
+
+                with pytest.raises(IntegrityError):
+                    await archive_resolved(session, NOW - timedelta(days=365))
+                await session.rollback()
+                assert await _ids(session, "prediction") == [1, 2, 3]
+                archived = await session.get(Prediction, 1, execution_options=ARCHIVE)
+                assert archived.question == "Other?"
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_new_rows_never_reuse_archived_ids(self, settings):
+        """Test ids continue after the largest archived id, even for older archives."""
+        engine = create_engine_from_settings(settings)
+        try:
+            async with AsyncSession(engine) as session:
+                # Archived before the tables had AUTOINCREMENT, above every hot id
+                await session.execute(
+                    text(
+                        "INSERT INTO archive.prediction (id, question, known_date, status, "
+                        "require_review, created_at) SELECT 50, question, known_date, status, "
+                        "require_review, created_at FROM main.prediction WHERE id = 3"
+                    )
+                )
+                await session.commit()
+
+                await archive_resolved(session, NOW)
+                session.add(_prediction(None, PredictionStatus.DRAFT))
+                await session.commit()
+                assert await _ids(session, "prediction") == [3, 51]
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_read_only_engine_reads_archive(self, settings):
+        """Test connections of the read-only engine attach the archive as well."""
+        engine = create_engine_from_settings(settings)
+        read_engine = create_engine_from_settings(settings, read_only=True)
+        try:
+            async with AsyncSession(engine) as session:
+                await archive_resolved(session, NOW)
+            async with AsyncSession(read_engine) as session:
+                archived = await session.get(Prediction, 2, execution_options=ARCHIVE)
+                assert archived.id == 2
+        finally:
+            await read_engine.dispose()
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_calibration_reads_archived_forecasts(self, settings):
+        """Test archiving resolved predictions leaves the forecasts to calibrate unchanged."""
+        engine = create_engine_from_settings(settings)
+        try:
+            async with AsyncSession(engine) as session:
+                before = await load_forecasts(session)
+                latest_before = await load_forecasts(session, latest_only=True)
+                await archive_resolved(session, NOW)
+                assert await _ids(session, "prediction", "archive") == [1, 2]
+
+                after = await load_forecasts(session)
+                latest_after = await load_forecasts(session, latest_only=True)
+                assert after.likelihood.size == before.likelihood.size == 4
+                assert latest_after.likelihood.size == latest_before.likelihood.size == 2
+                assert after.outcome.sum() == before.outcome.sum()
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_requires_archive(self, tmp_path):
+        """Test archiving fails when no archive database is configured."""
+        settings = Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'hot.db'}")
+        engine = create_engine_from_settings(settings)
+        try:
+            async with AsyncSession(engine) as session:
+                with pytest.raises(RuntimeError):
+                    await archive_resolved(session, NOW)
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_compact_shrinks_hot_database(self, settings, tmp_path):
+        """Test compacting returns the pages of archived rows to the filesystem."""
+        engine = create_engine_from_settings(settings)
+        try:
+            async with AsyncSession(engine) as session:
+                session.add_all(_history(1, 500, first=2, reasoning="x" * 2000))
+                await session.commit()
+                await compact(engine)
+                before = os.path.getsize(tmp_path / "hot.db")
+
+                await archive_resolved(session, NOW - timedelta(days=365))
+            await compact(engine)
+            assert os.path.getsize(tmp_path / "hot.db") < before / 4
+        finally:
+            await engine.dispose()
+
+
+class TestAutoincrementMigration:
+    """Tests for migrations 013-015, which give the archived tables AUTOINCREMENT online."""
+
+    def test_writes_during_the_migration_are_kept(self, tmp_path):
+        """Test rows written between the copy, the chunked copy and the swap all survive."""
+        url = f"sqlite:///{tmp_path / 'hot.db'}"
+        # No config file, so env.py leaves the test's logging alone
+        config = Config()
+        config.set_main_option("script_location", str(MIGRATIONS))
+        config.set_main_option("sqlalchemy.url", url)
+        engine = create_engine(url)
+
+        def insert(conn, question):
+            conn.execute(
+                text(
+                    "INSERT INTO prediction (question, status, created_at, known_date, "
+                    "require_review) VALUES (:question, 'DRAFT', '2026-01-01', '2026-06-01', 0)"
+                ),
+                {"question": question},
+            )
+
+        try:
+            command.upgrade(config, "93ce4bee077e")
+            with engine.begin() as conn:
+                for i in range(1, 6):
+                    insert(conn, f"before {i}")
+
+            command.upgrade(config, "098bad4e745e")
+            with engine.begin() as conn:
+                insert(conn, "after the copies were created")
+                conn.execute(text("UPDATE prediction SET question = 'edited' WHERE id = 2"))
+                conn.execute(text("DELETE FROM prediction WHERE id = 3"))
+
+            command.upgrade(config, "ebe275c01771")
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE prediction SET question = 'edited again' WHERE id = 4"))
+                conn.execute(text("DELETE FROM prediction WHERE id = 6"))
+
+            command.upgrade(config, "head")
+            with engine.begin() as conn:
+                rows = conn.execute(text("SELECT id, question FROM prediction ORDER BY id")).all()
+                assert rows == [(1, "before 1"), (2, "edited"), (4, "edited again"), (5, "before 5")]
+                tables = conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE name LIKE '\\_new\\_%' ESCAPE '\\'")
+                ).all()
+                assert not tables
+                # The deleted id 6 is never handed out again
+                insert(conn, "new")
+                assert conn.execute(text("SELECT MAX(id) FROM prediction")).scalar() == 7
+                assert conn.execute(
+                    text("SELECT COUNT(*) FROM prediction_fts WHERE prediction_fts MATCH 'again'")
+                ).scalar() == 1
+        finally:
+            engine.dispose()
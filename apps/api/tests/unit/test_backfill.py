@@ -0,0 +1,185 @@
+import io
+import logging
+from argparse import Namespace
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError
+
+from src.backfill import PROGRESS_TABLE, BackfillDryRun, BackfillReport, run_chunked
+
+# Keys are sparse (odd ids only), as after deletes
+ROWS = 2500
+DOUBLE = "UPDATE item SET doubled = value * 2 WHERE id > :lo AND id <= :hi"
+MARK = "UPDATE item SET doubled = 0 WHERE id > :lo AND id <= :hi"
+
+
+@pytest.fixture
+def connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'backfill.db'}")
+    with engine.connect() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE item (id INTEGER PRIMARY KEY, value INTEGER NOT NULL, "
+                "doubled INTEGER CHECK (doubled IS NULL OR doubled < 4000))"
+            )
+        )
+        conn.execute(
+            text("INSERT INTO item (id, value) VALUES (:id, :value)"),
+            [{"id": 2 * i + 1, "value": i} for i in range(ROWS)],
+        )
+        conn.commit()
+        yield conn.execution_options(isolation_level="AUTOCOMMIT")
+    engine.dispose()
+
+
+# A throwaway migration environment around one backfill revision
+ENV_PY = """
+from alembic import context
+from sqlalchemy import create_engine
+
+if context.is_offline_mode():
+    context.configure(url=context.config.get_main_option("sqlalchemy.url"), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+else:
+    with create_engine(context.config.get_main_option("sqlalchemy.url")).connect() as conn:
+        context.configure(connection=conn)
+        with context.begin_transaction():
+            context.run_migrations()
+"""
+
+BACKFILL_REVISION = f"""
+from src.backfill import migrate_in_chunks
+
+revision = "b1"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    migrate_in_chunks("mark", "item", "{MARK}", chunk_size=1000, pause_seconds=0)
+
+
+def downgrade():
+    pass
+"""
+
+
+@pytest.fixture
+def alembic_config(tmp_path):
+    (tmp_path / "migrations" / "versions").mkdir(parents=True)
+    (tmp_path / "migrations" / "env.py").write_text(ENV_PY)
+    (tmp_path / "migrations" / "versions" / "b1_backfill.py").write_text(BACKFILL_REVISION)
+
+    def make(*x_arguments: str, output_buffer=None) -> Config:
+        config = Config(output_buffer=output_buffer)
+        config.set_main_option("script_location", str(tmp_path / "migrations"))
+        config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path / 'backfill.db'}")
+        config.cmd_opts = Namespace(x=list(x_arguments))
+        return config
+
+    return make
+
+
+def _filled(connection) -> int:
+    return connection.execute(text("SELECT COUNT(*) FROM item WHERE doubled IS NOT NULL")).scalar()
+
+
+def _progress(connection):
+    return connection.execute(text(f"SELECT last_key, rows FROM {PROGRESS_TABLE}")).all()
+
+
+class TestRunChunked:
+    """Unit tests for chunked, resumable data migrations."""
+
+    def test_runs_statement_in_chunks(self, connection):
+        """Test every row is covered in chunk_size key ranges and progress is cleared."""
+        report = run_chunked(connection, "mark", "item", MARK, chunk_size=1000, pause_seconds=0)
+        assert (report.rows, report.chunks, report.resumed_after) == (ROWS, 3, None)
+        assert _filled(connection) == ROWS
+        assert not _progress(connection)
+
+    def test_failed_chunk_keeps_committed_progress(self, connection):
+        """Test a failing chunk rolls back alone and earlier chunks stay committed."""
+        # value * 2 breaks the CHECK constraint from value 2000 on, in the third chunk
+        with pytest.raises(IntegrityError):
+            run_chunked(connection, "double", "item", DOUBLE, chunk_size=1000, pause_seconds=0)
+        assert _filled(connection) == 2000
+        assert _progress(connection) == [(3999, 2000)]
+
+    def test_resumes_after_last_committed_chunk(self, connection):
+        """Test a second run starts after the recorded key."""
+        with pytest.raises(IntegrityError):
+            run_chunked(connection, "double", "item", DOUBLE, chunk_size=1500, pause_seconds=0)
+        assert _progress(connection) == [(2999, 1500)]
+
+        # Fix the data that made the second chunk fail
+        connection.execute(text("UPDATE item SET value = 1 WHERE id > 2999"))
+        report = run_chunked(
+            connection, "double", "item", DOUBLE, chunk_size=1500, pause_seconds=0
+        )
+        assert (report.rows, report.chunks, report.resumed_after) == (ROWS - 1500, 1, 2999)
+        assert _filled(connection) == ROWS
+        assert not _progress(connection)
+
+    def test_dry_run_changes_nothing(self, connection):
+        """Test a dry run reports the rows it would change and rolls every chunk back."""
+        report = run_chunked(
+            connection, "mark", "item", MARK, chunk_size=1000, pause_seconds=0, dry_run=True
+        )
+        assert (report.rows, report.chunks, report.dry_run) == (ROWS, 3, True)
+        assert _filled(connection) == 0
+        assert not _progress(connection)
+
+    def test_requires_autocommit_connection(self, tmp_path):
+        """Test a connection with implicit transactions is rejected."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+        with engine.connect() as conn, pytest.raises(ValueError):
+            run_chunked(conn, "double", "item", DOUBLE)
+        engine.dispose()
+
+    def test_report_mentions_resume_after_key_zero(self):
+        """Test a run resumed after key 0 still says so."""
+        report = BackfillReport("mark", 10, 1, 0.1, 1.0, 1.0, resumed_after=0, dry_run=False)
+        assert str(report).endswith("resumed after key 0")
+
+
+class TestMigrateInChunks:
+    """Unit tests for running backfills from alembic revisions."""
+
+    def _version(self, connection):
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'alembic_version'")
+        ).scalar()
+        if not exists:
+            return None
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+    def test_upgrade_runs_backfill(self, connection, alembic_config, caplog):
+        """Test the revision backfills in chunks, honours -x overrides and is stamped."""
+        with caplog.at_level(logging.INFO, logger="varinaut.backfill"):
+            command.upgrade(alembic_config("backfill_chunk_size=500"), "head")
+        assert _filled(connection) == ROWS
+        assert not _progress(connection)
+        assert self._version(connection) == "b1"
+        assert any(f"{ROWS} rows in 5 chunks" in r.getMessage() for r in caplog.records)
+
+    def test_dry_run_stops_before_stamping(self, connection, alembic_config):
+        """Test -x backfill_dry_run raises BackfillDryRun, changing and stamping nothing."""
+        with pytest.raises(BackfillDryRun) as raised:
+            command.upgrade(alembic_config("backfill_dry_run=true"), "head")
+        assert raised.value.report.rows == ROWS
+        assert _filled(connection) == 0
+        assert self._version(connection) is None
+
+    def test_offline_emits_one_statement(self, alembic_config):
+        """Test --sql mode writes the statement once over the whole key range."""
+        output = io.StringIO()
+        command.upgrade(alembic_config(output_buffer=output), "head", sql=True)
+        sql = output.getvalue()
+        assert sql.count("UPDATE item SET doubled = 0") == 1
+        assert f"id > {-(2**63)} AND id <= {2**63 - 1}" in sql
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from src.services.eval_service import Forecasts, build_report, score_forecasts
+
+
+class TestScoreForecasts:
+    """Unit tests for the vectorized scoring engine."""
+
+    def test_matches_per_row_computation(self):
+        """Test vectorized metrics against a straightforward per-row implementation."""
+        rng = np.random.default_rng(7)
+        likelihood = rng.random(1000)
+        outcome = (rng.random(1000) < likelihood).astype(np.float64)
+
+        report = score_forecasts("all", likelihood, outcome, bins=10)
+
+        brier = sum((p - o) ** 2 for p, o in zip(likelihood, outcome)) / 1000
+        log_loss = (
+            -sum(o * np.log(p) + (1 - o) * np.log(1 - p) for p, o in zip(likelihood, outcome))
+            / 1000
+        )
+        assert report.count == 1000
+        assert report.brier_score == pytest.approx(brier)
+        assert report.log_loss == pytest.approx(log_loss)
+        assert sum(b.count for b in report.bins) == 1000
+        # Murphy decomposition holds up to the within-bin variance
+        decomposed = report.reliability - report.resolution + report.uncertainty
+        assert decomposed == pytest.approx(report.brier_score, abs=0.01)
+
+    def test_edges_and_empty_bins(self):
+        """Test likelihood 1.0 lands in the last bin and empty bins have no means."""
+        report = score_forecasts("edges", np.array([0.0, 1.0]), np.array([0.0, 1.0]), bins=4)
+        assert [b.count for b in report.bins] == [1, 0, 0, 1]
+        assert report.bins[1].mean_likelihood is None
+        assert report.brier_score == 0.0
+        assert report.reliability == 0.0
+
+    def test_empty_input(self):
+        """Test scoring no forecasts yields counts but no metrics."""
+        report = score_forecasts("none", np.empty(0), np.empty(0), bins=5)
+        assert report.count == 0
+        assert report.brier_score is None
+        assert len(report.bins) == 5
+
+    def test_report_slices(self):
+        """Test forecasts are split by horizon bucket and require_review."""
+        forecasts = Forecasts(
+            likelihood=np.array([0.1, 0.6, 0.9]),
+            outcome=np.array([0.0, 1.0, 1.0]),
+            horizon_days=np.array([5.0, 45.0, 400.0]),
+            require_review=np.array([True, False, False]),
+        )
+        report = build_report(forecasts, bins=10, horizons=[30, 90, 365])
+
+        assert [(s.label, s.count) for s in report.by_horizon] == [
+            ("0-30d", 1),
+            ("30-90d", 1),
+            ("90-365d", 0),
+            ("365d+", 1),
+        ]
+        assert [(s.label, s.count) for s in report.by_review] == [
+            ("review_required", 1),
+            ("no_review", 2),
+        ]
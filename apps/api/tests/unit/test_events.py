@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from src.events import EventHub, OverflowPolicy
+from src.models import EventType
+
+
+class TestEventHub:
+    """Unit tests for the bounded fan-out of prediction events."""
+
+    @pytest.mark.asyncio
+    async def test_fan_out_to_topic_subscribers(self):
+        """Test events reach every subscriber of their prediction, in order, and no one else."""
+        hub = EventHub(max_queue_size=8, policy=OverflowPolicy.COALESCE)
+        first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+
+        hub.publish(1, EventType.PROGRESS, {"step": "search"})
+        hub.publish(1, EventType.NEED_APPROVAL, {"update_id": 7})
+
+        for subscription in (first, second):
+            messages = [json.loads(await subscription.get()) for _ in range(2)]
+            assert [m["type"] for m in messages] == ["progress", "need_approval"]
+            assert [m["seq"] for m in messages] == [1, 2]
+            assert messages[1]["data"] == {"update_id": 7}
+        assert len(other) == 0
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        assert hub.stats().topics == 1
+        assert hub.stats().delivered == 4
+
+    @pytest.mark.asyncio
+    async def test_get_waits_for_publish(self):
+        """Test a waiting subscriber wakes up when an event is published."""
+        hub = EventHub(max_queue_size=8, policy=OverflowPolicy.DROP_OLDEST)
+        with hub.subscription(1) as subscription:
+            waiter = asyncio.create_task(subscription.get())
+            await asyncio.sleep(0)
+            assert not waiter.done()
+            hub.publish(1, EventType.PROGRESS)
+            assert json.loads(await asyncio.wait_for(waiter, 1))["seq"] == 1
+        assert hub.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_coalesce_keeps_latest_progress(self):
+        """Test pending progress events are replaced, while need_approval events are kept."""
+        hub = EventHub(max_queue_size=8, policy=OverflowPolicy.COALESCE)
+        subscription = hub.subscribe(1)
+        for step in range(100):
+            hub.publish(1, EventType.PROGRESS, {"step": step})
+        hub.publish(1, EventType.NEED_APPROVAL)
+        hub.publish(1, EventType.NEED_APPROVAL)
+
+        assert len(subscription) == 3
+        messages = [json.loads(await subscription.get()) for _ in range(3)]
+        assert [(m["type"], m["seq"]) for m in messages] == [
+            ("progress", 100),
+            ("need_approval", 101),
+            ("need_approval", 102),
+        ]
+        assert hub.stats().coalesced == 99
+        assert hub.stats().dropped == 0
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_when_full(self):
+        """Test a full queue evicts its oldest event and reports the gap before the next one."""
+        hub = EventHub(max_queue_size=4, policy=OverflowPolicy.DROP_OLDEST)
+        subscription = hub.subscribe(1)
+        for step in range(10):
+            hub.publish(1, EventType.PROGRESS, {"step": step})
+
+        assert len(subscription) == 4
+        lagged = json.loads(await subscription.get())
+        assert lagged == {"type": "lagged", "prediction_id": 1, "seq": 7, "data": {"missed": 6}}
+        assert [json.loads(await subscription.get())["seq"] for _ in range(4)] == [7, 8, 9, 10]
+        assert hub.stats().dropped == 6
+
+    def test_publish_without_subscribers(self):
+        """Test publishing to a prediction nobody watches only advances its sequence."""
+        hub = EventHub(max_queue_size=4, policy=OverflowPolicy.COALESCE)
+        assert hub.publish(5, EventType.PROGRESS).seq == 1
+        assert hub.publish(5, EventType.PROGRESS).seq == 2
+        assert hub.stats().delivered == 0
@@ -0,0 +1,128 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from src.logging_config import JsonFormatter, RateLimitFilter, setup_logging, stop_logging
+
+
+def make_record(
+    name="varinaut.test", level=logging.INFO, msg="hello %s", args=("world",), **extra
+):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class TestJsonFormatter:
+    """Unit tests for structured log output."""
+
+    def test_formats_record_as_json(self):
+        """Test core fields and extras are serialized."""
+        entry = json.loads(JsonFormatter().format(make_record(prediction_id=7)))
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "varinaut.test"
+        assert entry["message"] == "hello world"
+        assert entry["prediction_id"] == 7
+        assert "timestamp" in entry
+
+    def test_includes_traceback(self):
+        """Test exception info is rendered into its own field."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord(
+                "varinaut.test", logging.ERROR, __file__, 1, "failed", None, True
+            )
+            record.exc_info = sys.exc_info()
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["message"] == "failed"
+        assert "ValueError: boom" in entry["exc_info"]
+
+
+class TestRateLimitFilter:
+    """Unit tests for per-logger sampling."""
+
+    def test_drops_records_over_the_limit(self):
+        """Test a burst is cut to the bucket size and drops are counted."""
+        limiter = RateLimitFilter({"varinaut.services": 5})
+        passed = sum(limiter.filter(make_record("varinaut.services.brier")) for _ in range(50))
+        assert 5 <= passed < 10
+        assert limiter.dropped["varinaut.services"] == 50 - passed
+
+    def test_unlisted_loggers_and_warnings_pass(self):
+        """Test only configured loggers below WARNING are limited."""
+        limiter = RateLimitFilter({"varinaut.services": 1})
+        assert all(limiter.filter(make_record("varinaut.api")) for _ in range(20))
+        assert all(
+            limiter.filter(make_record("varinaut.services", level=logging.WARNING))
+            for _ in range(20)
+        )
+
+
+class TestSetupLogging:
+    """Unit tests for the queue-based logging setup."""
+
+    def test_records_are_written_by_listener(self, tmp_path, restore_root_logger):
+        """Test records reach the file through the queue, with tracebacks kept."""
+        setup_logging(log_dir=tmp_path, json_format=True)
+        root = logging.getLogger()
+        assert any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+
+        logger = logging.getLogger("varinaut.test")
+        logger.info("queued %d", 1, extra={"request_id": "abc"})
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("division failed")
+        stop_logging()
+
+        lines = [json.loads(line) for line in (tmp_path / "varinaut.log").read_text().splitlines()]
+        queued = next(entry for entry in lines if entry["message"] == "queued 1")
+        assert queued["request_id"] == "abc"
+        failed = next(entry for entry in lines if entry["message"] == "division failed")
+        assert "ZeroDivisionError" in failed["exc_info"]
+
+    def test_setup_replaces_previous_handler(self, tmp_path, restore_root_logger):
+        """Test calling setup again swaps the queue handler and stops the old listener."""
+        first = setup_logging(log_dir=tmp_path)
+        first_handlers = logging.getLogger().handlers[:]
+        second = setup_logging(log_dir=tmp_path)
+        root_handlers = logging.getLogger().handlers
+        assert first._thread is None
+        assert second._thread is not None
+        assert len(root_handlers) == len(first_handlers)
+        assert first_handlers[-1] not in root_handlers
+
+    def test_queued_record_is_a_copy(self, tmp_path, restore_root_logger):
+        """Test preparing a record for the queue leaves the caller's record unchanged."""
+        setup_logging(log_dir=tmp_path)
+        handler = next(
+            h
+            for h in logging.getLogger().handlers
+            if isinstance(h, logging.handlers.QueueHandler)
+        )
+        record = make_record()
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            record.exc_info = sys.exc_info()
+
+        queued = handler.prepare(record)
+        assert queued is not record
+        assert (queued.msg, queued.args, queued.exc_info) == ("hello world", None, None)
+        assert "ZeroDivisionError" in queued.exc_text
+        assert (record.msg, record.args, record.exc_text) == ("hello %s", ("world",), None)
+        assert record.exc_info[0] is ZeroDivisionError
+        stop_logging()
@@ -0,0 +1,86 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from src.config import Settings
+from src.metrics import instrument_engine, metrics, track_queries
+from src.query_monitor import QueryMonitorMiddleware, instrument_queries
+from src.sqldb import create_engine_from_settings
+
+
+@pytest.fixture
+async def monitored_engine(tmp_path):
+    settings = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'monitor.db'}", slow_query_ms=0.000001
+    )
+    engine = create_engine_from_settings(settings)
+    instrument_queries(engine, settings)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, x INTEGER)"))
+        await conn.execute(text("CREATE INDEX ix_t_x ON t (x)"))
+    yield engine
+    await engine.dispose()
+
+
+class TestQueryMonitor:
+    """Unit tests for the slow-query log and N+1 detection."""
+
+    @pytest.mark.asyncio
+    async def test_slow_query_logged_with_plan(self, monitored_engine, caplog):
+        """Test statements over the threshold are logged with parameters and query plan."""
+        with caplog.at_level(logging.WARNING, logger="varinaut.sql"):
+            async with monitored_engine.connect() as conn:
+                await conn.execute(text("SELECT id FROM t WHERE x = :x"), {"x": 42})
+
+        message = next(r.getMessage() for r in caplog.records if "WHERE x = ?" in r.getMessage())
+        assert message.startswith("Slow query")
+        assert "(42,)" in message
+        assert "USING COVERING INDEX ix_t_x" in message
+
+    @pytest.mark.asyncio
+    async def test_tracker_nests(self, monitored_engine):
+        """Test nested trackers report statements to their parents."""
+        async with monitored_engine.connect() as conn:
+            with track_queries() as outer:
+                await conn.execute(text("SELECT 1"))
+                with track_queries() as inner:
+                    for _ in range(3):
+                        await conn.execute(text("SELECT x FROM t"))
+        assert inner.total == 3
+        assert outer.total == 4
+        assert outer.repeated(3) == [("SELECT x FROM t", 3)]
+
+    @pytest.mark.asyncio
+    async def test_statements_timed_once(self, monitored_engine):
+        """Test the monitor and the metrics share one cursor hook and tracker chain."""
+        instrument_engine(monitored_engine, "monitored")
+        metrics.reset()
+        async with monitored_engine.connect() as conn:
+            with track_queries() as tracker:
+                await conn.execute(text("SELECT 1"))
+        assert len(monitored_engine.sync_engine.dispatch.before_cursor_execute) == 1
+        assert tracker.total == 1
+        assert tracker.db_seconds > 0
+        assert metrics.statements.value(("monitored",)) == 1
+        metrics.reset()
+
+    @pytest.mark.asyncio
+    async def test_middleware_flags_repeated_statements(self, monitored_engine, caplog):
+        """Test a request repeating a statement past the threshold is reported as N+1."""
+
+        async def app(scope, receive, send):
+            async with monitored_engine.connect() as conn:
+                for i in range(5):
+                    await conn.execute(text("SELECT x FROM t WHERE id = :id"), {"id": i})
+
+        middleware = QueryMonitorMiddleware(app, threshold=5)
+        with caplog.at_level(logging.WARNING, logger="varinaut.sql"):
+            await middleware({"type": "http", "method": "GET", "path": "/loop"}, None, None)
+
+        warnings = [
+            r.getMessage() for r in caplog.records if r.getMessage().startswith("Suspected N+1")
+        ]
+        assert warnings == [
+            "Suspected N+1: statement ran 5 times in GET /loop: SELECT x FROM t WHERE id = ?"
+        ]
@@ -0,0 +1,40 @@
+import numpy as np
+
+from src.services.series_service import lttb
+
+
+class TestLttb:
+    """Unit tests for Largest-Triangle-Three-Buckets downsampling."""
+
+    def test_short_series_kept_whole(self):
+        """Test series no longer than the target are returned unchanged."""
+        x = np.arange(5, dtype=np.float64)
+        assert lttb(x, x, 5).tolist() == [0, 1, 2, 3, 4]
+        assert lttb(x, x, 100).tolist() == [0, 1, 2, 3, 4]
+        assert lttb(np.empty(0), np.empty(0), 10).tolist() == []
+
+    def test_keeps_endpoints_and_spikes(self):
+        """Test the first and last samples and isolated spikes survive downsampling."""
+        x = np.arange(1000, dtype=np.float64)
+        y = np.full(1000, 0.5)
+        y[[137, 512, 873]] = [0.95, 0.05, 0.9]
+
+        selected = lttb(x, y, 50)
+
+        assert len(selected) == 50
+        assert selected[0] == 0 and selected[-1] == 999
+        assert np.all(np.diff(selected) > 0)
+        assert {137, 512, 873} <= set(selected.tolist())
+
+    def test_one_sample_per_bucket(self):
+        """Test each bucket between the endpoints contributes exactly one sample."""
+        rng = np.random.default_rng(3)
+        x = np.sort(rng.random(10_001)) * 1e12
+        y = rng.random(10_001)
+
+        selected = lttb(x, y, 102)
+
+        bounds = (np.arange(101) * (9_999 / 100)).astype(int) + 1
+        bounds[-1] = 10_000
+        buckets = np.searchsorted(bounds, selected[1:-1], side="right") - 1
+        assert buckets.tolist() == list(range(100))
@@ -0,0 +1,201 @@
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from src.config import Settings, SourceLimits
+from src.metrics import metrics
+from src.source_client import Provider, SourceClient, providers_from_settings
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        with server.lock:
+            server.requests.append((time.monotonic(), self.client_address[1], self.path))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            status, headers = server.responses.pop(0) if server.responses else (200, {})
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.do_GET()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def server():
+    """A local provider answering the scripted `responses`, then 200s."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.responses = []
+    server.delay = 0.0
+    server.in_flight = server.max_in_flight = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    metrics.reset()
+    yield server
+    metrics.reset()
+    server.shutdown()
+    server.server_close()
+
+
+def _client(url: str, limits: SourceLimits, **kwargs) -> SourceClient:
+    return SourceClient([Provider("stub", url, limits)], backoff=0.01, **kwargs)
+
+
+class TestSourceClient:
+    """Unit tests for the pooled research source client."""
+
+    def test_providers_from_settings(self):
+        """Test providers get their credentials and limits, and empty URLs are skipped."""
+        settings = Settings(
+            ai_model_api_url="",
+            google_api_key="key",
+            google_cse_id="cx",
+            source_limits={"x": {"rate": 3, "burst": 2}},
+        )
+        providers = {provider.name: provider for provider in providers_from_settings(settings)}
+        assert set(providers) == {"x", "polymarket", "google"}
+        assert providers["google"].params == {"key": "key", "cx": "cx"}
+        assert providers["x"].limits == SourceLimits(rate=3, burst=2)
+        assert providers["polymarket"].limits.rate == 1.0
+        with pytest.raises(ValidationError):
+            SourceLimits(rate=0)
+
+    @pytest.mark.asyncio
+    async def test_reuses_connections(self, server):
+        """Test sequential requests share one kept-alive connection."""
+        client = _client(server.url, SourceLimits(rate=1000, burst=10))
+        for i in range(5):
+            response = await client.get("stub", f"/search?q={i}")
+            assert response.status_code == 200
+        await client.aclose()
+        assert client.closed
+        assert len({port for _, port, _ in server.requests}) == 1
+        assert metrics.source_requests.value(("stub", "200")) == 5
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_spaces_requests(self, server):
+        """Test requests past the burst wait for the bucket to refill."""
+        client = _client(server.url, SourceLimits(rate=20, burst=2, concurrency=10))
+        started = time.monotonic()
+        await asyncio.gather(*(client.get("stub") for _ in range(6)))
+        await client.aclose()
+        # 2 at once, then 4 at 20/s
+        assert time.monotonic() - started >= 0.18
+        assert len(server.requests) == 6
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self, server):
+        """Test no more than `concurrency` requests are in flight per provider."""
+        server.delay = 0.05
+        client = _client(server.url, SourceLimits(rate=1000, burst=20, concurrency=3))
+        await asyncio.gather(*(client.get("stub") for _ in range(12)))
+        await client.aclose()
+        assert server.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_after_429(self, server):
+        """Test a 429 is retried after its Retry-After, holding off the provider."""
+        server.responses = [(429, {"Retry-After": "0.2"})]
+        client = _client(server.url, SourceLimits(rate=1000, burst=10))
+        started = time.monotonic()
+        response = await client.get("stub", "/quote")
+        await client.aclose()
+        assert response.status_code == 200
+        assert time.monotonic() - started >= 0.2
+        assert [path for _, _, path in server.requests] == ["/quote", "/quote"]
+        assert metrics.source_retries.value(("stub",)) == 1
+        assert metrics.source_requests.value(("stub", "429")) == 1
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_is_returned(self, server):
+        """Test a Retry-After beyond `max_backoff` returns the 429 right away."""
+        server.responses = [(429, {"Retry-After": "3600"})]
+        client = _client(server.url, SourceLimits(rate=1000, burst=10))
+        response = await client.get("stub")
+        await client.aclose()
+        assert response.status_code == 429
+        assert len(server.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, server):
+        """Test server errors are retried `max_retries` times, then returned."""
+        server.responses = [(503, {})] * 5
+        client = _client(server.url, SourceLimits(rate=1000, burst=10), max_retries=2)
+        response = await client.get("stub")
+        await client.aclose()
+        assert response.status_code == 503
+        assert len(server.requests) == 3
+        assert metrics.source_retries.value(("stub",)) == 2
+
+    @pytest.mark.asyncio
+    async def test_post_only_retried_when_refused(self, server):
+        """Test a POST is not repeated after a server error, only after a 503 with Retry-After."""
+        server.responses = [(502, {}), (503, {"Retry-After": "0"})]
+        client = _client(server.url, SourceLimits(rate=1000, burst=10))
+        failed = await client.post("stub", "/orders", json={"side": "buy"})
+        refused = await client.post("stub", "/orders", json={"side": "buy"})
+        await client.aclose()
+        assert failed.status_code == 502
+        assert refused.status_code == 200
+        assert len(server.requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_idempotent_post_is_retried(self, server):
+        """Test a POST marked idempotent is retried like a GET."""
+        server.responses = [(500, {})]
+        client = _client(server.url, SourceLimits(rate=1000, burst=10))
+        response = await client.post("stub", "/search", json={"q": "x"}, idempotent=True)
+        await client.aclose()
+        assert response.status_code == 200
+        assert len(server.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_post_read_timeout_is_not_retried(self, server):
+        """Test a POST that timed out waiting for its response is not sent again."""
+        server.delay = 0.3
+        client = _client(server.url, SourceLimits(rate=1000, burst=10), timeout=0.05)
+        with pytest.raises(httpx.ReadTimeout):
+            await client.post("stub", "/orders", json={"side": "buy"})
+        await client.aclose()
+        assert len(server.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_raise_after_retries(self):
+        """Test connection errors are retried, then raised."""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        metrics.reset()
+        client = _client(url, SourceLimits(rate=1000, burst=10), max_retries=2)
+        with pytest.raises(httpx.ConnectError):
+            await client.get("stub")
+        # Never sent, so safe to retry even when not idempotent
+        with pytest.raises(httpx.ConnectError):
+            await client.post("stub")
+        await client.aclose()
+        assert metrics.source_requests.value(("stub", "error")) == 6
+        metrics.reset()
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.config import Settings
+from src.sqldb import create_engine_from_settings
+
+
+class TestEngineProfile:
+    """Unit tests for the SQLite engine profile."""
+
+    @pytest.mark.asyncio
+    async def test_pragmas_applied_on_connect(self, tmp_path):
+        """Test new connections get the configured pragmas."""
+        settings = Settings(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}",
+            sqlite_busy_timeout_ms=1234,
+            sqlite_cache_size_kib=2048,
+        )
+        engine = create_engine_from_settings(settings)
+        try:
+            async with engine.connect() as conn:
+                assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+                assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+                assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 1234
+                assert (await conn.execute(text("PRAGMA cache_size"))).scalar() == -2048
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_read_only_engine_rejects_writes(self, tmp_path):
+        """Test the read-only engine can read but not write."""
+        settings = Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}")
+        engine = create_engine_from_settings(settings)
+        read_engine = create_engine_from_settings(settings, read_only=True)
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+                await conn.execute(text("INSERT INTO t VALUES (1)"))
+
+            async with read_engine.connect() as conn:
+                assert (await conn.execute(text("SELECT x FROM t"))).scalar() == 1
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("INSERT INTO t VALUES (2)"))
+        finally:
+            await read_engine.dispose()
+            await engine.dispose()
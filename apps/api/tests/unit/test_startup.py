@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+
+from src.config import Settings
+from src.main import create_app
+from src.source_client import SourceClient
+from src.sqldb import Database
+
+API_DIR = Path(__file__).resolve().parents[2]
+
+
+class TestStartup:
+    """Unit tests for the application factory."""
+
+    def test_import_has_no_side_effects(self, tmp_path):
+        """Test importing the app and calling create_app creates no files and skips numpy."""
+        code = (
+            "import sys\n"
+            "from src.main import create_app\n"
+            "create_app()\n"
+            "print(','.join(name for name in ('numpy', 'aiosqlite') if name in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=tmp_path,
+            env={**os.environ, "PYTHONPATH": str(API_DIR)},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == ""
+        assert not list(tmp_path.iterdir())
+
+    def test_apps_have_their_own_cache_and_event_hub(self):
+        """Test each app gets a response cache and event hub configured from its settings."""
+        first = create_app(Settings(response_cache_max_entries=10, event_queue_size=4))
+        second = create_app(Settings(response_cache_max_entries=0))
+        assert first.state.response_cache is not second.state.response_cache
+        assert first.state.event_hub is not second.state.event_hub
+        assert first.state.response_cache.enabled and not second.state.response_cache.enabled
+        assert first.state.event_hub.max_queue_size == 4
+
+    @pytest.mark.asyncio
+    async def test_lifespan_creates_database_and_logging(self, tmp_path):
+        """Test the engines and log files are created by the lifespan, not by create_app."""
+        settings = Settings(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+            log_dir=str(tmp_path / "logs"),
+        )
+        app: FastAPI = create_app(settings)
+        assert not hasattr(app.state, "db")
+        assert not (tmp_path / "logs").exists()
+
+        async with app.router.lifespan_context(app):
+            assert isinstance(app.state.db, Database)
+            assert str(app.state.db.engine.url) == settings.database_url
+            assert (tmp_path / "logs" / "varinaut.log").exists()
+            assert isinstance(app.state.source_client, SourceClient)
+        assert app.state.source_client.closed
@@ -0,0 +1,201 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import SQLModel
+
+from src.cache import PREDICTION_LIST_TAG, ResponseCache, prediction_tag
+from src.config import Settings
+from src.main import create_app
+from src.metrics import metrics
+from src.models import Prediction, PredictionUpdate, Source
+from src.sqldb import create_engine_from_settings
+from src.write_buffer import Durability, WriteBuffer
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_engine_from_settings(
+        Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'buffer.db'}")
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(
+            insert(Prediction),
+            [
+                {
+                    "question": "Q?",
+                    "known_date": date(2030, 1, 1),
+                    "created_at": datetime(2026, 1, 1),
+                }
+            ],
+        )
+    metrics.reset()
+    yield engine
+    metrics.reset()
+    await engine.dispose()
+
+
+def _update(name: str, likelihood=0.5) -> PredictionUpdate:
+    return PredictionUpdate(
+        prediction_id=1, likelihood=likelihood, reasoning=name, created_at=datetime(2026, 1, 1)
+    )
+
+
+def _sources(name: str, count: int = 3):
+    return [
+        Source(
+            title=f"{name}-{i}",
+            url="https://example.com",
+            summary="Summary",
+            credibility=0.5,
+            relevance=0.5,
+            reasoning="Relevant",
+            created_at=datetime(2026, 1, 1),
+        )
+        for i in range(count)
+    ]
+
+
+async def _rows(engine, query: str):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(query))).all()
+
+
+class TestWriteBuffer:
+    """Unit tests for group-committed update inserts."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_a_transaction(self, engine):
+        """Test writes queued together are committed as one batch with the right sources."""
+        buffer = WriteBuffer(engine, max_rows=1000, max_delay_ms=50)
+        buffer.start()
+        names = [f"update-{i}" for i in range(50)]
+        ids = await asyncio.gather(
+            *(buffer.write(_update(name), _sources(name)) for name in names)
+        )
+        await buffer.stop()
+
+        assert len(set(ids)) == 50
+        updates = dict(await _rows(engine, "SELECT id, reasoning FROM predictionupdate"))
+        assert [updates[update_id] for update_id in ids] == names
+        mismatched = await _rows(
+            engine,
+            "SELECT s.id FROM source s JOIN predictionupdate u ON u.id = s.update_id "
+            "WHERE s.title NOT LIKE u.reasoning || '-%'",
+        )
+        assert len(await _rows(engine, "SELECT id FROM source")) == 150
+        assert not mismatched
+        assert buffer.pending_rows == 0
+        assert "db_write_batch_rows_count 1" in metrics.render()
+        assert "db_write_batch_rows_sum 200" in metrics.render()
+
+    @pytest.mark.asyncio
+    async def test_batches_are_bounded_by_max_rows(self, engine):
+        """Test a batch never exceeds max_rows unless a single update does."""
+        buffer = WriteBuffer(engine, max_rows=10, max_delay_ms=50)
+        buffer.start()
+        await asyncio.gather(*(buffer.write(_update(str(i)), _sources(str(i))) for i in range(5)))
+        await buffer.write(_update("big"), _sources("big", count=20))
+        await buffer.stop()
+
+        # 4 rows per update: batches of 2, 2 and 1, then one oversized update
+        assert "db_write_batch_rows_count 4" in metrics.render()
+        assert "db_write_batch_rows_sum 41" in metrics.render()
+
+    @pytest.mark.asyncio
+    async def test_failed_row_only_fails_its_producer(self, engine):
+        """Test a batch with an invalid row is retried so the other writes still commit."""
+        buffer = WriteBuffer(engine, max_rows=1000, max_delay_ms=50)
+        buffer.start()
+        results = await asyncio.gather(
+            buffer.write(_update("good-1")),
+            buffer.write(_update("bad", likelihood=None)),
+            buffer.write(_update("good-2")),
+            return_exceptions=True,
+        )
+        await buffer.stop()
+
+        assert isinstance(results[1], IntegrityError)
+        assert all(isinstance(result, int) for result in (results[0], results[2]))
+        rows = await _rows(engine, "SELECT reasoning FROM predictionupdate ORDER BY id")
+        assert [reasoning for (reasoning,) in rows] == ["good-1", "good-2"]
+
+    @pytest.mark.asyncio
+    async def test_buffered_writes_return_before_commit(self, engine):
+        """Test buffered durability returns at once and stop() flushes what is queued."""
+        buffer = WriteBuffer(engine, max_delay_ms=10_000, durability=Durability.BUFFERED)
+        buffer.start()
+        assert await buffer.write(_update("queued")) is None
+        assert buffer.pending_rows == 1
+        assert not await _rows(engine, "SELECT id FROM predictionupdate")
+
+        await buffer.stop()
+        assert len(await _rows(engine, "SELECT id FROM predictionupdate")) == 1
+        with pytest.raises(RuntimeError):
+            await buffer.write(_update("late"))
+
+    @pytest.mark.asyncio
+    async def test_synced_writes_restore_synchronous(self, engine):
+        """Test synced durability commits with synchronous=FULL and then restores the setting."""
+        buffer = WriteBuffer(engine, durability=Durability.SYNCED)
+        buffer.start()
+        assert await buffer.write(_update("synced")) == 1
+        await buffer.stop()
+
+        assert await _rows(engine, "PRAGMA synchronous") == [(1,)]  # NORMAL
+
+    @pytest.mark.asyncio
+    async def test_commit_invalidates_cached_responses(self, engine):
+        """Test the written predictions and the list are evicted before the producer resumes."""
+        cache = ResponseCache(max_entries=10, ttl_seconds=60)
+        for key, tags in {
+            "detail-1": [prediction_tag(1)],
+            "detail-2": [prediction_tag(2)],
+            "list": [PREDICTION_LIST_TAG],
+        }.items():
+            cache.set(key, b"{}", '"etag"', tags=tags, generation=cache.generation)
+        buffer = WriteBuffer(engine, response_cache=cache)
+        buffer.start()
+        await buffer.write(_update("fresh"))
+        await buffer.stop()
+
+        assert cache.get("detail-1") is None
+        assert cache.get("list") is None
+        assert cache.get("detail-2") is not None
+
+    @pytest.mark.asyncio
+    async def test_endpoint_producers_outnumber_write_pool(self, tmp_path):
+        """Test more concurrent update posts than write connections all commit."""
+        settings = Settings(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'app.db'}",
+            log_dir=str(tmp_path / "logs"),
+            db_pool_size=1,
+            db_max_overflow=0,
+            db_pool_timeout=2,
+        )
+        app = create_app(settings)
+        async with app.router.lifespan_context(app):
+            async with app.state.db.engine.begin() as conn:
+                await conn.run_sync(SQLModel.metadata.create_all)
+                await conn.execute(
+                    insert(Prediction),
+                    [{"question": "Q?", "known_date": date(2030, 1, 1)}],
+                )
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(
+                    *(
+                        client.post(
+                            "/predictions/1/updates",
+                            json={"likelihood": 0.5, "reasoning": f"update-{i}"},
+                        )
+                        for i in range(12)
+                    )
+                )
+            assert [response.status_code for response in responses] == [201] * 12
+            rows = await _rows(app.state.db.engine, "SELECT id FROM predictionupdate")
+            assert len(rows) == 12